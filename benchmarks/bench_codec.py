@@ -0,0 +1,102 @@
+# benchmarks/bench_codec.py
+
+"""
+Compare encode/decode throughput and wire size of the installed codecs.
+
+Usage:
+    python -m benchmarks.bench_codec [--seconds 0.5]
+"""
+
+import argparse
+import time
+from typing import Any, Callable, Dict, List
+
+from src.server import codec as codecs
+
+
+def message_shapes() -> Dict[str, Any]:
+    """Messages shaped like real server traffic."""
+    programs = [
+        {"pid": 1000 + i, "name": f"process_{i % 97}.exe"} for i in range(1500)
+    ]
+    displays = [
+        {
+            "id": i,
+            "name": f"\\\\.\\DISPLAY{i + 1}",
+            "friendly_name": "NVIDIA GeForce RTX 4080",
+            "resolution": "2560x1440",
+            "refresh_rate": 144,
+        }
+        for i in range(3)
+    ]
+    return {
+        "pong": {"action": "pong", "id": 42},
+        "display_info": {"action": "get_display_info", "result": displays},
+        "programs_delta": {
+            "action": "programs_delta",
+            "seq": 1234,
+            "added": programs[:5],
+            "removed": programs[5:8],
+            "changed": [],
+        },
+        "running_programs": {"action": "get_running_programs", "result": programs},
+    }
+
+
+def ops_per_second(func: Callable[[], Any], seconds: float) -> float:
+    count = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while True:
+        for _ in range(10):
+            func()
+        count += 10
+        now = time.perf_counter()
+        if now >= deadline:
+            return count / (now - start)
+
+
+def benchmark_codecs() -> List[codecs.Codec]:
+    # Always include the stdlib codec so the fallback is part of the comparison
+    available = [codecs.JsonCodec()]
+    if codecs.orjson:
+        available.append(codecs.OrjsonCodec())
+    available.extend(codec for codec in codecs.CODECS.values() if codec.binary)
+    return available
+
+
+def run(seconds: float) -> List[Dict[str, Any]]:
+    results = []
+    for shape, message in message_shapes().items():
+        for codec in benchmark_codecs():
+            payload = codec.encode(message)
+            size = len(payload.encode("utf-8") if isinstance(payload, str) else payload)
+            results.append(
+                {
+                    "message": shape,
+                    "codec": f"{codec.name} ({type(codec).__name__})",
+                    "bytes": size,
+                    "encode_ops": ops_per_second(lambda: codec.encode(message), seconds),
+                    "decode_ops": ops_per_second(lambda: codec.decode(payload), seconds),
+                }
+            )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--seconds", type=float, default=0.5, help="Time spent on each measurement"
+    )
+    args = parser.parse_args()
+
+    print(f"{'message':<18}{'codec':<28}{'bytes':>10}{'encode/s':>14}{'decode/s':>14}")
+    for result in run(args.seconds):
+        print(
+            f"{result['message']:<18}{result['codec']:<28}{result['bytes']:>10}"
+            f"{result['encode_ops']:>14,.0f}{result['decode_ops']:>14,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
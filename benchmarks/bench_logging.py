@@ -0,0 +1,102 @@
+# benchmarks/bench_logging.py
+
+"""
+Measure the logging cost paid by the calling thread per request.
+
+Compares the old setup (f-string messages, handlers writing on the calling
+thread) with the queue-backed pipeline and lazy %-formatting. Each is run
+against a fast local file and against a slow sink that stands in for a
+console or a disk that stalls, for written and for level-filtered records.
+
+Usage:
+    python -m benchmarks.bench_logging [--records 20000] [--sink-delay 0.0002]
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+from typing import Callable, Dict
+
+from src.utils import logging_config
+from src.utils.logging_config import LOG_FORMAT, setup_logger, shutdown_logger
+
+# Logged with each record, like a decoded client message
+MESSAGE = {"action": "set_resolution", "display_id": 0, "width": 2560, "height": 1440}
+
+
+class SlowFileHandler(logging.FileHandler):
+    def __init__(self, path: str, delay: float):
+        super().__init__(path)
+        self.delay = delay
+
+    def emit(self, record: logging.LogRecord):
+        super().emit(record)
+        time.sleep(self.delay)
+
+
+def per_call_us(func: Callable[[int], None], records: int) -> float:
+    start = time.perf_counter()
+    for i in range(records):
+        func(i)
+    return (time.perf_counter() - start) / records * 1e6
+
+
+def measure(logger: logging.Logger, records: int, lazy: bool) -> Dict[str, float]:
+    if lazy:
+        written = lambda i: logger.info("Handling %s from client %s", MESSAGE, i)
+        filtered = lambda i: logger.debug("Handling %s from client %s", MESSAGE, i)
+    else:
+        written = lambda i: logger.info(f"Handling {MESSAGE} from client {i}")
+        filtered = lambda i: logger.debug(f"Handling {MESSAGE} from client {i}")
+    return {
+        "written": per_call_us(written, records),
+        "filtered": per_call_us(filtered, records),
+    }
+
+
+def run(records: int, sink_delay: float) -> Dict[str, Dict[str, float]]:
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.log")
+        for sink, delay in (("file", 0.0), (f"slow sink ({sink_delay * 1e6:.0f}us)", sink_delay)):
+            # Previous setup: the handler writes on the calling thread
+            logger = logging.getLogger(f"bench.sync.{delay}")
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            handler = SlowFileHandler(path, delay)
+            handler.setFormatter(logging.Formatter(LOG_FORMAT))
+            logger.addHandler(handler)
+            results[f"sync, f-string, {sink}"] = measure(logger, records, lazy=False)
+            logger.removeHandler(handler)
+            handler.close()
+
+            name = f"bench.queue.{delay}"
+            logger = setup_logger(name, None, logging.INFO, queue_size=records + 1, console=False)
+            logger.propagate = False
+            # Swap the listener's handler for the sink under test
+            _, listener = logging_config._pipelines[name]
+            handler = SlowFileHandler(path, delay)
+            handler.setFormatter(logging.Formatter(LOG_FORMAT))
+            listener.handlers = (handler,)
+            results[f"queue, lazy %, {sink}"] = measure(logger, records, lazy=True)
+            shutdown_logger(name)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument(
+        "--sink-delay", type=float, default=0.0002, help="Seconds the slow sink takes per record"
+    )
+    args = parser.parse_args()
+
+    print(f"{'setup':<44}{'written us/call':>18}{'filtered us/call':>18}")
+    for name, result in run(args.records, args.sink_delay).items():
+        print(f"{name:<44}{result['written']:>18.2f}{result['filtered']:>18.3f}")
+
+
+if __name__ == "__main__":
+    main()
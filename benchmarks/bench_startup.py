@@ -0,0 +1,117 @@
+# benchmarks/bench_startup.py
+
+"""
+Measure time-to-first-pong of a freshly started server process.
+
+Each run starts a new interpreter, so module imports are part of the
+measurement. Controllers are stubs whose construction sleeps for
+``--build-delay`` seconds, standing in for ``powercfg /list`` and the
+display enumeration. "eager" builds them before listening, as the server
+used to; "lazy" wraps them in LazyController with background warmup.
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 5] [--build-delay 0.3]
+"""
+
+import time
+
+# Taken before any other import so the child measurement includes imports
+_PROCESS_START = time.perf_counter()
+
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+from typing import Callable, Dict, List
+
+MODES = ("eager", "lazy")
+
+
+def slow(factory: Callable[[], object], delay: float) -> Callable[[], object]:
+    def build():
+        time.sleep(delay)
+        return factory()
+
+    return build
+
+
+async def first_pong(mode: str, delay: float) -> Dict[str, float]:
+    import websockets
+
+    from src.controllers.lazy import LazyController
+    from src.server.nebulalink_server import NebulaLinkServer
+    from tests.stubs import (
+        StubDisplayController,
+        StubPowerController,
+        StubProgramController,
+    )
+
+    imported = time.perf_counter()
+    power = slow(StubPowerController, delay)
+    display = slow(StubDisplayController, delay)
+    if mode == "eager":
+        controllers = {"power_controller": power(), "display_controller": display()}
+    else:
+        controllers = {
+            "power_controller": LazyController(power),
+            "display_controller": LazyController(display),
+        }
+    server = NebulaLinkServer(
+        port=0, program_controller=StubProgramController(), **controllers
+    )
+    await server.start()
+    async with websockets.connect(f"ws://localhost:{server.port}") as websocket:
+        await websocket.send(json.dumps({"action": "ping"}))
+        await websocket.recv()
+        ponged = time.perf_counter()
+    server.stop()
+    await server.server.wait_closed()
+    return {
+        "imports": imported - _PROCESS_START,
+        "first_pong": ponged - _PROCESS_START,
+    }
+
+
+def run_child(mode: str, delay: float) -> Dict[str, float]:
+    output = subprocess.check_output(
+        [sys.executable, "-m", "benchmarks.bench_startup", "--child", mode,
+         "--build-delay", str(delay)],
+        universal_newlines=True,
+    )
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(runs: int, delay: float) -> Dict[str, List[Dict[str, float]]]:
+    return {mode: [run_child(mode, delay) for _ in range(runs)] for mode in MODES}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Processes started per mode")
+    parser.add_argument(
+        "--build-delay",
+        type=float,
+        default=0.3,
+        help="Seconds each stub controller takes to build",
+    )
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(first_pong(args.child, args.build_delay))))
+        return
+
+    print(f"{'mode':<8}{'imports ms':>14}{'first pong ms':>16}{'min ms':>10}")
+    for mode, results in run(args.runs, args.build_delay).items():
+        pongs = [result["first_pong"] * 1000 for result in results]
+        imports = statistics.median(result["imports"] * 1000 for result in results)
+        print(
+            f"{mode:<8}{imports:>14.1f}{statistics.median(pongs):>16.1f}"
+            f"{min(pongs):>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+# benchmarks/load_test.py
+
+"""
+Load-test an in-process NebulaLinkServer with stub controllers.
+
+M clients each send requests from a weighted action mix, one at a time,
+while an optional broadcaster fans messages out to all of them. Reports
+throughput, per-action latency percentiles, broadcast delivery latency and
+memory per connection, and can compare the results with a saved baseline.
+With --requests and --broadcasts the run sends a fixed number of each
+instead of stopping after --seconds.
+
+Usage:
+    python -m benchmarks.load_test [--clients 50] [--seconds 5]
+        [--requests N] [--broadcasts N]
+        [--mix ping=8,programs=1,batch=1] [--broadcast-rate 20]
+        [--output results.json] [--save-baseline FILE] [--baseline FILE]
+        [--tolerance 0.2]
+
+The exit code is 1 when a compared metric regressed by more than the tolerance.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import websockets
+
+from src.server.admission import AdmissionControl
+from src.server.nebulalink_server import NebulaLinkServer
+from tests.stubs import StubDisplayController, StubPowerController, StubProgramController
+
+# Requests sent for each name in --mix
+ACTIONS: Dict[str, Dict[str, Any]] = {
+    "ping": {"action": "ping"},
+    "programs": {"action": "get_running_programs"},
+    "display": {"action": "get_display_info"},
+    "batch": {
+        "action": "batch",
+        "actions": [
+            {"action": "ping"},
+            {"action": "get_display_info"},
+            {"action": "get_power_plans"},
+            {"action": "pause_program", "pid": 1000},
+        ],
+    },
+}
+
+# Metric paths compared with a baseline, and whether higher values are better
+COMPARED: List[Tuple[Tuple[str, ...], bool]] = [
+    (("throughput", "msgs_per_sec"), True),
+    (("latency", "p50_ms"), False),
+    (("latency", "p99_ms"), False),
+    (("broadcast", "p99_ms"), False),
+    (("memory", "per_connection_kb"), False),
+]
+
+# Request names drawn at a time for a timed run
+DRAW_CHUNK = 256
+
+
+def parse_mix(text: str) -> Dict[str, int]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ACTIONS:
+            raise ValueError(f"Unknown action in mix: {name}. Known: {', '.join(ACTIONS)}")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"count": 0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
+
+    return {"count": len(ordered), "p50_ms": pick(0.5), "p95_ms": pick(0.95), "p99_ms": pick(0.99)}
+
+
+class LoadTest:
+    def __init__(
+        self,
+        clients: int,
+        seconds: float,
+        mix: Dict[str, int],
+        broadcast_rate: float,
+        programs: int,
+        seed: int,
+        requests: Optional[int] = None,
+        broadcasts: Optional[int] = None,
+    ):
+        """
+        Args:
+            requests (Optional[int]): Requests per client; if set, clients send this
+                many instead of stopping after ``seconds``.
+            broadcasts (Optional[int]): Broadcasts to send; if set, the broadcaster
+                stops after this many and every client waits until it received them all.
+        """
+        self.clients = clients
+        self.seconds = seconds
+        self.requests = requests
+        self.broadcasts = broadcasts
+        self.mix = mix
+        self.broadcast_rate = broadcast_rate
+        self.programs = programs
+        self.random = random.Random(seed)
+        self.latencies: Dict[str, List[float]] = {name: [] for name in mix}
+        self.broadcast_latencies: List[float] = []
+        self.errors = 0
+        self._ids = itertools.count()
+
+    async def _client(self, websocket: Any, deadline: float, names: Iterator[str]):
+        pending: Dict[int, Tuple[str, float]] = {}
+        loop = asyncio.get_running_loop()
+        reply_ready = asyncio.Event()
+        all_broadcasts = asyncio.Event()
+        broadcasts = 0
+
+        async def receive():
+            nonlocal broadcasts
+            async for raw in websocket:
+                message = json.loads(raw)
+                if "sent_at" in message:
+                    self.broadcast_latencies.append(time.perf_counter() - message["sent_at"])
+                    broadcasts += 1
+                    if broadcasts == self.broadcasts:
+                        all_broadcasts.set()
+                    continue
+                name, started = pending.pop(message.get("id"))
+                self.latencies[name].append(time.perf_counter() - started)
+                if "error" in message:
+                    self.errors += 1
+                reply_ready.set()
+
+        receiver = asyncio.create_task(receive())
+        try:
+            for name in names:
+                if loop.time() >= deadline:
+                    break
+                request_id = next(self._ids)
+                pending[request_id] = (name, time.perf_counter())
+                reply_ready.clear()
+                await websocket.send(json.dumps(dict(ACTIONS[name], id=request_id)))
+                # One outstanding request per client (closed loop)
+                while request_id in pending:
+                    await reply_ready.wait()
+                    reply_ready.clear()
+            if self.broadcasts:
+                await all_broadcasts.wait()
+        finally:
+            receiver.cancel()
+
+    async def _broadcaster(self, server: NebulaLinkServer, deadline: float):
+        loop = asyncio.get_running_loop()
+        interval = 1.0 / self.broadcast_rate if self.broadcast_rate > 0 else 0.0
+        seqs = itertools.count() if self.broadcasts is None else range(self.broadcasts)
+        for seq in seqs:
+            if loop.time() >= deadline:
+                break
+            await server.broadcast({"action": "event", "seq": seq, "sent_at": time.perf_counter()})
+            await asyncio.sleep(interval)
+
+    def _schedule(self) -> List[Iterator[str]]:
+        """The request names of each client, drawn from the mix with a seed per client."""
+        names = list(self.mix)
+        weights = [self.mix[name] for name in names]
+        schedules = []
+        for _ in range(self.clients):
+            rng = random.Random(self.random.random())
+            if self.requests is not None:
+                schedules.append(iter(rng.choices(names, weights, k=self.requests)))
+            else:
+                schedules.append(self._draw(rng, names, weights))
+        return schedules
+
+    @staticmethod
+    def _draw(rng: random.Random, names: List[str], weights: List[int]) -> Iterator[str]:
+        # Drawn as the client sends, so a timed run builds only what it uses
+        while True:
+            yield from rng.choices(names, weights, k=DRAW_CHUNK)
+
+    async def run(self) -> Dict[str, Any]:
+        server = NebulaLinkServer(
+            port=0,
+            power_controller=StubPowerController(),
+            display_controller=StubDisplayController(),
+            program_controller=StubProgramController(count=self.programs),
+            # Measure capacity, not the per-client limits
+            admission=AdmissionControl(max_clients=None, client_rate=None, action_rates={}),
+        )
+        await server.start()
+        try:
+            uri = f"ws://localhost:{server.port}"
+            tracemalloc.start()
+            before = tracemalloc.get_traced_memory()[0]
+            websockets_ = [await websockets.connect(uri) for _ in range(self.clients)]
+            while len(server.clients) < self.clients:
+                await asyncio.sleep(0.01)
+            after = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+
+            schedules = self._schedule()
+            loop = asyncio.get_running_loop()
+            # A fixed number of requests replaces the time limit
+            deadline = math.inf if self.requests is not None else loop.time() + self.seconds
+            started = time.perf_counter()
+            broadcaster = None
+            if self.broadcasts or self.broadcast_rate > 0:
+                broadcaster = asyncio.create_task(self._broadcaster(server, deadline))
+            await asyncio.gather(
+                *(
+                    self._client(websocket, deadline, names)
+                    for websocket, names in zip(websockets_, schedules)
+                )
+            )
+            elapsed = time.perf_counter() - started
+            if broadcaster is not None:
+                # Without a deadline it would go on broadcasting
+                broadcaster.cancel()
+                await asyncio.gather(broadcaster, return_exceptions=True)
+
+            for websocket in websockets_:
+                await websocket.close()
+        finally:
+            server.stop()
+            await server.server.wait_closed()
+
+        all_latencies = [sample for samples in self.latencies.values() for sample in samples]
+        return {
+            "config": {
+                "clients": self.clients,
+                "seconds": self.seconds,
+                "requests": self.requests,
+                "broadcasts": self.broadcasts,
+                "mix": self.mix,
+                "broadcast_rate": self.broadcast_rate,
+                "programs": self.programs,
+            },
+            "throughput": {
+                "requests": len(all_latencies),
+                "msgs_per_sec": round(len(all_latencies) / elapsed, 1),
+                "errors": self.errors,
+            },
+            "latency": percentiles(all_latencies),
+            "actions": {name: percentiles(samples) for name, samples in self.latencies.items()},
+            "broadcast": percentiles(self.broadcast_latencies),
+            "memory": {
+                # Measured in one process, so it covers both ends of each connection
+                "per_connection_kb": round((after - before) / self.clients / 1024, 2),
+            },
+        }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Compare results with a baseline.
+
+    Returns:
+        List[str]: One line per regression beyond ``tolerance`` (a fraction).
+    """
+    regressions = []
+    for path, higher_is_better in COMPARED:
+        current, reference = results, baseline
+        for key in path:
+            current = current.get(key, {}) if isinstance(current, dict) else {}
+            reference = reference.get(key, {}) if isinstance(reference, dict) else {}
+        if not isinstance(current, (int, float)) or not isinstance(reference, (int, float)):
+            continue
+        if not reference:
+            continue
+        change = (current - reference) / reference
+        worse = -change if higher_is_better else change
+        if worse > tolerance:
+            regressions.append(
+                f"{'.'.join(path)}: {reference} -> {current} ({change:+.1%})"
+            )
+    return regressions
+
+
+def report(results: Dict[str, Any]):
+    throughput = results["throughput"]
+    print(
+        f"{results['config']['clients']} clients, {results['config']['seconds']}s: "
+        f"{throughput['requests']} requests, {throughput['msgs_per_sec']} msgs/sec, "
+        f"{throughput['errors']} errors"
+    )
+    print(f"{'action':<12}{'count':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    rows = dict(results["actions"], all=results["latency"], broadcast=results["broadcast"])
+    for name, stats in rows.items():
+        print(
+            f"{name:<12}{stats['count']:>10}{stats['p50_ms']:>10}"
+            f"{stats['p95_ms']:>10}{stats['p99_ms']:>10}"
+        )
+    print(f"memory per connection: {results['memory']['per_connection_kb']} KiB")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--requests", type=int, help="Requests per client instead of a time limit")
+    parser.add_argument("--broadcasts", type=int, help="Number of broadcasts every client must receive")
+    parser.add_argument("--mix", default="ping=8,programs=1,batch=1", help="name=weight,...")
+    parser.add_argument("--broadcast-rate", type=float, default=20.0, help="Broadcasts per second; 0 disables")
+    parser.add_argument("--programs", type=int, default=300, help="Size of the stub process list")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--save-baseline", help="Write the results as a new baseline")
+    parser.add_argument("--baseline", help="Compare with this baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression (fraction)")
+    args = parser.parse_args(argv)
+
+    test = LoadTest(
+        args.clients,
+        args.seconds,
+        parse_mix(args.mix),
+        args.broadcast_rate,
+        args.programs,
+        args.seed,
+        args.requests,
+        args.broadcasts,
+    )
+    results = asyncio.run(test.run())
+    report(results)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("Regressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+# src/config/settings.py
+
+import os
+
+# Server
+HOST = "localhost"
+PORT = 8765
+
+# Action dispatch
+# Blocking controller calls (powercfg, display driver calls, psutil lookups)
+# run on a bounded thread pool so they never stall the event loop.
+BLOCKING_POOL_SIZE = 8
+# CPU-bound calls get their own pool so they cannot starve blocking I/O slots.
+CPU_POOL_SIZE = os.cpu_count() or 1
+
+# Outgoing messages
+# Each client gets a bounded send queue drained by its own writer task.
+CLIENT_QUEUE_SIZE = 256
+# Policy when a client's queue is full: "drop_oldest", "coalesce" or "disconnect"
+SLOW_CONSUMER_POLICY = "drop_oldest"
+
+# Process table
+# Seconds between background rescans of the process list
+PROCESS_REFRESH_INTERVAL = 2.0
+# Snapshots older than this many seconds are refreshed before being served
+PROCESS_MAX_AGE = 5.0
+# Recent process list deltas kept so lagging subscribers can catch up
+PROGRAM_DELTA_HISTORY = 64
+# Seconds between samples of per-process CPU, memory, thread and I/O usage
+RESOURCE_SAMPLE_INTERVAL = 2.0
+
+# External commands (powercfg, shutdown)
+# Commands run as asyncio subprocesses; at most this many at once
+COMMAND_CONCURRENCY = 4
+# Seconds before a command is killed
+COMMAND_TIMEOUT = 30.0
+# Output kept per stream and command, in bytes
+COMMAND_MAX_OUTPUT = 1024 * 1024
+
+# Power plans
+# Seconds the power plan list is cached before powercfg is run again
+POWER_PLAN_CACHE_TTL = 60.0
+
+# Logging
+LOG_LEVEL = "INFO"
+# Rotating log file; None logs to the console only
+LOG_FILE = None
+# Write one JSON object per record instead of text lines
+LOG_JSON = False
+# Records buffered between the server and the log writer thread
+LOG_QUEUE_SIZE = 10000
+# When the buffer is full: "drop" the record or "block" until there is room
+LOG_QUEUE_POLICY = "drop"
+
+# Metrics
+# Seconds between event loop lag samples
+LOOP_LAG_INTERVAL = 0.5
+# Port of the Prometheus text endpoint (GET /metrics); None disables it. With
+# several workers only worker WORKER_OWNER serves it, with its own metrics
+METRICS_PORT = None
+METRICS_HOST = "localhost"
+
+# Startup
+# Build the power and display controllers in the background once the server
+# is listening; when False they are built on their first action instead
+CONTROLLER_WARMUP = True
+
+# Display topology
+# Seconds a cached display enumeration is served before it is re-read, so
+# monitors plugged in outside the server are picked up
+DISPLAY_CACHE_TTL = 10.0
+
+# Batch envelopes
+# Default number of actions from one batch running at once
+BATCH_CONCURRENCY = 16
+# Largest number of actions accepted in one batch
+BATCH_MAX_ACTIONS = 256
+
+# Request pipelining
+# Requests from one connection that may run at the same time
+MAX_IN_FLIGHT_PER_CONNECTION = 32
+
+# Admission control
+# Connections served at once; further handshakes get HTTP 503 (None = unlimited)
+MAX_CLIENTS = 1024
+# Retry-After (seconds) sent with the 503 when the server is full
+SERVER_FULL_RETRY_AFTER = 5
+# Largest incoming message in bytes; larger ones close the connection (1009)
+MAX_FRAME_SIZE = 1024 * 1024
+# Token bucket over all messages of one client: (messages per second, burst); None disables it
+CLIENT_RATE_LIMIT = (100.0, 200)
+# Token buckets per client and action class, on top of CLIENT_RATE_LIMIT; a
+# batch takes one token per class it uses, like a single bulk action
+ACTION_CLASS_RATE_LIMITS = {
+    "power": (0.5, 3),
+    "display": (2.0, 10),
+    "programs": (10.0, 20),
+}
+ACTION_CLASSES = {
+    "shutdown": "power",
+    "restart": "power",
+    "sleep": "power",
+    "hibernate": "power",
+    "set_power_plan": "power",
+    "set_resolution": "display",
+    "set_refresh_rate": "display",
+    "apply_display_layout": "display",
+    "enable_dummy_display": "display",
+    "disable_dummy_display": "display",
+    "get_running_programs": "programs",
+    "pause_program": "programs",
+    "resume_program": "programs",
+    "pause_programs": "programs",
+    "resume_programs": "programs",
+}
+# Retry-after (seconds) suggested to a request with an ID that finds its
+# connection's in-flight limit reached; requests without an ID wait instead
+IN_FLIGHT_RETRY_AFTER = 0.1
+
+# Event push
+# Seconds the events of one topic are collected before they are pushed as one message
+EVENT_WINDOW = 0.25
+
+# Resumable sessions
+# Outgoing messages kept per session for replay after a reconnect; keep it
+# below CLIENT_QUEUE_SIZE so a full replay fits in the client's queue
+SESSION_REPLAY_SIZE = 128
+# Seconds a disconnected session is kept for its client to resume it
+SESSION_GRACE_PERIOD = 30.0
+
+# Scheduled actions
+# Actions that can be scheduled with the schedule action
+SCHEDULABLE_ACTIONS = frozenset(
+    {
+        "shutdown",
+        "restart",
+        "sleep",
+        "hibernate",
+        "set_power_plan",
+        "set_resolution",
+        "set_refresh_rate",
+        "apply_display_layout",
+        "enable_dummy_display",
+        "disable_dummy_display",
+        "pause_program",
+        "resume_program",
+        "pause_programs",
+        "resume_programs",
+    }
+)
+# Largest number of pending scheduled jobs
+SCHEDULER_MAX_JOBS = 10000
+# Shortest interval in seconds of a recurring job
+SCHEDULER_MIN_INTERVAL = 1.0
+# Seconds after its due time a job start counts as a missed deadline
+SCHEDULER_LATE_AFTER = 1.0
+
+# Compression (permessage-deflate)
+COMPRESSION_ENABLED = True
+# LZ77 window size in bits (9-15); larger compresses better and uses more memory per client
+COMPRESSION_WINDOW_BITS = 12
+# zlib memory level (1-9) of the compressor
+COMPRESSION_MEM_LEVEL = 5
+# Messages smaller than this many bytes (e.g. ping/pong) are sent uncompressed
+COMPRESSION_MIN_SIZE = 512
+
+# Multi-worker mode
+# Number of worker processes sharing the port via SO_REUSEPORT (1 = single process)
+WORKERS = 1
+# Worker that runs stateful controller actions on behalf of all workers
+WORKER_OWNER = 0
+WORKER_OWNED_ACTIONS = frozenset(
+    {
+        "shutdown",
+        "restart",
+        "sleep",
+        "hibernate",
+        "set_power_plan",
+        "set_resolution",
+        "set_refresh_rate",
+        "apply_display_layout",
+        "enable_dummy_display",
+        "disable_dummy_display",
+        # Only the owner samples resource usage
+        "get_program_usage",
+        # Scheduled jobs live on the owner, so every worker sees the same ones
+        "schedule",
+        "cancel",
+        "list_scheduled",
+    }
+)
+# Seconds a worker waits for the owner to answer a forwarded action
+WORKER_CALL_TIMEOUT = 30.0
@@ -1,7 +1,21 @@
 # src/controllers/__init__.py
 
-from .power_controller import PowerController
-from .display_controller import DisplayController
-from .program_controller import ProgramController
+# Controllers are resolved on first access so that importing one controller
+# module does not pull in the platform libraries (pywin32) of the others.
+_CONTROLLERS = {
+    'PowerController': '.power_controller',
+    'DisplayController': '.display_controller',
+    'ProgramController': '.program_controller',
+    'LazyController': '.lazy',
+}
 
-__all__ = ['PowerController', 'DisplayController', 'ProgramController']
\ No newline at end of file
+
+def __getattr__(name):
+    if name in _CONTROLLERS:
+        from importlib import import_module
+
+        return getattr(import_module(_CONTROLLERS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ['PowerController', 'DisplayController', 'ProgramController', 'LazyController']
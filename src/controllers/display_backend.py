@@ -0,0 +1,68 @@
+# src/controllers/display_backend.py
+
+from typing import Any, Dict, List, Optional
+
+
+class DisplayBackend:
+    """
+    Operating system access used by DisplayController.
+
+    Displays are described as dictionaries with the keys ``name`` (device
+    name used to address the display), ``friendly_name``, ``width``,
+    ``height`` and ``refresh_rate``, in enumeration order.
+    """
+
+    def enumerate(self) -> List[Dict[str, Any]]:
+        """Read the current display topology from the OS."""
+        raise NotImplementedError
+
+    def list_modes(self, device_name: str) -> List[Dict[str, Any]]:
+        """
+        Read every mode a display supports, as ``width``, ``height`` and
+        ``refresh_rate`` dictionaries.
+
+        Backends that cannot list modes leave this unimplemented; changes are
+        then sent to the OS without validation.
+        """
+        raise NotImplementedError
+
+    def set_resolution(self, device_name: str, width: int, height: int):
+        """
+        Change the resolution of a display.
+
+        Raises:
+            DisplayControlError: If the OS rejects the change.
+        """
+        raise NotImplementedError
+
+    def set_refresh_rate(self, device_name: str, rate: int):
+        """
+        Change the refresh rate of a display.
+
+        Raises:
+            DisplayControlError: If the OS rejects the change.
+        """
+        raise NotImplementedError
+
+    def stage_mode(
+        self, device_name: str, width: int, height: int, refresh_rate: Optional[int]
+    ):
+        """
+        Record a mode change without applying it; ``commit`` applies all staged changes.
+
+        Args:
+            refresh_rate (Optional[int]): None leaves the choice of rate to the OS.
+
+        Raises:
+            DisplayControlError: If the OS rejects the mode.
+        """
+        raise NotImplementedError
+
+    def commit(self):
+        """
+        Apply the staged mode changes of all displays in one mode switch.
+
+        Raises:
+            DisplayControlError: If the OS fails to apply them.
+        """
+        raise NotImplementedError
@@ -1,167 +1,388 @@
 # src/controllers/display_controller.py
 
-import ctypes
-import ctypes.wintypes
-import win32api  # type: ignore
-import win32con  # type: ignore
-from typing import List, Dict, Any
-from src.utils import get_logger, DisplayControlError
+import threading
+import time
+from typing import List, Dict, Any, Optional, Tuple
+from src.config import settings
+from src.controllers.display_backend import DisplayBackend
+from src.controllers.display_modes import DisplayModeCatalog, Mode
+from src.utils import get_logger, DisplayControlError, EventBus, event_bus
 
 logger = get_logger(__name__)
 
-
-# Windows API structures and constants
-class DEVMODE(ctypes.Structure):
-    _fields_ = [
-        ("dmDeviceName", ctypes.c_wchar * 32),
-        ("dmSpecVersion", ctypes.wintypes.WORD),
-        ("dmDriverVersion", ctypes.wintypes.WORD),
-        ("dmSize", ctypes.wintypes.WORD),
-        ("dmDriverExtra", ctypes.wintypes.WORD),
-        ("dmFields", ctypes.wintypes.DWORD),
-        ("dmPositionX", ctypes.wintypes.LONG),
-        ("dmPositionY", ctypes.wintypes.LONG),
-        ("dmDisplayOrientation", ctypes.wintypes.DWORD),
-        ("dmDisplayFixedOutput", ctypes.wintypes.DWORD),
-        ("dmColor", ctypes.wintypes.SHORT),
-        ("dmDuplex", ctypes.wintypes.SHORT),
-        ("dmYResolution", ctypes.wintypes.SHORT),
-        ("dmTTOption", ctypes.wintypes.SHORT),
-        ("dmCollate", ctypes.wintypes.SHORT),
-        ("dmFormName", ctypes.c_wchar * 32),
-        ("dmLogPixels", ctypes.wintypes.WORD),
-        ("dmBitsPerPel", ctypes.wintypes.DWORD),
-        ("dmPelsWidth", ctypes.wintypes.DWORD),
-        ("dmPelsHeight", ctypes.wintypes.DWORD),
-        ("dmDisplayFlags", ctypes.wintypes.DWORD),
-        ("dmDisplayFrequency", ctypes.wintypes.DWORD),
-        ("dmICMMethod", ctypes.wintypes.DWORD),
-        ("dmICMIntent", ctypes.wintypes.DWORD),
-        ("dmMediaType", ctypes.wintypes.DWORD),
-        ("dmDitherType", ctypes.wintypes.DWORD),
-        ("dmReserved1", ctypes.wintypes.DWORD),
-        ("dmReserved2", ctypes.wintypes.DWORD),
-        ("dmPanningWidth", ctypes.wintypes.DWORD),
-        ("dmPanningHeight", ctypes.wintypes.DWORD),
-    ]
+# A staged layout change: display ID, device name, new mode, previous mode
+LayoutChange = Tuple[int, str, Mode, Mode]
 
 
 class DisplayController:
-    def __init__(self):
-        self.displays = self._get_displays()
+    """
+    Display settings with a cached view of the display topology.
+
+    The topology is enumerated lazily: readers are answered from the cache
+    until it is invalidated (after every change made through this controller,
+    or explicitly on a hotplug notification) or is older than ``cache_ttl``
+    seconds. ``generation`` increases with every invalidation, so callers can
+    cheaply tell whether what they read earlier may be outdated.
+
+    The modes each display supports are listed once per display and kept
+    in a DisplayModeCatalog until the topology is invalidated, so requests
+    for unsupported modes are rejected before they reach the driver.
+
+    Every change is published to the ``display`` topic of the event bus.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[DisplayBackend] = None,
+        cache_ttl: float = settings.DISPLAY_CACHE_TTL,
+        events: Optional[EventBus] = None,
+    ):
+        if backend is None:
+            # Imported here so the controller can be used with other backends without pywin32
+            from src.controllers.win32_display_backend import Win32DisplayBackend
+
+            backend = Win32DisplayBackend()
+        self.backend = backend
+        self.cache_ttl = cache_ttl
+        self.events = events or event_bus
+        self.generation = 0
+        self._displays: List[Dict[str, Any]] = []
+        self._refreshed_at: Optional[float] = None
+        self._dirty = True
+        self._lock = threading.Lock()
+        # Mode catalogs by device name; None for backends that cannot list modes
+        self._modes: Dict[str, Optional[DisplayModeCatalog]] = {}
+        self._modes_lock = threading.Lock()
+        # Serializes layout transactions
+        self._apply_lock = threading.Lock()
+
+    @property
+    def displays(self) -> List[Dict[str, Any]]:
+        return self.get_display_info()
+
+    def invalidate(self, modes: bool = True):
+        """
+        Mark the cached topology as stale so the next read re-enumerates.
+
+        Args:
+            modes (bool): Also drop the mode catalogs, e.g. when a monitor was
+                replaced; a mode change made through this controller keeps them.
+        """
+        with self._lock:
+            self._dirty = True
+            self.generation += 1
+        if modes:
+            with self._modes_lock:
+                self._modes.clear()
+
+    def _is_fresh(self) -> bool:
+        return (
+            not self._dirty
+            and self._refreshed_at is not None
+            and time.monotonic() - self._refreshed_at < self.cache_ttl
+        )
 
     def _get_displays(self) -> List[Dict[str, Any]]:
-        displays = []
-        i = 0
-        while True:
-            try:
-                device = win32api.EnumDisplayDevices(None, i)
-                settings = win32api.EnumDisplaySettings(
-                    device.DeviceName, win32con.ENUM_CURRENT_SETTINGS
-                )
-                displays.append(
-                    {
-                        "id": i,
-                        "name": device.DeviceName,
-                        "friendly_name": device.DeviceString,
-                        "resolution": f"{settings.PelsWidth}x{settings.PelsHeight}",
-                        "refresh_rate": settings.DisplayFrequency,
-                    }
-                )
-                i += 1
-            except win32api.error:
-                break
-        return displays
+        with self._lock:
+            # Another thread may have refreshed while this one waited
+            if self._is_fresh():
+                return self._displays
+            displays = [
+                {
+                    "id": i,
+                    "name": device["name"],
+                    "friendly_name": device["friendly_name"],
+                    "resolution": f"{device['width']}x{device['height']}",
+                    "refresh_rate": device["refresh_rate"],
+                }
+                for i, device in enumerate(self.backend.enumerate())
+            ]
+            self._displays = displays
+            self._refreshed_at = time.monotonic()
+            self._dirty = False
+            return displays
 
     def get_display_info(self) -> List[Dict[str, Any]]:
-        return self.displays
+        if self._is_fresh():
+            return self._displays
+        try:
+            return self._get_displays()
+        except Exception as e:
+            logger.error("Failed to enumerate displays: %s", e)
+            raise DisplayControlError(f"Failed to enumerate displays: {str(e)}")
+
+    def _display(self, display_id: int) -> Dict[str, Any]:
+        displays = self.get_display_info()
+        if display_id < 0 or display_id >= len(displays):
+            raise DisplayControlError(f"Invalid display ID: {display_id}")
+        return displays[display_id]
+
+    def _device_name(self, display_id: int) -> str:
+        return self._display(display_id)["name"]
+
+    def _catalog(self, device_name: str) -> Optional[DisplayModeCatalog]:
+        with self._modes_lock:
+            if device_name in self._modes:
+                return self._modes[device_name]
+            try:
+                catalog = DisplayModeCatalog(self.backend.list_modes(device_name))
+                logger.info("Listed %s display modes of %s", len(catalog), device_name)
+            except NotImplementedError:
+                catalog = None
+            self._modes[device_name] = catalog
+            return catalog
+
+    def _validation_catalog(self, device_name: str) -> Optional[DisplayModeCatalog]:
+        try:
+            return self._catalog(device_name)
+        except Exception as e:
+            # Without a catalog the driver still validates the change
+            logger.warning("Failed to list display modes of %s: %s", device_name, e)
+            return None
+
+    def list_modes(self, display_id: int) -> Dict[str, Any]:
+        """
+        List the modes a display supports.
+
+        Returns:
+            Dict[str, Any]: The display ID and its resolutions, largest first,
+                each with the supported refresh rates.
+
+        Raises:
+            DisplayControlError: If the display does not exist or its modes cannot be listed.
+        """
+        catalog = self._required_catalog(display_id)
+        return {"display_id": display_id, "modes": catalog.as_list()}
+
+    def find_display_mode(
+        self,
+        display_id: int,
+        width: int,
+        height: int,
+        refresh_rate: Optional[int] = None,
+        min_refresh: Optional[int] = None,
+    ) -> Dict[str, int]:
+        """
+        Find the supported mode closest to a requested one.
+
+        Args:
+            display_id (int): The display.
+            width (int): Requested width.
+            height (int): Requested height.
+            refresh_rate (Optional[int]): Preferred refresh rate; the highest if omitted.
+            min_refresh (Optional[int]): Lowest acceptable refresh rate.
+
+        Returns:
+            Dict[str, int]: The mode's ``width``, ``height`` and ``refresh_rate``.
+
+        Raises:
+            DisplayControlError: If the modes cannot be listed or none qualifies.
+        """
+        catalog = self._required_catalog(display_id)
+        mode = catalog.nearest(width, height, refresh_rate, min_refresh)
+        if mode is None:
+            raise DisplayControlError(
+                f"No mode of display {display_id} runs at {min_refresh}Hz or more"
+            )
+        return mode
+
+    def _required_catalog(self, display_id: int) -> DisplayModeCatalog:
+        try:
+            catalog = self._catalog(self._device_name(display_id))
+        except DisplayControlError:
+            raise
+        except Exception as e:
+            logger.error("Failed to list display modes: %s", e)
+            raise DisplayControlError(f"Failed to list display modes: {str(e)}")
+        if catalog is None:
+            raise DisplayControlError("Listing display modes is not supported")
+        return catalog
 
     def set_resolution(
         self, display_id: int, width: int, height: int
     ) -> Dict[str, str]:
         try:
-            if display_id < 0 or display_id >= len(self.displays):
-                raise DisplayControlError(f"Invalid display ID: {display_id}")
-
-            device_name = self.displays[display_id]["name"]
-            devmode = DEVMODE()
-            devmode.dmSize = ctypes.sizeof(DEVMODE)
-            devmode.dmDriverExtra = 0
-            devmode.dmFields = win32con.DM_PELSWIDTH | win32con.DM_PELSHEIGHT
-            devmode.dmPelsWidth = width
-            devmode.dmPelsHeight = height
-
-            result = ctypes.windll.user32.ChangeDisplaySettingsExW(
-                device_name,
-                ctypes.byref(devmode),
-                None,
-                win32con.CDS_UPDATEREGISTRY,
-                None,
+            device_name = self._device_name(display_id)
+            catalog = self._validation_catalog(device_name)
+            if catalog is not None and not catalog.supports(width, height):
+                message = f"Unsupported resolution {width}x{height} for display {display_id}"
+                nearest = catalog.nearest(width, height)
+                if nearest:
+                    message += f"; nearest is {nearest['width']}x{nearest['height']}"
+                raise DisplayControlError(message)
+            try:
+                self.backend.set_resolution(device_name, width, height)
+            finally:
+                # Even a failed change may have been partially applied
+                self.invalidate(modes=False)
+            logger.info(
+                "Resolution of display %s set to %sx%s",
+                display_id,
+                width,
+                height,
             )
-
-            if result == win32con.DISP_CHANGE_SUCCESSFUL:
-                logger.info(
-                    f"Resolution of display {display_id} set to {width}x{height}"
-                )
-                return {
-                    "status": "success",
-                    "message": f"Resolution set to {width}x{height}",
-                }
-            else:
-                raise DisplayControlError(
-                    f"Failed to set resolution. Error code: {result}"
-                )
+            self._publish_mode(display_id, width=width, height=height)
+            return {
+                "status": "success",
+                "message": f"Resolution set to {width}x{height}",
+            }
         except DisplayControlError as e:
             logger.error(str(e))
             raise
         except Exception as e:
-            logger.error(f"Failed to set resolution: {str(e)}")
+            logger.error("Failed to set resolution: %s", e)
             raise DisplayControlError(f"Failed to set resolution: {str(e)}")
 
     def set_refresh_rate(self, display_id: int, rate: int) -> Dict[str, str]:
         try:
-            if display_id < 0 or display_id >= len(self.displays):
-                raise DisplayControlError(f"Invalid display ID: {display_id}")
-
-            device_name = self.displays[display_id]["name"]
-            devmode = DEVMODE()
-            devmode.dmSize = ctypes.sizeof(DEVMODE)
-            devmode.dmDriverExtra = 0
-            devmode.dmFields = win32con.DM_DISPLAYFREQUENCY
-            devmode.dmDisplayFrequency = rate
-
-            result = ctypes.windll.user32.ChangeDisplaySettingsExW(
-                device_name,
-                ctypes.byref(devmode),
-                None,
-                win32con.CDS_UPDATEREGISTRY,
-                None,
-            )
-
-            if result == win32con.DISP_CHANGE_SUCCESSFUL:
-                logger.info(f"Refresh rate of display {display_id} set to {rate}Hz")
-                return {"status": "success", "message": f"Refresh rate set to {rate}Hz"}
-            else:
-                raise DisplayControlError(
-                    f"Failed to set refresh rate. Error code: {result}"
-                )
+            display = self._display(display_id)
+            device_name = display["name"]
+            catalog = self._validation_catalog(device_name)
+            if catalog is not None:
+                width, height = map(int, display["resolution"].split("x"))
+                if not catalog.supports(width, height, rate):
+                    rates = catalog.rates.get((width, height), [])
+                    raise DisplayControlError(
+                        f"Unsupported refresh rate {rate}Hz at {width}x{height} "
+                        f"for display {display_id}; supported: {rates}"
+                    )
+            try:
+                self.backend.set_refresh_rate(device_name, rate)
+            finally:
+                self.invalidate(modes=False)
+            logger.info("Refresh rate of display %s set to %sHz", display_id, rate)
+            self._publish_mode(display_id, refresh_rate=rate)
+            return {"status": "success", "message": f"Refresh rate set to {rate}Hz"}
         except DisplayControlError as e:
             logger.error(str(e))
             raise
         except Exception as e:
-            logger.error(f"Failed to set refresh rate: {str(e)}")
+            logger.error("Failed to set refresh rate: %s", e)
             raise DisplayControlError(f"Failed to set refresh rate: {str(e)}")
 
+    def apply_display_layout(self, layout: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Change the modes of several displays in one transaction.
+
+        Every entry is validated first (display ID, supported mode), then the
+        changed displays are staged and applied with a single mode switch.
+        If staging or applying fails, the previous modes of the cached
+        layout are staged and applied again.
+
+        Args:
+            layout (List[Dict[str, Any]]): Entries with ``display_id`` and any of
+                ``width``, ``height`` and ``refresh_rate``. Omitted fields keep
+                their current value, except a refresh rate the new resolution
+                does not support, which becomes the highest one it does.
+
+        Returns:
+            Dict[str, Any]: The status and the IDs of the displays that changed.
+
+        Raises:
+            DisplayControlError: If the layout is invalid, or it failed to apply
+                (after the previous layout was restored where possible).
+        """
+        with self._apply_lock:
+            staged = self._plan_layout(layout)
+            if not staged:
+                return {
+                    "status": "success",
+                    "changed": [],
+                    "message": "Layout already applied",
+                }
+            try:
+                for display_id, device_name, mode, _ in staged:
+                    self.backend.stage_mode(device_name, *mode)
+                self.backend.commit()
+            except Exception as e:
+                logger.error("Failed to apply display layout: %s", e)
+                raise DisplayControlError(
+                    f"Failed to apply display layout: {str(e)}; {self._roll_back(staged)}"
+                )
+            finally:
+                self.invalidate(modes=False)
+
+        changed = []
+        for display_id, _, (width, height, rate), _ in staged:
+            changed.append(display_id)
+            self._publish_mode(display_id, width=width, height=height, refresh_rate=rate)
+        logger.info("Applied display layout to displays %s", changed)
+        return {
+            "status": "success",
+            "changed": changed,
+            "message": f"Layout applied to {len(changed)} display(s)",
+        }
+
+    def _plan_layout(self, layout: List[Dict[str, Any]]) -> List[LayoutChange]:
+        """Validate a layout and work out the displays whose mode changes."""
+        if not isinstance(layout, list) or not layout:
+            raise DisplayControlError("Layout must be a non-empty list of display entries")
+        displays = self.get_display_info()
+        staged = []
+        seen = set()
+        for entry in layout:
+            display_id = entry.get("display_id") if isinstance(entry, dict) else None
+            if not isinstance(display_id, int) or not 0 <= display_id < len(displays):
+                raise DisplayControlError(f"Invalid display ID: {display_id}")
+            if display_id in seen:
+                raise DisplayControlError(f"Display {display_id} appears twice in the layout")
+            seen.add(display_id)
+
+            display = displays[display_id]
+            width, height = map(int, display["resolution"].split("x"))
+            previous = (width, height, display["refresh_rate"])
+            width = int(entry.get("width", width))
+            height = int(entry.get("height", height))
+            rate = entry.get("refresh_rate")
+            catalog = self._validation_catalog(display["name"])
+            if rate is None:
+                rate = previous[2]
+                if catalog is not None and not catalog.supports(width, height, rate):
+                    # Keep the current rate where possible, else the best one
+                    rates = catalog.rates.get((width, height))
+                    rate = rates[-1] if rates else rate
+            mode = (width, height, int(rate))
+            if catalog is not None and not catalog.supports(*mode):
+                raise DisplayControlError(
+                    f"Unsupported mode {width}x{height}@{rate}Hz for display {display_id}"
+                )
+            if mode != previous:
+                staged.append((display_id, display["name"], mode, previous))
+        return staged
+
+    def _roll_back(self, staged: List[LayoutChange]) -> str:
+        try:
+            for _, device_name, _, previous in staged:
+                self.backend.stage_mode(device_name, *previous)
+            self.backend.commit()
+        except Exception as e:
+            logger.error("Failed to restore the previous display layout: %s", e)
+            return f"restoring the previous layout also failed: {str(e)}"
+        logger.info("Restored the previous display layout")
+        return "previous layout restored"
+
+    def _publish_mode(self, display_id: int, **mode: int):
+        # Carries the fields that changed; events merged per display add up to the new mode
+        event = {"type": "mode_changed", "display_id": display_id, **mode}
+        self.events.publish("display", event, key=display_id)
+
+    def _publish_topology(self):
+        self.events.publish("display", {"type": "topology_changed"}, key="topology")
+
     def enable_dummy_display(self) -> Dict[str, str]:
         # This functionality requires a third-party driver like Mirage Driver
         # For now, we'll just log the action and return a placeholder response
         logger.info("Enabling dummy display (placeholder)")
+        self.invalidate()
+        self._publish_topology()
         return {"status": "success", "message": "Dummy display enabled (placeholder)"}
 
     def disable_dummy_display(self) -> Dict[str, str]:
         # This functionality requires a third-party driver like Mirage Driver
         # For now, we'll just log the action and return a placeholder response
         logger.info("Disabling dummy display (placeholder)")
+        self.invalidate()
+        self._publish_topology()
         return {"status": "success", "message": "Dummy display disabled (placeholder)"}
 
 
@@ -0,0 +1,81 @@
+# src/controllers/display_modes.py
+
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# (width, height, refresh rate)
+Mode = Tuple[int, int, int]
+
+
+class DisplayModeCatalog:
+    """
+    The modes one display supports, indexed for validation.
+
+    Membership tests for a full mode or a resolution are set lookups, so a
+    request for an unsupported mode is rejected without calling the driver.
+    The refresh rates of each resolution are kept sorted for listing.
+    """
+
+    def __init__(self, modes: Iterable[Dict[str, Any]]):
+        self.modes: Set[Mode] = {
+            (int(mode["width"]), int(mode["height"]), int(mode["refresh_rate"]))
+            for mode in modes
+        }
+        rates: Dict[Tuple[int, int], List[int]] = {}
+        for width, height, rate in self.modes:
+            rates.setdefault((width, height), []).append(rate)
+        self.rates: Dict[Tuple[int, int], List[int]] = {
+            resolution: sorted(values) for resolution, values in rates.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.modes)
+
+    def supports(
+        self, width: int, height: int, refresh_rate: Optional[int] = None
+    ) -> bool:
+        """Whether the display supports a resolution, or a resolution at a refresh rate."""
+        if refresh_rate is None:
+            return (width, height) in self.rates
+        return (width, height, refresh_rate) in self.modes
+
+    def nearest(
+        self,
+        width: int,
+        height: int,
+        refresh_rate: Optional[int] = None,
+        min_refresh: Optional[int] = None,
+    ) -> Optional[Dict[str, int]]:
+        """
+        Find the supported mode closest to a requested one.
+
+        Modes below ``min_refresh`` are not considered. The closest resolution
+        (by summed width and height difference) wins; among its refresh rates
+        the one closest to ``refresh_rate`` is picked, or the highest if none
+        was requested.
+
+        Returns:
+            Optional[Dict[str, int]]: The mode, or None if no mode qualifies.
+        """
+
+        def distance(mode: Mode) -> Tuple[int, int]:
+            mode_width, mode_height, rate = mode
+            resolution = abs(mode_width - width) + abs(mode_height - height)
+            return resolution, abs(rate - refresh_rate) if refresh_rate else -rate
+
+        candidates = (
+            mode for mode in self.modes if min_refresh is None or mode[2] >= min_refresh
+        )
+        best = min(candidates, key=distance, default=None)
+        if best is None:
+            return None
+        return {"width": best[0], "height": best[1], "refresh_rate": best[2]}
+
+    def as_list(self) -> List[Dict[str, Any]]:
+        """Resolutions, largest first, each with its supported refresh rates."""
+        resolutions = sorted(
+            self.rates, key=lambda resolution: (resolution[0] * resolution[1], resolution)
+        )
+        return [
+            {"width": width, "height": height, "refresh_rates": self.rates[(width, height)]}
+            for width, height in reversed(resolutions)
+        ]
@@ -0,0 +1,84 @@
+# src/controllers/lazy.py
+
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from src.utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class LazyController:
+    """
+    Builds a controller on first use instead of at server construction.
+
+    Controller constructors may shell out or walk OS devices, so the server
+    wraps them in a LazyController and can start listening before any of
+    them exist. Construction happens once, on the first call through
+    ``method`` or on ``load`` (used for background warmup). If construction
+    fails, the error is raised to the caller and the next use tries again.
+    """
+
+    def __init__(self, factory: Callable[[], Any], name: Optional[str] = None):
+        self.factory = factory
+        self.name = name or getattr(factory, "__name__", "controller")
+        # Seconds the factory took, once the controller is built
+        self.load_time: Optional[float] = None
+        self._instance: Any = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._instance is not None
+
+    def load(self) -> Any:
+        """Build the controller if needed and return it."""
+        instance = self._instance
+        if instance is not None:
+            return instance
+        with self._lock:
+            if self._instance is None:
+                started = time.perf_counter()
+                self._instance = self.factory()
+                self.load_time = time.perf_counter() - started
+                logger.info("Loaded %s in %.1fms", self.name, self.load_time * 1000)
+            return self._instance
+
+    def method(self, name: str, coroutine: bool = False) -> Callable[..., Any]:
+        """
+        Get a callable that loads the controller and calls its method ``name``.
+
+        Args:
+            name (str): Method name on the controller.
+            coroutine (bool): The method is a coroutine function; the returned
+                callable is then one too, so it can be registered as an ASYNC action.
+        """
+        if coroutine:
+
+            async def call_async(*args: Any, **kwargs: Any) -> Any:
+                return await getattr(self.load(), name)(*args, **kwargs)
+
+            call_async.__name__ = name
+            return call_async
+
+        def call(*args: Any, **kwargs: Any) -> Any:
+            return getattr(self.load(), name)(*args, **kwargs)
+
+        call.__name__ = name
+        return call
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for attributes not defined on LazyController itself
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+
+def controller_method(
+    controller: Any, name: str, coroutine: bool = False
+) -> Callable[..., Any]:
+    """Get a controller method without forcing a LazyController to load."""
+    if isinstance(controller, LazyController):
+        return controller.method(name, coroutine)
+    return getattr(controller, name)
@@ -1,19 +1,40 @@
 # src/controllers/power_controller.py
 
-import subprocess
+import asyncio
 import ctypes
-from typing import List, Dict
-
-from src.utils import get_logger, PowerControlError, handle_error
+from typing import List, Dict, Optional
+
+from src.controllers.power_plans import PowerPlanCatalog
+from src.utils import (
+    get_logger,
+    CommandError,
+    CommandRunner,
+    EventBus,
+    PowerControlError,
+    command_runner,
+    event_bus,
+)
 
 logger = get_logger(__name__)
 
 
 class PowerController:
-    def __init__(self):
-        self.power_plans = self._get_power_plans()
-
-    def shutdown(self) -> Dict[str, str]:
+    """
+    Power actions and power plans.
+
+    External commands run through an async CommandRunner, so the methods are
+    coroutines and never block the event loop while a command runs.
+    Power plan switches are published to the ``power`` topic of the event bus.
+    """
+
+    def __init__(
+        self, runner: Optional[CommandRunner] = None, events: Optional[EventBus] = None
+    ):
+        self.runner = runner or command_runner
+        self.events = events or event_bus
+        self.catalog = PowerPlanCatalog(self.runner)
+
+    async def shutdown(self) -> Dict[str, str]:
         """
         Shut down the system.
 
@@ -22,13 +43,13 @@ class PowerController:
         """
         try:
             logger.info("Initiating system shutdown")
-            subprocess.run(["shutdown", "/s", "/t", "0"], check=True)
+            await self.runner.run(["shutdown", "/s", "/t", "0"])
             return {"status": "success", "message": "Shutdown initiated"}
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Failed to initiate shutdown: {str(e)}")
+        except CommandError as e:
+            logger.error("Failed to initiate shutdown: %s", e)
             raise PowerControlError(f"Failed to initiate shutdown: {str(e)}")
 
-    def restart(self) -> Dict[str, str]:
+    async def restart(self) -> Dict[str, str]:
         """
         Restart the system.
 
@@ -37,13 +58,13 @@ class PowerController:
         """
         try:
             logger.info("Initiating system restart")
-            subprocess.run(["shutdown", "/r", "/t", "0"], check=True)
+            await self.runner.run(["shutdown", "/r", "/t", "0"])
             return {"status": "success", "message": "Restart initiated"}
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Failed to initiate restart: {str(e)}")
+        except CommandError as e:
+            logger.error("Failed to initiate restart: %s", e)
             raise PowerControlError(f"Failed to initiate restart: {str(e)}")
 
-    def sleep(self) -> Dict[str, str]:
+    async def sleep(self) -> Dict[str, str]:
         """
         Put the system to sleep.
 
@@ -52,13 +73,14 @@ class PowerController:
         """
         try:
             logger.info("Putting system to sleep")
-            ctypes.windll.PowrProf.SetSuspendState(0, 1, 0)
+            # SetSuspendState only returns after the system wakes up again
+            await asyncio.to_thread(ctypes.windll.PowrProf.SetSuspendState, 0, 1, 0)
             return {"status": "success", "message": "Sleep mode initiated"}
         except Exception as e:
-            logger.error(f"Failed to initiate sleep mode: {str(e)}")
+            logger.error("Failed to initiate sleep mode: %s", e)
             raise PowerControlError(f"Failed to initiate sleep mode: {str(e)}")
 
-    def hibernate(self) -> Dict[str, str]:
+    async def hibernate(self) -> Dict[str, str]:
         """
         Put the system into hibernation.
 
@@ -67,61 +89,62 @@ class PowerController:
         """
         try:
             logger.info("Putting system into hibernation")
-            subprocess.run(["shutdown", "/h"], check=True)
+            await self.runner.run(["shutdown", "/h"])
             return {"status": "success", "message": "Hibernation initiated"}
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Failed to initiate hibernation: {str(e)}")
+        except CommandError as e:
+            logger.error("Failed to initiate hibernation: %s", e)
             raise PowerControlError(f"Failed to initiate hibernation: {str(e)}")
 
-    def _get_power_plans(self) -> List[Dict[str, str]]:
+    async def get_power_plans(self) -> List[Dict[str, str]]:
         """
         Get the list of available power plans.
 
         Returns:
-            List[Dict[str, str]]: A list of dictionaries containing power plan information.
+            List[Dict[str, str]]: A list of dictionaries containing power plan
+                information; the active plan has ``"active": True``.
         """
         try:
-            output = subprocess.check_output(
-                ["powercfg", "/list"], universal_newlines=True
-            )
-            plans = []
-            for line in output.split("\n"):
-                if "GUID" in line:
-                    guid = line.split(":")[1].split("(")[0].strip()
-                    name = line.split("(")[1].split(")")[0].strip()
-                    plans.append({"guid": guid, "name": name})
-            return plans
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Failed to get power plans: {str(e)}")
+            return await self.catalog.plans()
+        except CommandError as e:
+            logger.error("Failed to get power plans: %s", e)
             return []
 
-    def get_power_plans(self) -> List[Dict[str, str]]:
-        """
-        Get the list of available power plans.
-
-        Returns:
-            List[Dict[str, str]]: A list of dictionaries containing power plan information.
-        """
-        return self.power_plans
-
-    def set_power_plan(self, guid: str) -> Dict[str, str]:
+    async def set_power_plan(self, guid: str) -> Dict[str, str]:
         """
         Set the active power plan.
 
         Args:
-            guid (str): The GUID of the power plan to set.
+            guid (str): The GUID or name of the power plan to set.
 
         Returns:
             Dict[str, str]: A dictionary with the status of the operation.
 
         Raises:
-            PowerControlError: If there's an error setting the power plan.
+            PowerControlError: If the plan is unknown or there's an error setting it.
         """
         try:
-            logger.info(f"Setting power plan to GUID: {guid}")
-            subprocess.run(["powercfg", "/setactive", guid], check=True)
+            try:
+                plan = await self.catalog.resolve(guid)
+            except CommandError as e:
+                # Without a listing the plan cannot be checked; powercfg validates it instead
+                logger.warning("Cannot validate power plan %s: %s", guid, e)
+                plan = {"guid": guid}
+            if plan is None:
+                raise PowerControlError(f"Unknown power plan: {guid}")
+
+            logger.info("Setting power plan to GUID: %s", plan['guid'])
+            await self.runner.run(["powercfg", "/setactive", plan["guid"]])
+            self.catalog.mark_active(plan["guid"])
+            self.events.publish(
+                "power",
+                {"type": "plan_changed", "guid": plan["guid"], "name": plan.get("name")},
+                key="plan",
+            )
             return {"status": "success", "message": f"Power plan set to {guid}"}
-        except subprocess.CalledProcessError as e:
+        except PowerControlError as e:
+            logger.error(str(e))
+            raise
+        except CommandError as e:
             error_msg = f"Failed to set power plan: {str(e)}"
             logger.error(error_msg)
             raise PowerControlError(error_msg)
@@ -130,14 +153,18 @@ class PowerController:
             logger.error(error_msg)
             raise PowerControlError(error_msg)
 
+    def invalidate_power_plans(self):
+        """Re-list the power plans on next use, e.g. after they were changed outside the server."""
+        self.catalog.invalidate()
+
 
 # Example usage
 if __name__ == "__main__":
     controller = PowerController()
     print("Available power plans:")
-    for plan in controller.get_power_plans():
+    for plan in asyncio.run(controller.get_power_plans()):
         print(f"Name: {plan['name']}, GUID: {plan['guid']}")
 
     # Uncomment to test (be careful with shutdown/restart/sleep/hibernate commands!)
-    # print(controller.set_power_plan("381b4222-f694-41f0-9685-ff5bb260df2e"))  # Balanced plan GUID
-    # print(controller.sleep())
+    # print(asyncio.run(controller.set_power_plan("381b4222-f694-41f0-9685-ff5bb260df2e")))  # Balanced plan GUID
+    # print(asyncio.run(controller.sleep()))
@@ -0,0 +1,107 @@
+# src/controllers/power_plans.py
+
+import asyncio
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+from src.config import settings
+from src.utils import get_logger, CommandRunner
+
+logger = get_logger(__name__)
+
+# One line of `powercfg /list`, e.g.
+# "Power Scheme GUID: 381b4222-f694-41f0-9685-ff5bb260df2e  (Balanced) *"
+_PLAN_LINE = re.compile(
+    r"GUID:\s*(?P<guid>[0-9a-fA-F-]{36})\s*\((?P<name>[^)]*)\)\s*(?P<active>\*)?"
+)
+
+
+def parse_power_plans(output: str) -> Tuple[List[Dict[str, str]], Optional[str]]:
+    """
+    Parse the output of ``powercfg /list`` in a single pass.
+
+    Returns:
+        Tuple[List[Dict[str, str]], Optional[str]]: The plans as ``{"guid", "name"}``
+            dictionaries, and the GUID of the active plan if one is marked.
+    """
+    plans = []
+    active = None
+    for match in _PLAN_LINE.finditer(output):
+        guid = match.group("guid").lower()
+        plans.append({"guid": guid, "name": match.group("name").strip()})
+        if match.group("active"):
+            active = guid
+    return plans, active
+
+
+class PowerPlanCatalog:
+    """
+    Cached, indexed list of the power plans.
+
+    Plans are listed with ``powercfg /list`` on first use and again only
+    after ``ttl`` seconds or an explicit ``invalidate``. They are indexed by
+    GUID and by case-insensitive name, so plan changes can be validated
+    without running a command. The active plan is tracked from the listing
+    and updated by ``mark_active`` after a successful change.
+    """
+
+    def __init__(self, runner: CommandRunner, ttl: float = settings.POWER_PLAN_CACHE_TTL):
+        self.runner = runner
+        self.ttl = ttl
+        self.active: Optional[str] = None
+        self.listed_at: Optional[float] = None
+        self._plans: List[Dict[str, str]] = []
+        self._by_guid: Dict[str, Dict[str, str]] = {}
+        self._by_name: Dict[str, Dict[str, str]] = {}
+        self._lock = asyncio.Lock()
+
+    @property
+    def fresh(self) -> bool:
+        return self.listed_at is not None and time.monotonic() - self.listed_at < self.ttl
+
+    def invalidate(self):
+        self.listed_at = None
+
+    def load(self, output: str):
+        """Replace the catalog with the plans parsed from ``powercfg /list`` output."""
+        plans, active = parse_power_plans(output)
+        self._plans = plans
+        self._by_guid = {plan["guid"]: plan for plan in plans}
+        self._by_name = {plan["name"].lower(): plan for plan in plans}
+        self.active = active
+        self.listed_at = time.monotonic()
+
+    async def refresh(self, force: bool = False):
+        """
+        Re-list the plans if the catalog is stale.
+
+        Raises:
+            CommandError: If ``powercfg /list`` fails.
+        """
+        async with self._lock:
+            # A concurrent caller may have refreshed while this one waited
+            if self.fresh and not force:
+                return
+            result = await self.runner.run(["powercfg", "/list"])
+            self.load(result.stdout)
+            logger.info("Listed %s power plans", len(self._plans))
+
+    async def plans(self) -> List[Dict[str, str]]:
+        """Get the plans, each with an ``active`` flag."""
+        await self.refresh()
+        return [dict(plan, active=plan["guid"] == self.active) for plan in self._plans]
+
+    async def resolve(self, plan: str) -> Optional[Dict[str, str]]:
+        """
+        Look up a plan by GUID or name.
+
+        Returns:
+            Optional[Dict[str, str]]: The plan, or None if the listing has no such plan.
+        """
+        await self.refresh()
+        key = plan.strip().lower()
+        return self._by_guid.get(key) or self._by_name.get(key)
+
+    def mark_active(self, guid: str):
+        self.active = guid.lower()
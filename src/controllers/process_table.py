@@ -0,0 +1,275 @@
+# src/controllers/process_table.py
+
+import fnmatch
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import psutil
+
+from src.config import settings
+from src.utils import get_logger
+
+logger = get_logger(__name__)
+
+# Processes are identified by (pid, create_time) so a recycled pid is seen as a new process
+ProcessKey = Tuple[int, Optional[float]]
+# One scanned process: [pid, name, create_time, ppid]; a list so it survives JSON
+ProcessRow = List[Any]
+
+
+@dataclass
+class ProcessTableDiff:
+    """Changes between two consecutive process table snapshots."""
+
+    seq: int
+    added: List[Dict[str, Any]] = field(default_factory=list)
+    removed: List[Dict[str, Any]] = field(default_factory=list)
+    changed: List[Dict[str, Any]] = field(default_factory=list)
+    # The first scan, which lists every running process as added
+    initial: bool = False
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+class ProcessTable:
+    """
+    Cached snapshot of the running processes.
+
+    The table is refreshed by a background thread every ``refresh_interval``
+    seconds and readers are answered from the latest snapshot. A snapshot
+    older than ``max_age`` is refreshed synchronously before it is returned.
+    Each refresh is diffed against the previous snapshot by (pid, create_time).
+
+    A table in ``mirror`` mode never scans: it is filled by ``load`` with the
+    rows of another table's scans, e.g. those of another worker process.
+    """
+
+    def __init__(
+        self,
+        refresh_interval: float = settings.PROCESS_REFRESH_INTERVAL,
+        max_age: float = settings.PROCESS_MAX_AGE,
+    ):
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self.seq = 0
+        self.refreshed_at: Optional[float] = None
+        self._entries: Dict[ProcessKey, Dict[str, Any]] = {}
+        self._by_pid: Dict[int, Tuple[Dict[str, Any], Optional[psutil.Process]]] = {}
+        # Child pids by parent pid, for walking process trees without a rescan
+        self._children: Dict[int, List[int]] = {}
+        # (seq, programs) swapped as one object so readers never see a torn pair
+        self._snapshot: Tuple[int, List[Dict[str, Any]]] = (0, [])
+        self._listeners: List[Callable[[ProcessTableDiff], None]] = []
+        self._scan_listeners: List[Callable[[List[ProcessRow]], None]] = []
+        self.mirror = False
+        self._refresh_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def age(self) -> float:
+        if self.refreshed_at is None:
+            return float("inf")
+        return time.monotonic() - self.refreshed_at
+
+    def add_listener(self, listener: Callable[[ProcessTableDiff], None]):
+        """Register a callback invoked (on the refreshing thread) with every non-empty diff."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[ProcessTableDiff], None]):
+        self._listeners.remove(listener)
+
+    def add_scan_listener(self, listener: Callable[[List[ProcessRow]], None]):
+        """Register a callback invoked (on the refreshing thread) with the rows of every scan."""
+        self._scan_listeners.append(listener)
+
+    def snapshot(self, max_age: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Get the running programs from the cached snapshot.
+
+        Args:
+            max_age (Optional[float]): Staleness bound in seconds. Defaults to the table's max_age.
+
+        Returns:
+            List[Dict[str, Any]]: The shared snapshot list; callers must not modify it.
+        """
+        return self.versioned_snapshot(max_age)[1]
+
+    def versioned_snapshot(
+        self, max_age: Optional[float] = None
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Get the cached snapshot together with the sequence number it corresponds to.
+
+        Args:
+            max_age (Optional[float]): Staleness bound in seconds. Defaults to the table's max_age.
+
+        Returns:
+            Tuple[int, List[Dict[str, Any]]]: The snapshot sequence number and programs.
+        """
+        max_age = self.max_age if max_age is None else max_age
+        if self.age > max_age:
+            self._refresh_if_older(max_age)
+        return self._snapshot
+
+    def lookup(self, pid: int) -> Optional[psutil.Process]:
+        """Get the cached process handle for a pid in O(1), or None if it is not in the snapshot."""
+        item = self._by_pid.get(pid)
+        return item[1] if item else None
+
+    def get_entry(self, pid: int) -> Optional[Dict[str, Any]]:
+        item = self._by_pid.get(pid)
+        return item[0] if item else None
+
+    def descendants(self, pid: int) -> List[int]:
+        """
+        Get the pids below ``pid`` in the process tree of the cached snapshot.
+
+        Returns:
+            List[int]: Descendant pids, each listed after its parent.
+        """
+        found: List[int] = []
+        seen = {pid}
+        pending = [pid]
+        while pending:
+            for child in self._children.get(pending.pop(0), ()):
+                # pid 0 is its own parent on some platforms
+                if child not in seen:
+                    seen.add(child)
+                    found.append(child)
+                    pending.append(child)
+        return found
+
+    def match(self, pattern: str) -> List[int]:
+        """Get the pids whose name matches a case-insensitive glob (or exact name)."""
+        pattern = pattern.lower()
+        return [
+            pid
+            for pid, (entry, _) in self._by_pid.items()
+            if entry["name"] and fnmatch.fnmatchcase(entry["name"].lower(), pattern)
+        ]
+
+    def _refresh_if_older(self, max_age: float):
+        if self.mirror:
+            # Only as fresh as the last rows loaded
+            return
+        with self._refresh_lock:
+            # Another caller may have refreshed while we waited for the lock
+            if self.age > max_age:
+                self._refresh_locked(self._scan())
+
+    def refresh(self) -> ProcessTableDiff:
+        """
+        Rescan the process list and replace the snapshot.
+
+        Returns:
+            ProcessTableDiff: What changed since the previous snapshot.
+        """
+        with self._refresh_lock:
+            return self._refresh_locked(self._scan())
+
+    def load(self, rows: Iterable[ProcessRow]) -> ProcessTableDiff:
+        """
+        Replace the snapshot with the rows of a scan made elsewhere.
+
+        The table has no process handles for them, so ``lookup`` returns None.
+
+        Returns:
+            ProcessTableDiff: What changed since the previous snapshot.
+        """
+        with self._refresh_lock:
+            return self._refresh_locked((row, None) for row in rows)
+
+    def _scan(self) -> Iterator[Tuple[ProcessRow, Optional[psutil.Process]]]:
+        for proc in psutil.process_iter(["pid", "name", "create_time", "ppid"]):
+            info = proc.info
+            yield [info["pid"], info["name"], info.get("create_time"), info.get("ppid")], proc
+
+    def _refresh_locked(
+        self, scanned: Iterable[Tuple[ProcessRow, Optional[psutil.Process]]]
+    ) -> ProcessTableDiff:
+        previous = self._entries
+        entries: Dict[ProcessKey, Dict[str, Any]] = {}
+        by_pid: Dict[int, Tuple[Dict[str, Any], Optional[psutil.Process]]] = {}
+        children: Dict[int, List[int]] = {}
+        added: List[Dict[str, Any]] = []
+        changed: List[Dict[str, Any]] = []
+        rows: List[ProcessRow] = []
+
+        for row, proc in scanned:
+            pid, name, create_time, ppid = row
+            key = (pid, create_time)
+            entry = {"pid": pid, "name": name}
+            if self._scan_listeners:
+                rows.append(row)
+
+            old = previous.get(key)
+            if old is None:
+                added.append(entry)
+            elif old == entry:
+                # Reuse the unchanged entry so snapshots share objects
+                entry = old
+            else:
+                changed.append(entry)
+
+            entries[key] = entry
+            by_pid[pid] = (entry, proc)
+            # Kept out of the entry so snapshots and diffs stay as they were
+            if ppid is not None:
+                children.setdefault(ppid, []).append(pid)
+
+        removed = [entry for key, entry in previous.items() if key not in entries]
+
+        diff = ProcessTableDiff(
+            self.seq, added, removed, changed, initial=self.refreshed_at is None
+        )
+        if diff:
+            self.seq += 1
+            diff.seq = self.seq
+
+        self._entries = entries
+        self._by_pid = by_pid
+        self._children = children
+        self._snapshot = (self.seq, list(entries.values()))
+        self.refreshed_at = time.monotonic()
+
+        if diff:
+            for listener in list(self._listeners):
+                try:
+                    listener(diff)
+                except Exception as e:
+                    logger.error("Process table listener failed: %s", e)
+        for listener in list(self._scan_listeners):
+            try:
+                listener(rows)
+            except Exception as e:
+                logger.error("Process table scan listener failed: %s", e)
+        return diff
+
+    def start(self):
+        """Start refreshing the table in a background thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="nebulalink-process-table", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error("Failed to refresh process table: %s", e)
+            if self._stop_event.wait(self.refresh_interval):
+                break
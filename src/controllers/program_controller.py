@@ -1,49 +1,297 @@
 # src/controllers/program_controller.py
 
+import os
 import psutil
-from typing import List, Dict
-from src.utils import get_logger, ProgramControlError
+from typing import Any, Callable, List, Dict, Optional, Tuple
+from src.utils import get_logger, ProgramControlError, EventBus, event_bus
+from src.controllers.process_table import ProcessRow, ProcessTable, ProcessTableDiff
+from src.controllers.resource_sampler import ResourceSampler
 
 logger = get_logger(__name__)
 
 
 class ProgramController:
-    def get_running_programs(self) -> List[Dict[str, str]]:
+    """
+    Running programs, their resource usage, and pausing and resuming them.
+
+    Processes starting and exiting (as seen by the process table refresh)
+    and processes paused or resumed through this controller are published
+    to the ``programs`` topic of the event bus.
+    """
+
+    def __init__(
+        self,
+        process_table: Optional[ProcessTable] = None,
+        sampler: Optional[ResourceSampler] = None,
+        events: Optional[EventBus] = None,
+    ):
+        self.process_table = process_table or ProcessTable()
+        self.sampler = sampler or ResourceSampler()
+        self.events = events or event_bus
+        self.process_table.add_listener(self._publish_changes)
+
+    def start(self):
+        """Start refreshing the process table and sampling resource usage in the background."""
+        self.process_table.start()
+        self.sampler.start()
+
+    def stop(self):
+        self.process_table.stop()
+        self.sampler.stop()
+
+    def follow(self):
+        """
+        Serve the process table from rows scanned by another controller instead of scanning.
+
+        Used by the workers that do not own machine state: they get the
+        owner's scans through ``load_processes`` and sample nothing themselves.
+        """
+        self.process_table.mirror = True
+
+    def load_processes(self, rows: List[ProcessRow]):
+        """Replace the process table with the rows of another controller's scan."""
+        self.process_table.load(rows)
+
+    def add_scan_listener(self, listener: Callable[[List[ProcessRow]], None]):
+        """Call listener with the rows of every process table scan (from the refresh thread)."""
+        self.process_table.add_scan_listener(listener)
+
+    def get_running_programs(
+        self, max_age: Optional[float] = None
+    ) -> List[Dict[str, str]]:
         try:
-            programs = []
-            for proc in psutil.process_iter(["pid", "name"]):
-                programs.append({"pid": proc.info["pid"], "name": proc.info["name"]})
-            return programs
+            return self.process_table.snapshot(max_age)
         except Exception as e:
-            logger.error(f"Failed to get running programs: {str(e)}")
+            logger.error("Failed to get running programs: %s", e)
             raise ProgramControlError(f"Failed to get running programs: {str(e)}")
 
+    def get_program_usage(
+        self, sort: str = "cpu", limit: int = 20, name: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Get the programs using the most CPU, memory, threads or I/O.
+
+        Answered from the latest resource sample without calling psutil, except
+        before the first sample, which is then taken here.
+
+        Args:
+            sort (str): "cpu", "memory", "threads", "read" or "write".
+            limit (int): Number of programs returned.
+            name (Optional[str]): Only programs matching this case-insensitive glob.
+
+        Returns:
+            Dict[str, Any]: The programs, largest first, and the age of the sample in seconds.
+
+        Raises:
+            ProgramControlError: If the sort key is unknown or sampling fails.
+        """
+        try:
+            sample, programs = self.sampler.query(sort, int(limit), name)
+        except ValueError as e:
+            raise ProgramControlError(str(e))
+        except Exception as e:
+            logger.error("Failed to get program usage: %s", e)
+            raise ProgramControlError(f"Failed to get program usage: {str(e)}")
+        return {
+            "age": round(self.sampler.clock() - sample.taken_at, 3),
+            "total": len(sample),
+            "programs": programs,
+        }
+
+    def get_programs_snapshot(
+        self, max_age: Optional[float] = None
+    ) -> Tuple[int, List[Dict[str, str]]]:
+        """
+        Get the running programs together with the process table sequence number.
+
+        Returns:
+            Tuple[int, List[Dict[str, str]]]: The sequence number and the programs.
+        """
+        try:
+            return self.process_table.versioned_snapshot(max_age)
+        except Exception as e:
+            logger.error("Failed to get running programs: %s", e)
+            raise ProgramControlError(f"Failed to get running programs: {str(e)}")
+
+    def add_change_listener(self, listener: Callable[[ProcessTableDiff], None]):
+        """Call listener with every change to the process table (from the refresh thread)."""
+        self.process_table.add_listener(listener)
+
+    def remove_change_listener(self, listener: Callable[[ProcessTableDiff], None]):
+        self.process_table.remove_listener(listener)
+
+    def _publish_changes(self, diff: ProcessTableDiff):
+        # Called on the process table's refresh thread. A mirror leaves
+        # starts and exits to the owner, which relays them to every worker.
+        if diff.initial or self.process_table.mirror:
+            return
+        for entry in diff.added:
+            self._publish("started", entry["pid"], entry["name"])
+        for entry in diff.removed:
+            self._publish("exited", entry["pid"], entry["name"])
+
+    def _publish(self, event_type: str, pid: int, name: Optional[str] = None):
+        if name is None:
+            entry = self.process_table.get_entry(pid)
+            name = entry["name"] if entry else None
+        self.events.publish(
+            "programs", {"type": event_type, "pid": pid, "name": name}, key=pid
+        )
+
     def pause_program(self, pid: int) -> Dict[str, str]:
         try:
-            process = psutil.Process(pid)
+            process = self._get_process(pid)
             process.suspend()
-            logger.info(f"Paused program with PID {pid}")
+            logger.info("Paused program with PID %s", pid)
+            self._publish("paused", pid)
             return {"status": "success", "message": f"Program with PID {pid} paused"}
         except psutil.NoSuchProcess:
-            logger.error(f"No process found with PID {pid}")
+            logger.error("No process found with PID %s", pid)
             raise ProgramControlError(f"No process found with PID {pid}")
         except Exception as e:
-            logger.error(f"Failed to pause program: {str(e)}")
+            logger.error("Failed to pause program: %s", e)
             raise ProgramControlError(f"Failed to pause program: {str(e)}")
 
     def resume_program(self, pid: int) -> Dict[str, str]:
         try:
-            process = psutil.Process(pid)
+            process = self._get_process(pid)
             process.resume()
-            logger.info(f"Resumed program with PID {pid}")
+            logger.info("Resumed program with PID %s", pid)
+            self._publish("resumed", pid)
             return {"status": "success", "message": f"Program with PID {pid} resumed"}
         except psutil.NoSuchProcess:
-            logger.error(f"No process found with PID {pid}")
+            logger.error("No process found with PID %s", pid)
             raise ProgramControlError(f"No process found with PID {pid}")
         except Exception as e:
-            logger.error(f"Failed to resume program: {str(e)}")
+            logger.error("Failed to resume program: %s", e)
             raise ProgramControlError(f"Failed to resume program: {str(e)}")
 
+    def pause_programs(
+        self,
+        pids: Optional[List[int]] = None,
+        name: Optional[str] = None,
+        root: Optional[int] = None,
+        include_children: bool = False,
+        max_age: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Suspend several processes in one call.
+
+        Select the processes with exactly one of ``pids``, ``name`` (a glob
+        such as ``"game*.exe"``) or ``root``. With ``include_children`` the
+        descendants of every selected process are included. Parents are
+        suspended before their children so a launcher cannot start new
+        processes while its tree is being paused.
+
+        Args:
+            pids (Optional[List[int]]): Process IDs.
+            name (Optional[str]): Case-insensitive process name or glob.
+            root (Optional[int]): Root of a process tree.
+            include_children (bool): Also suspend the descendants of the selected processes.
+            max_age (Optional[float]): Staleness bound in seconds of the process table used
+                to resolve names and children.
+
+        Returns:
+            Dict[str, Any]: Per-pid results and the number of processes paused and failed.
+
+        Raises:
+            ProgramControlError: If the selection is invalid or matches no process.
+        """
+        targets = self._select(pids, name, root, include_children, max_age)
+        return self._apply_bulk(targets, "suspend", "paused")
+
+    def resume_programs(
+        self,
+        pids: Optional[List[int]] = None,
+        name: Optional[str] = None,
+        root: Optional[int] = None,
+        include_children: bool = False,
+        max_age: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Resume several processes in one call.
+
+        Takes the same selection as ``pause_programs``. Children are resumed
+        before their parents.
+        """
+        targets = self._select(pids, name, root, include_children, max_age)
+        return self._apply_bulk(list(reversed(targets)), "resume", "resumed")
+
+    def _select(
+        self,
+        pids: Optional[List[int]],
+        name: Optional[str],
+        root: Optional[int],
+        include_children: bool,
+        max_age: Optional[float],
+    ) -> List[int]:
+        if sum(selector is not None for selector in (pids, name, root)) != 1:
+            raise ProgramControlError("Select processes with exactly one of pids, name or root")
+        if pids is not None and not pids:
+            raise ProgramControlError("pids must list at least one process ID")
+        if name is not None or include_children:
+            # Names and children are resolved from the cached process index
+            self.process_table.versioned_snapshot(max_age)
+        if pids is not None:
+            selected = [int(pid) for pid in pids]
+        elif name is not None:
+            selected = self.process_table.match(name)
+        else:
+            selected = [int(root)]
+        if not selected:
+            raise ProgramControlError(f"No process found matching {name}")
+
+        targets: List[int] = []
+        seen = set()
+        for pid in selected:
+            tree = [pid]
+            if include_children:
+                tree += self.process_table.descendants(pid)
+            for target in tree:
+                if target not in seen:
+                    seen.add(target)
+                    targets.append(target)
+        return targets
+
+    def _apply_bulk(self, pids: List[int], operation: str, done: str) -> Dict[str, Any]:
+        results = []
+        for pid in pids:
+            result: Dict[str, Any] = {"pid": pid}
+            entry = self.process_table.get_entry(pid)
+            if entry:
+                result["name"] = entry["name"]
+            try:
+                if operation == "suspend" and pid == os.getpid():
+                    raise ProgramControlError("Refusing to suspend the server process")
+                getattr(self._get_process(pid), operation)()
+                result["status"] = done
+                self._publish(done, pid, result.get("name"))
+            except psutil.NoSuchProcess:
+                result.update(status="error", error=f"No process found with PID {pid}")
+            except psutil.AccessDenied:
+                result.update(status="error", error=f"Access denied to PID {pid}")
+            except Exception as e:
+                result.update(status="error", error=str(e))
+            results.append(result)
+
+        succeeded = sum(result["status"] == done for result in results)
+        logger.info("%s %s of %s programs", done.capitalize(), succeeded, len(results))
+        if succeeded == len(results):
+            status = "success"
+        else:
+            status = "partial" if succeeded else "error"
+        return {
+            "status": status,
+            done: succeeded,
+            "failed": len(results) - succeeded,
+            "results": results,
+        }
+
+    def _get_process(self, pid: int) -> psutil.Process:
+        # Reuse the handle from the process table; fall back to a fresh lookup
+        # for processes started since the last refresh
+        return self.process_table.lookup(pid) or psutil.Process(pid)
+
 
 if __name__ == "__main__":
     controller = ProgramController()
@@ -0,0 +1,223 @@
+# src/controllers/resource_sampler.py
+
+import fnmatch
+import threading
+import time
+from array import array
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import psutil
+
+from src.config import settings
+from src.utils import get_logger
+
+logger = get_logger(__name__)
+
+# io_counters is not available on macOS
+_HAS_IO = hasattr(psutil.Process, "io_counters")
+_ATTRS = ["pid", "name", "create_time", "cpu_times", "memory_info", "num_threads"]
+if _HAS_IO:
+    _ATTRS.append("io_counters")
+
+# Columns that queries can sort by, and the sample column behind each
+SORT_KEYS = {
+    "cpu": "cpu_percent",
+    "memory": "rss",
+    "threads": "threads",
+    "read": "read_rate",
+    "write": "write_rate",
+}
+
+
+class ResourceSample:
+    """
+    Resource usage of every process at one point in time, stored by column.
+
+    Each metric is one ``array`` indexed by row, so a sample of a few hundred
+    processes is a handful of compact buffers instead of a dict per process.
+    Rates (CPU percent, I/O bytes per second) are computed against the
+    previous sample when the sample is built. Rankings are computed once
+    per sample and metric, so top-N queries only slice them.
+    """
+
+    def __init__(self, taken_at: float):
+        self.taken_at = taken_at
+        self.pids = array("q")
+        self.create_times = array("d")
+        self.names: List[str] = []
+        # Cumulative user + system CPU seconds; -1 when access was denied
+        self.cpu_times = array("d")
+        self.rss = array("Q")
+        self.threads = array("q")
+        self.read_bytes = array("Q")
+        self.write_bytes = array("Q")
+        # Rates against the previous sample; 0 for processes it did not have
+        self.cpu_percent = array("d")
+        self.read_rate = array("d")
+        self.write_rate = array("d")
+        self._orders: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.pids)
+
+    def add(self, info: Dict[str, Any]):
+        cpu = info.get("cpu_times")
+        memory = info.get("memory_info")
+        io = info.get("io_counters")
+        self.pids.append(info["pid"])
+        self.create_times.append(info.get("create_time") or 0.0)
+        self.names.append(info.get("name") or "")
+        self.cpu_times.append(cpu.user + cpu.system if cpu else -1.0)
+        self.rss.append(memory.rss if memory else 0)
+        self.threads.append(info.get("num_threads") or 0)
+        self.read_bytes.append(io.read_bytes if io else 0)
+        self.write_bytes.append(io.write_bytes if io else 0)
+
+    def compute_rates(self, previous: Optional["ResourceSample"]):
+        """Fill the rate columns from the deltas to ``previous``."""
+        if previous is None or self.taken_at <= previous.taken_at:
+            # 8 zero bytes per row: a column of 0.0 doubles
+            zeros = bytes(8 * len(self))
+            self.cpu_percent = array("d", zeros)
+            self.read_rate = array("d", zeros)
+            self.write_rate = array("d", zeros)
+            return
+
+        # Row of each process in the previous sample; -1 if it is new
+        rows = {
+            key: row for row, key in enumerate(zip(previous.pids, previous.create_times))
+        }
+        matched = [rows.get(key, -1) for key in zip(self.pids, self.create_times)]
+        elapsed = self.taken_at - previous.taken_at
+
+        def rate(now: array, before: array, scale: float) -> array:
+            return array(
+                "d",
+                [
+                    (value - before[row]) * scale
+                    if row >= 0 and value >= 0 and before[row] >= 0
+                    else 0.0
+                    for value, row in zip(now, matched)
+                ],
+            )
+
+        self.cpu_percent = rate(self.cpu_times, previous.cpu_times, 100.0 / elapsed)
+        self.read_rate = rate(self.read_bytes, previous.read_bytes, 1.0 / elapsed)
+        self.write_rate = rate(self.write_bytes, previous.write_bytes, 1.0 / elapsed)
+
+    def order(self, column: str) -> List[int]:
+        """Rows sorted by a column, largest first; computed once per sample and column."""
+        rows = self._orders.get(column)
+        if rows is None:
+            values = getattr(self, column)
+            rows = self._orders[column] = sorted(
+                range(len(self)), key=values.__getitem__, reverse=True
+            )
+        return rows
+
+    def row(self, index: int) -> Dict[str, Any]:
+        return {
+            "pid": self.pids[index],
+            "name": self.names[index],
+            "cpu_percent": round(self.cpu_percent[index], 1),
+            "rss": self.rss[index],
+            "threads": self.threads[index],
+            "read_bytes_per_sec": round(self.read_rate[index]),
+            "write_bytes_per_sec": round(self.write_rate[index]),
+        }
+
+
+class ResourceSampler:
+    """
+    Samples CPU, memory, thread and I/O usage of all processes on a fixed cadence.
+
+    A background thread takes one sample every ``interval`` seconds with a
+    single ``psutil.process_iter`` pass. Queries read the latest sample,
+    which is replaced as a whole, so they never wait for psutil.
+    """
+
+    def __init__(
+        self,
+        interval: float = settings.RESOURCE_SAMPLE_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.interval = interval
+        self.clock = clock
+        self.latest: Optional[ResourceSample] = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sample(self) -> ResourceSample:
+        """Take a sample now and make it the latest."""
+        with self._lock:
+            sample = ResourceSample(self.clock())
+            for proc in psutil.process_iter(_ATTRS):
+                sample.add(proc.info)
+            sample.compute_rates(self.latest)
+            self.latest = sample
+            return sample
+
+    def query(
+        self, sort: str = "cpu", limit: int = 20, name: Optional[str] = None
+    ) -> Tuple[ResourceSample, List[Dict[str, Any]]]:
+        """
+        Get the processes using the most of a resource from the latest sample.
+
+        Args:
+            sort (str): One of SORT_KEYS.
+            limit (int): Number of processes returned.
+            name (Optional[str]): Only processes matching this case-insensitive glob.
+
+        Returns:
+            Tuple[ResourceSample, List[Dict[str, Any]]]: The sample and the rows, largest first.
+
+        Raises:
+            ValueError: If ``sort`` is not a known key.
+        """
+        column = SORT_KEYS.get(sort)
+        if column is None:
+            raise ValueError(
+                f"Unknown sort key: {sort}. Use one of: {', '.join(SORT_KEYS)}"
+            )
+        sample = self.latest
+        if sample is None:
+            sample = self.sample()
+        rows = sample.order(column)
+        if name is not None:
+            pattern = name.lower()
+            names = sample.names
+            rows = (
+                row for row in rows if fnmatch.fnmatchcase(names[row].lower(), pattern)
+            )
+        result = []
+        for row in rows:
+            if len(result) >= limit:
+                break
+            result.append(sample.row(row))
+        return sample, result
+
+    def start(self):
+        """Start sampling in a background thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="nebulalink-resource-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while True:
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error("Failed to sample process resources: %s", e)
+            if self._stop_event.wait(self.interval):
+                break
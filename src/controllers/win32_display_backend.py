@@ -0,0 +1,155 @@
+# src/controllers/win32_display_backend.py
+
+import ctypes
+import ctypes.wintypes
+import win32api  # type: ignore
+import win32con  # type: ignore
+from typing import List, Dict, Any, Optional
+from src.controllers.display_backend import DisplayBackend
+from src.utils import DisplayControlError
+
+
+# Windows API structures and constants
+class DEVMODE(ctypes.Structure):
+    _fields_ = [
+        ("dmDeviceName", ctypes.c_wchar * 32),
+        ("dmSpecVersion", ctypes.wintypes.WORD),
+        ("dmDriverVersion", ctypes.wintypes.WORD),
+        ("dmSize", ctypes.wintypes.WORD),
+        ("dmDriverExtra", ctypes.wintypes.WORD),
+        ("dmFields", ctypes.wintypes.DWORD),
+        ("dmPositionX", ctypes.wintypes.LONG),
+        ("dmPositionY", ctypes.wintypes.LONG),
+        ("dmDisplayOrientation", ctypes.wintypes.DWORD),
+        ("dmDisplayFixedOutput", ctypes.wintypes.DWORD),
+        ("dmColor", ctypes.wintypes.SHORT),
+        ("dmDuplex", ctypes.wintypes.SHORT),
+        ("dmYResolution", ctypes.wintypes.SHORT),
+        ("dmTTOption", ctypes.wintypes.SHORT),
+        ("dmCollate", ctypes.wintypes.SHORT),
+        ("dmFormName", ctypes.c_wchar * 32),
+        ("dmLogPixels", ctypes.wintypes.WORD),
+        ("dmBitsPerPel", ctypes.wintypes.DWORD),
+        ("dmPelsWidth", ctypes.wintypes.DWORD),
+        ("dmPelsHeight", ctypes.wintypes.DWORD),
+        ("dmDisplayFlags", ctypes.wintypes.DWORD),
+        ("dmDisplayFrequency", ctypes.wintypes.DWORD),
+        ("dmICMMethod", ctypes.wintypes.DWORD),
+        ("dmICMIntent", ctypes.wintypes.DWORD),
+        ("dmMediaType", ctypes.wintypes.DWORD),
+        ("dmDitherType", ctypes.wintypes.DWORD),
+        ("dmReserved1", ctypes.wintypes.DWORD),
+        ("dmReserved2", ctypes.wintypes.DWORD),
+        ("dmPanningWidth", ctypes.wintypes.DWORD),
+        ("dmPanningHeight", ctypes.wintypes.DWORD),
+    ]
+
+
+class Win32DisplayBackend(DisplayBackend):
+    """Display access through EnumDisplayDevices and ChangeDisplaySettingsEx."""
+
+    def enumerate(self) -> List[Dict[str, Any]]:
+        displays = []
+        i = 0
+        while True:
+            try:
+                device = win32api.EnumDisplayDevices(None, i)
+                settings = win32api.EnumDisplaySettings(
+                    device.DeviceName, win32con.ENUM_CURRENT_SETTINGS
+                )
+                displays.append(
+                    {
+                        "name": device.DeviceName,
+                        "friendly_name": device.DeviceString,
+                        "width": settings.PelsWidth,
+                        "height": settings.PelsHeight,
+                        "refresh_rate": settings.DisplayFrequency,
+                    }
+                )
+                i += 1
+            except win32api.error:
+                break
+        return displays
+
+    def list_modes(self, device_name: str) -> List[Dict[str, Any]]:
+        modes = []
+        i = 0
+        while True:
+            try:
+                settings = win32api.EnumDisplaySettings(device_name, i)
+            except win32api.error:
+                break
+            if not settings.PelsWidth:
+                # Some drivers end the list with an empty mode instead of an error
+                break
+            modes.append(
+                {
+                    "width": settings.PelsWidth,
+                    "height": settings.PelsHeight,
+                    "refresh_rate": settings.DisplayFrequency,
+                }
+            )
+            i += 1
+        return modes
+
+    def _change_settings(
+        self,
+        device_name: str,
+        devmode: DEVMODE,
+        flags: int = win32con.CDS_UPDATEREGISTRY,
+    ) -> int:
+        devmode.dmSize = ctypes.sizeof(DEVMODE)
+        devmode.dmDriverExtra = 0
+        return ctypes.windll.user32.ChangeDisplaySettingsExW(
+            device_name,
+            ctypes.byref(devmode),
+            None,
+            flags,
+            None,
+        )
+
+    def set_resolution(self, device_name: str, width: int, height: int):
+        devmode = DEVMODE()
+        devmode.dmFields = win32con.DM_PELSWIDTH | win32con.DM_PELSHEIGHT
+        devmode.dmPelsWidth = width
+        devmode.dmPelsHeight = height
+        result = self._change_settings(device_name, devmode)
+        if result != win32con.DISP_CHANGE_SUCCESSFUL:
+            raise DisplayControlError(f"Failed to set resolution. Error code: {result}")
+
+    def set_refresh_rate(self, device_name: str, rate: int):
+        devmode = DEVMODE()
+        devmode.dmFields = win32con.DM_DISPLAYFREQUENCY
+        devmode.dmDisplayFrequency = rate
+        result = self._change_settings(device_name, devmode)
+        if result != win32con.DISP_CHANGE_SUCCESSFUL:
+            raise DisplayControlError(
+                f"Failed to set refresh rate. Error code: {result}"
+            )
+
+    def stage_mode(
+        self, device_name: str, width: int, height: int, refresh_rate: Optional[int]
+    ):
+        devmode = DEVMODE()
+        devmode.dmFields = win32con.DM_PELSWIDTH | win32con.DM_PELSHEIGHT
+        devmode.dmPelsWidth = width
+        devmode.dmPelsHeight = height
+        if refresh_rate is not None:
+            devmode.dmFields |= win32con.DM_DISPLAYFREQUENCY
+            devmode.dmDisplayFrequency = refresh_rate
+        # CDS_NORESET writes the mode to the registry without switching to it
+        result = self._change_settings(
+            device_name, devmode, win32con.CDS_UPDATEREGISTRY | win32con.CDS_NORESET
+        )
+        if result != win32con.DISP_CHANGE_SUCCESSFUL:
+            raise DisplayControlError(
+                f"Failed to stage mode for {device_name}. Error code: {result}"
+            )
+
+    def commit(self):
+        # A null device and mode apply the registry settings of every display at once
+        result = ctypes.windll.user32.ChangeDisplaySettingsExW(None, None, None, 0, None)
+        if result != win32con.DISP_CHANGE_SUCCESSFUL:
+            raise DisplayControlError(
+                f"Failed to apply display layout. Error code: {result}"
+            )
@@ -1,5 +1,6 @@
 # src/run_server.py
 
+import argparse
 import asyncio
 import os
 import sys
@@ -8,11 +9,14 @@ import sys
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.insert(0, project_root)
 
+from src.config import settings
 from src.server.nebulalink_server import NebulaLinkServer
+from src.server.workers import run_workers
+from src.utils import configure_logging
 
 
-async def main():
-    server = NebulaLinkServer("localhost", 8765)
+async def main(host: str, port: int):
+    server = NebulaLinkServer(host, port)
     await server.start()
     print("Server is running. Press Ctrl+C to stop.")
     try:
@@ -24,4 +28,19 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Run the NebulaLink server")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.WORKERS,
+        help="Number of worker processes sharing the port (Linux/macOS only)",
+    )
+    args = parser.parse_args()
+    configure_logging()
+
+    if args.workers > 1:
+        run_workers(args.workers, args.host, args.port)
+    else:
+        asyncio.run(main(args.host, args.port))
@@ -1,5 +1,6 @@
 # src/server/__init__.py
 
 from .nebulalink_server import NebulaLinkServer, run_server
+from .workers import WorkerPool, run_workers
 
-__all__ = ['NebulaLinkServer', 'run_server']
\ No newline at end of file
+__all__ = ['NebulaLinkServer', 'run_server', 'WorkerPool', 'run_workers']
\ No newline at end of file
@@ -0,0 +1,151 @@
+# src/server/admission.py
+
+import math
+import time
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Tuple
+
+from src.config import settings
+
+# (tokens per second, burst) of a token bucket
+RateLimit = Tuple[float, int]
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter.
+
+    The bucket holds up to ``burst`` tokens and refills at ``rate`` tokens per
+    second; each request takes one. Refilling is computed from the elapsed
+    time when a token is taken, so idle buckets cost nothing.
+    """
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: int, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """
+        Take a token if one is available.
+
+        Returns:
+            float: 0.0 if a token was taken, otherwise the seconds until one is available.
+        """
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+
+class ClientLimiter:
+    """Token buckets of one connection: one for all its messages and one per action class."""
+
+    def __init__(self, admission: "AdmissionControl"):
+        self.admission = admission
+        now = admission.clock()
+        self.messages = (
+            TokenBucket(*admission.client_rate, now) if admission.client_rate else None
+        )
+        self.classes: Dict[str, TokenBucket] = {}
+
+    def check_message(self) -> float:
+        """Seconds the client must wait before this message is accepted; 0.0 to accept it."""
+        if self.messages is None:
+            return 0.0
+        return self.messages.take(self.admission.clock())
+
+    def check_action(self, action: str) -> float:
+        """Seconds the client must wait before ``action`` is accepted; 0.0 to accept it."""
+        action_class = self.admission.action_classes.get(action)
+        limit = self.admission.action_rates.get(action_class)
+        if limit is None:
+            return 0.0
+        now = self.admission.clock()
+        bucket = self.classes.get(action_class)
+        if bucket is None:
+            bucket = self.classes[action_class] = TokenBucket(*limit, now)
+        return bucket.take(now)
+
+    def check_batch(self, actions: Iterable[Any]) -> Dict[str, float]:
+        """
+        Take one token per action class used by a batch, however many of its actions it has.
+
+        Returns:
+            Dict[str, float]: Seconds the client must wait, by action class, for the
+            classes that were not accepted.
+        """
+        first: Dict[str, str] = {}
+        for action in actions:
+            action_class = self.admission.action_classes.get(action)
+            if action_class is not None:
+                first.setdefault(action_class, action)
+        throttled = {}
+        for action_class, action in first.items():
+            retry_after = self.check_action(action)
+            if retry_after:
+                throttled[action_class] = retry_after
+        return throttled
+
+
+class AdmissionControl:
+    """
+    Connection and request limits of a server.
+
+    Holds the configuration shared by all connections; each connection gets
+    its own ClientLimiter with the token buckets. A limit set to None (or an
+    action class without a rate) is not enforced.
+    """
+
+    def __init__(
+        self,
+        max_clients: Optional[int] = settings.MAX_CLIENTS,
+        client_rate: Optional[RateLimit] = settings.CLIENT_RATE_LIMIT,
+        action_rates: Mapping[str, RateLimit] = settings.ACTION_CLASS_RATE_LIMITS,
+        action_classes: Mapping[str, str] = settings.ACTION_CLASSES,
+        full_retry_after: float = settings.SERVER_FULL_RETRY_AFTER,
+        busy_retry_after: float = settings.IN_FLIGHT_RETRY_AFTER,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_clients = max_clients
+        self.client_rate = client_rate
+        self.action_rates = dict(action_rates)
+        self.action_classes = dict(action_classes)
+        self.full_retry_after = full_retry_after
+        self.busy_retry_after = busy_retry_after
+        self.clock = clock
+
+    def is_full(self, clients: int) -> bool:
+        return self.max_clients is not None and clients >= self.max_clients
+
+    def limiter(self) -> ClientLimiter:
+        return ClientLimiter(self)
+
+
+def throttled_reply(data: Any, reason: str, retry_after: float) -> Dict[str, Any]:
+    """
+    Build the reply to a rejected request.
+
+    Args:
+        data (Any): The rejected request.
+        reason (str): Which limit was hit: "rate", "action_rate" or "in_flight".
+        retry_after (float): Seconds the client should wait before retrying.
+
+    Returns:
+        Dict[str, Any]: The reply, naming the action and carrying the request's ``id``.
+    """
+    reply = {
+        "error": "Too many requests",
+        "reason": reason,
+        # Rounded up so a client retrying after exactly this long is accepted
+        "retry_after": math.ceil(retry_after * 1000) / 1000,
+    }
+    if isinstance(data, dict):
+        reply["action"] = data.get("action")
+        if "id" in data:
+            reply["id"] = data["id"]
+    return reply
@@ -0,0 +1,73 @@
+# src/server/batch.py
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from src.config import settings
+from src.utils import CommandError
+
+# Reply for actions not run because an earlier action failed in stop_on_error mode
+SKIPPED = {"error": "Skipped"}
+
+
+def is_error(response: Optional[Dict[str, Any]]) -> bool:
+    return isinstance(response, dict) and "error" in response
+
+
+async def run_batch(
+    execute: Callable[[Any], Awaitable[Dict[str, Any]]],
+    actions: List[Any],
+    concurrency: int = settings.BATCH_CONCURRENCY,
+    sequential: bool = False,
+    stop_on_error: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Run the actions of a batch envelope and collect their replies in order.
+
+    Args:
+        execute (Callable[[Any], Awaitable[Dict[str, Any]]]): Executes one action message
+            and returns its reply; errors must be returned as ``{"error": ...}`` replies.
+        actions (List[Any]): The action messages.
+        concurrency (int): Maximum number of actions running at once, capped at BATCH_CONCURRENCY.
+        sequential (bool): Run actions one after another, in order.
+        stop_on_error (bool): Skip the actions that have not started once one fails.
+
+    Returns:
+        List[Dict[str, Any]]: One reply per action, in the order of ``actions``.
+
+    Raises:
+        CommandError: If the batch is malformed or exceeds BATCH_MAX_ACTIONS.
+    """
+    if not isinstance(actions, list):
+        raise CommandError("Batch actions must be a list")
+    if len(actions) > settings.BATCH_MAX_ACTIONS:
+        raise CommandError(
+            f"Batch exceeds the limit of {settings.BATCH_MAX_ACTIONS} actions"
+        )
+    if not isinstance(concurrency, int) or concurrency < 1:
+        raise CommandError("Batch concurrency must be a positive integer")
+    concurrency = min(concurrency, settings.BATCH_CONCURRENCY)
+
+    results: List[Dict[str, Any]] = [SKIPPED] * len(actions)
+
+    if sequential:
+        for index, action in enumerate(actions):
+            results[index] = await execute(action)
+            if stop_on_error and is_error(results[index]):
+                break
+        return results
+
+    semaphore = asyncio.Semaphore(concurrency)
+    failed = False
+
+    async def run(index: int, action: Any):
+        nonlocal failed
+        async with semaphore:
+            if failed:
+                return
+            results[index] = await execute(action)
+            if stop_on_error and is_error(results[index]):
+                failed = True
+
+    await asyncio.gather(*[run(index, action) for index, action in enumerate(actions)])
+    return results
@@ -0,0 +1,159 @@
+# src/server/client_connection.py
+
+import asyncio
+from collections import deque
+from enum import Enum
+from typing import Any, Deque, Dict, List, Optional
+
+import websockets
+
+from src.config import settings
+from src.server.codec import Codec, DEFAULT_CODEC
+from src.utils import get_logger
+
+logger = get_logger(__name__)
+
+# Close code used when a slow consumer is evicted (1008: policy violation)
+SLOW_CONSUMER_CLOSE_CODE = 1008
+
+
+class SlowConsumerPolicy(Enum):
+    """What to do when a client's outgoing queue is full."""
+
+    DROP_OLDEST = "drop_oldest"  # Discard the oldest queued message
+    COALESCE = "coalesce"  # Replace a queued message with the same key, else drop oldest
+    DISCONNECT = "disconnect"  # Close the connection
+
+
+class ClientConnection:
+    """
+    Outgoing side of a connected client.
+
+    Messages are appended to a bounded queue and written to the socket by a
+    dedicated writer task, so a stalled client only ever delays itself.
+    Payloads are already encoded, which lets broadcasts serialize once and
+    share the same buffer across every recipient.
+    """
+
+    def __init__(
+        self,
+        websocket: websockets.WebSocketServerProtocol,
+        max_queue: int = settings.CLIENT_QUEUE_SIZE,
+        policy: SlowConsumerPolicy = SlowConsumerPolicy(settings.SLOW_CONSUMER_POLICY),
+        codec: Codec = DEFAULT_CODEC,
+    ):
+        self.websocket = websocket
+        # Wire format negotiated for this client
+        self.codec = codec
+        self.max_queue = max_queue
+        self.policy = policy
+        # Entries are [key, payload] lists so coalescing can swap the payload in place
+        self._queue: Deque[List[Any]] = deque()
+        self._pending: Dict[str, List[Any]] = {}
+        self._ready = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+        self._closing: Optional[asyncio.Task] = None
+        self.closed = False
+        self.sent = 0
+        # Payload size of sent messages (characters for text frames)
+        self.sent_bytes = 0
+        self.dropped = 0
+        self.coalesced = 0
+        # CompressionStats when permessage-deflate was negotiated
+        self.compression = None
+        # ClientLimiter holding the connection's rate limit buckets
+        self.limiter = None
+        # Session the connection is attached to, if the client opened one
+        self.session = None
+
+    @property
+    def backlog(self) -> int:
+        return len(self._queue)
+
+    def start(self):
+        self._writer = asyncio.create_task(self._write_loop())
+
+    def enqueue(self, payload: Any, key: Optional[str] = None) -> bool:
+        """
+        Queue an encoded message for delivery without waiting for the socket.
+
+        Args:
+            payload (Any): Encoded message (str or bytes).
+            key (Optional[str]): Coalescing key; with the COALESCE policy a queued
+                message with the same key is replaced instead of appending.
+
+        Returns:
+            bool: False if the message was not queued because the client is closed or evicted.
+        """
+        if self.closed:
+            return False
+
+        if key is not None and self.policy is SlowConsumerPolicy.COALESCE:
+            entry = self._pending.get(key)
+            if entry is not None:
+                entry[1] = payload
+                self.coalesced += 1
+                return True
+
+        if len(self._queue) >= self.max_queue:
+            if self.policy is SlowConsumerPolicy.DISCONNECT:
+                self.evict()
+                return False
+            self._discard(self._queue.popleft())
+            self.dropped += 1
+
+        entry = [key, payload]
+        self._queue.append(entry)
+        if key is not None:
+            self._pending[key] = entry
+        self._ready.set()
+        return True
+
+    def _discard(self, entry: List[Any]):
+        key = entry[0]
+        if key is not None and self._pending.get(key) is entry:
+            del self._pending[key]
+
+    async def _write_loop(self):
+        try:
+            while True:
+                while not self._queue:
+                    self._ready.clear()
+                    await self._ready.wait()
+                entry = self._queue.popleft()
+                self._discard(entry)
+                await self.websocket.send(entry[1])
+                self.sent += 1
+                self.sent_bytes += len(entry[1])
+        except websockets.ConnectionClosed:
+            self.closed = True
+
+    def evict(self, code: int = SLOW_CONSUMER_CLOSE_CODE, reason: str = "slow consumer"):
+        """Disconnect the client without waiting, by default as a slow consumer."""
+        if self.closed:
+            return
+        logger.warning(
+            "Disconnecting client (%s) with %s queued messages",
+            reason,
+            len(self._queue),
+        )
+        self.closed = True
+        self._queue.clear()
+        self._pending.clear()
+        if self._writer:
+            self._writer.cancel()
+        self._closing = asyncio.create_task(
+            self.websocket.close(code, reason)
+        )
+
+    async def close(self):
+        """Stop the writer task; queued messages that were not sent are discarded."""
+        self.closed = True
+        self._queue.clear()
+        self._pending.clear()
+        if self._writer:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
@@ -0,0 +1,195 @@
+# src/server/codec.py
+
+import json
+from typing import Any, Dict, List, Optional, Union
+
+from src.utils import CommandError
+
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack  # type: ignore
+except ImportError:
+    msgpack = None
+
+try:
+    import cbor2  # type: ignore
+except ImportError:
+    cbor2 = None
+
+# WebSocket subprotocols are named "nebulalink.<codec name>"
+SUBPROTOCOL_PREFIX = "nebulalink."
+
+Payload = Union[str, bytes]
+
+
+class DecodeError(ValueError):
+    """Raised when a message cannot be decoded by a codec."""
+
+    pass
+
+
+class Codec:
+    """Encodes and decodes messages for one wire format."""
+
+    name = ""
+    # Binary codecs produce bytes (binary frames); text codecs produce str (text frames)
+    binary = False
+
+    def encode(self, message: Any) -> Payload:
+        raise NotImplementedError
+
+    def decode(self, data: Payload) -> Any:
+        raise NotImplementedError
+
+    def tag(self, payload: Payload, message: Dict[str, Any], request_id: Any) -> Payload:
+        """Encode ``message`` with an ``id`` field, given ``payload``, its encoding without one."""
+        return self.encode(dict(message, id=request_id))
+
+    @property
+    def subprotocol(self) -> str:
+        return SUBPROTOCOL_PREFIX + self.name
+
+
+class JsonCodec(Codec):
+    """Standard library JSON, always available."""
+
+    name = "json"
+    # Written before the ID appended by tag, matching the encoder's separators
+    _id_field = ', "id": '
+
+    def encode(self, message: Any) -> str:
+        return json.dumps(message)
+
+    def tag(self, payload: Payload, message: Dict[str, Any], request_id: Any) -> Payload:
+        if not message or "id" in message:
+            return super().tag(payload, message, request_id)
+        # Splice the field in before the closing brace instead of re-encoding
+        return payload[:-1] + self._id_field + self.encode(request_id) + "}"
+
+    def decode(self, data: Payload) -> Any:
+        try:
+            return json.loads(data)
+        except ValueError as e:
+            raise DecodeError(str(e))
+
+
+class OrjsonCodec(JsonCodec):
+    """JSON through orjson; same wire format as JsonCodec, several times faster."""
+
+    _id_field = ',"id":'
+
+    def encode(self, message: Any) -> str:
+        # Text frames carry str, so the UTF-8 output is decoded once here
+        return orjson.dumps(message).decode("utf-8")
+
+    def decode(self, data: Payload) -> Any:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError as e:
+            raise DecodeError(str(e))
+
+
+class MsgpackCodec(Codec):
+    name = "msgpack"
+    binary = True
+
+    def encode(self, message: Any) -> bytes:
+        return msgpack.packb(message, use_bin_type=True)
+
+    def decode(self, data: Payload) -> Any:
+        if isinstance(data, str):
+            raise DecodeError("MessagePack messages must be sent as binary frames")
+        try:
+            return msgpack.unpackb(data, raw=False)
+        except Exception as e:
+            raise DecodeError(str(e))
+
+
+class CborCodec(Codec):
+    name = "cbor"
+    binary = True
+
+    def encode(self, message: Any) -> bytes:
+        return cbor2.dumps(message)
+
+    def decode(self, data: Payload) -> Any:
+        if isinstance(data, str):
+            raise DecodeError("CBOR messages must be sent as binary frames")
+        try:
+            return cbor2.loads(data)
+        except Exception as e:
+            raise DecodeError(str(e))
+
+
+def _available_codecs() -> Dict[str, Codec]:
+    codecs: Dict[str, Codec] = {"json": OrjsonCodec() if orjson else JsonCodec()}
+    if msgpack:
+        codecs["msgpack"] = MsgpackCodec()
+    if cbor2:
+        codecs["cbor"] = CborCodec()
+    return codecs
+
+
+CODECS: Dict[str, Codec] = _available_codecs()
+DEFAULT_CODEC: Codec = CODECS["json"]
+
+
+def get_codec(name: str) -> Codec:
+    """
+    Get an installed codec by name.
+
+    Raises:
+        CommandError: If the codec is unknown or its library is not installed.
+    """
+    codec = CODECS.get(name)
+    if codec is None:
+        raise CommandError(
+            f"Unsupported codec: {name}. Available codecs: {', '.join(CODECS)}"
+        )
+    return codec
+
+
+def subprotocols() -> List[str]:
+    """Subprotocols offered during the WebSocket handshake, one per installed codec."""
+    return [codec.subprotocol for codec in CODECS.values()]
+
+
+def codec_for_subprotocol(subprotocol: Optional[str]) -> Codec:
+    if subprotocol and subprotocol.startswith(SUBPROTOCOL_PREFIX):
+        codec = CODECS.get(subprotocol[len(SUBPROTOCOL_PREFIX) :])
+        if codec is not None:
+            return codec
+    return DEFAULT_CODEC
+
+
+def select_subprotocol(connection: Any, offered: List[str]) -> Optional[str]:
+    """
+    Pick the first subprotocol offered by the client that has an installed codec.
+
+    Clients that offer no known subprotocol are accepted and use the default codec.
+    """
+    available = set(subprotocols())
+    for subprotocol in offered:
+        if subprotocol in available:
+            return subprotocol
+    return None
+
+
+class SharedMessage:
+    """A message sent to many clients, encoded at most once per codec."""
+
+    __slots__ = ("message", "_encoded")
+
+    def __init__(self, message: Any):
+        self.message = message
+        self._encoded: Dict[str, Payload] = {}
+
+    def encode(self, codec: Codec) -> Payload:
+        payload = self._encoded.get(codec.name)
+        if payload is None:
+            payload = self._encoded[codec.name] = codec.encode(self.message)
+        return payload
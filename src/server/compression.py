@@ -0,0 +1,140 @@
+# src/server/compression.py
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from websockets.extensions.permessage_deflate import (
+    PerMessageDeflate,
+    ServerPerMessageDeflateFactory,
+)
+from websockets.frames import CTRL_OPCODES, Frame, Opcode
+
+from src.config import settings
+
+
+@dataclass
+class CompressionStats:
+    """Outgoing data message bytes of one connection, before and after compression."""
+
+    raw_bytes: int = 0
+    wire_bytes: int = 0
+    compressed_messages: int = 0
+    uncompressed_messages: int = 0
+
+    @property
+    def ratio(self) -> float:
+        return self.wire_bytes / self.raw_bytes if self.raw_bytes else 1.0
+
+    def add(self, other: "CompressionStats"):
+        self.raw_bytes += other.raw_bytes
+        self.wire_bytes += other.wire_bytes
+        self.compressed_messages += other.compressed_messages
+        self.uncompressed_messages += other.uncompressed_messages
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "raw_bytes": self.raw_bytes,
+            "wire_bytes": self.wire_bytes,
+            "compressed_messages": self.compressed_messages,
+            "uncompressed_messages": self.uncompressed_messages,
+            "ratio": round(self.ratio, 4),
+        }
+
+
+class ThresholdPerMessageDeflate(PerMessageDeflate):
+    """
+    permessage-deflate that sends messages smaller than ``min_size`` uncompressed.
+
+    RFC 7692 lets an endpoint send any message uncompressed by leaving RSV1
+    unset, and skipped messages never enter the compression context, so the
+    peer decodes both kinds without extra negotiation.
+    """
+
+    def __init__(self, *args: Any, min_size: int = 0, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.min_size = min_size
+        self.stats = CompressionStats()
+        # Whether the continuation frames of the current message are left uncompressed
+        self._skip_continuation = False
+
+    def encode(self, frame: Frame) -> Frame:
+        if frame.opcode in CTRL_OPCODES:
+            return frame
+
+        if frame.opcode is Opcode.CONT:
+            skip = self._skip_continuation
+        else:
+            skip = len(frame.data) < self.min_size
+            self._skip_continuation = skip and not frame.fin
+            if frame.fin:
+                if skip:
+                    self.stats.uncompressed_messages += 1
+                else:
+                    self.stats.compressed_messages += 1
+
+        encoded = frame if skip else super().encode(frame)
+        self.stats.raw_bytes += len(frame.data)
+        self.stats.wire_bytes += len(encoded.data)
+        return encoded
+
+
+class ThresholdPerMessageDeflateFactory(ServerPerMessageDeflateFactory):
+    """Negotiates permessage-deflate like websockets does, with a size threshold."""
+
+    def __init__(self, min_size: int = 0, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.min_size = min_size
+
+    def process_request_params(
+        self, params: Sequence[Any], accepted_extensions: Sequence[Any]
+    ) -> Tuple[List[Any], PerMessageDeflate]:
+        response_params, extension = super().process_request_params(
+            params, accepted_extensions
+        )
+        return response_params, ThresholdPerMessageDeflate(
+            extension.remote_no_context_takeover,
+            extension.local_no_context_takeover,
+            extension.remote_max_window_bits,
+            extension.local_max_window_bits,
+            extension.compress_settings,
+            min_size=self.min_size,
+        )
+
+
+def server_extensions(
+    enabled: bool = settings.COMPRESSION_ENABLED,
+    window_bits: int = settings.COMPRESSION_WINDOW_BITS,
+    mem_level: int = settings.COMPRESSION_MEM_LEVEL,
+    min_size: int = settings.COMPRESSION_MIN_SIZE,
+) -> List[ThresholdPerMessageDeflateFactory]:
+    """
+    Build the ``extensions`` argument for ``websockets.serve``.
+
+    Args:
+        enabled (bool): Offer permessage-deflate at all.
+        window_bits (int): LZ77 window size (9-15) for both directions.
+        mem_level (int): zlib memory level (1-9) of the server's compressor.
+        min_size (int): Messages smaller than this many bytes are sent uncompressed.
+
+    Returns:
+        List[ThresholdPerMessageDeflateFactory]: The extension factories to offer.
+    """
+    if not enabled:
+        return []
+    return [
+        ThresholdPerMessageDeflateFactory(
+            min_size=min_size,
+            server_max_window_bits=window_bits,
+            client_max_window_bits=window_bits,
+            compress_settings={"memLevel": mem_level},
+        )
+    ]
+
+
+def connection_stats(websocket: Any) -> Optional[CompressionStats]:
+    """Get the compression stats of a connection, or None if it is not compressed."""
+    protocol = getattr(websocket, "protocol", websocket)
+    for extension in getattr(protocol, "extensions", None) or []:
+        if isinstance(extension, ThresholdPerMessageDeflate):
+            return extension.stats
+    return None
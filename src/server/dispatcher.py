@@ -0,0 +1,178 @@
+# src/server/dispatcher.py
+
+import asyncio
+import functools
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from src.config import settings
+from src.utils import CommandError
+
+
+class ExecutorKind(Enum):
+    """How an action handler is executed."""
+
+    ASYNC = "async"  # Coroutine function, awaited directly on the event loop
+    BLOCKING = "blocking"  # Blocking call, run on the bounded I/O thread pool
+    CPU = "cpu"  # CPU-bound call, run on the dedicated CPU pool
+
+
+@dataclass(frozen=True)
+class ActionSpec:
+    """
+    A registered WebSocket action.
+
+    Attributes:
+        name (str): Action name as sent by clients.
+        handler (Callable[..., Any]): Callable invoked with the action parameters.
+        kind (ExecutorKind): Where the handler is executed.
+        params (Tuple[str, ...]): Required message fields passed as keyword arguments.
+        optional (Tuple[str, ...]): Message fields passed as keyword arguments when present.
+        client (bool): If True, the requesting websocket is passed as ``websocket``.
+        wrap (bool): If True, the handler result is sent as ``{"action", "result"}``;
+            otherwise the handler return value is sent to the client as-is.
+        shared (bool): If True, concurrent calls with the same parameters share
+            one execution and one encoded reply; for read-only actions.
+    """
+
+    name: str
+    handler: Callable[..., Any]
+    kind: ExecutorKind = ExecutorKind.BLOCKING
+    params: Tuple[str, ...] = ()
+    optional: Tuple[str, ...] = ()
+    client: bool = False
+    wrap: bool = True
+    shared: bool = False
+
+
+class ActionDispatcher:
+    """
+    Table-driven action dispatcher.
+
+    Actions are looked up in a dictionary (O(1) per message) and executed
+    according to their ExecutorKind, so slow controller calls run off the
+    event loop and cannot delay other connected clients.
+    """
+
+    def __init__(
+        self,
+        blocking_workers: int = settings.BLOCKING_POOL_SIZE,
+        cpu_workers: int = settings.CPU_POOL_SIZE,
+    ):
+        self._actions: Dict[str, ActionSpec] = {}
+        self._blocking_pool = ThreadPoolExecutor(
+            max_workers=blocking_workers, thread_name_prefix="nebulalink-io"
+        )
+        # Controller methods are bound to stateful objects and cannot be pickled
+        # into a process pool, so CPU-bound work gets its own thread pool instead.
+        self._cpu_pool = ThreadPoolExecutor(
+            max_workers=cpu_workers, thread_name_prefix="nebulalink-cpu"
+        )
+
+    def register(
+        self,
+        name: str,
+        handler: Callable[..., Any],
+        kind: ExecutorKind = ExecutorKind.BLOCKING,
+        params: Tuple[str, ...] = (),
+        optional: Tuple[str, ...] = (),
+        client: bool = False,
+        wrap: bool = True,
+        shared: bool = False,
+    ) -> ActionSpec:
+        """
+        Register an action handler.
+
+        Args:
+            name (str): Action name.
+            handler (Callable[..., Any]): Handler; must be a coroutine function for ASYNC actions.
+            kind (ExecutorKind): Where the handler is executed.
+            params (Tuple[str, ...]): Required message fields passed to the handler.
+            optional (Tuple[str, ...]): Optional message fields passed to the handler when present.
+            client (bool): Whether the handler receives the requesting websocket.
+            wrap (bool): Whether to wrap the result in an ``{"action", "result"}`` reply.
+            shared (bool): Whether concurrent identical calls share one execution.
+
+        Returns:
+            ActionSpec: The registered action.
+
+        Raises:
+            ValueError: If the action is already registered or the handler does not match its kind.
+        """
+        if name in self._actions:
+            raise ValueError(f"Action already registered: {name}")
+        if kind is ExecutorKind.ASYNC and not inspect.iscoroutinefunction(handler):
+            raise ValueError(f"Async action {name} requires a coroutine function")
+        if shared and (client or not wrap):
+            raise ValueError(f"Shared action {name} must be wrapped and not per-client")
+        spec = ActionSpec(
+            name, handler, kind, tuple(params), tuple(optional), client, wrap, shared
+        )
+        self._actions[name] = spec
+        return spec
+
+    def get(self, name: Optional[str]) -> Optional[ActionSpec]:
+        return self._actions.get(name)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._actions
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._actions)
+
+    async def dispatch(
+        self, spec: ActionSpec, data: Dict[str, Any], websocket: Any = None
+    ) -> Any:
+        """
+        Execute an action with the parameters taken from a client message.
+
+        Args:
+            spec (ActionSpec): The action to execute.
+            data (Dict[str, Any]): The decoded client message.
+            websocket (Any): The requesting client, passed to actions registered with client=True.
+
+        Returns:
+            Any: The handler result.
+
+        Raises:
+            CommandError: If a required parameter is missing.
+        """
+        kwargs = self._bind_params(spec, data)
+        if spec.client:
+            kwargs["websocket"] = websocket
+
+        if spec.kind is ExecutorKind.ASYNC:
+            return await spec.handler(**kwargs)
+
+        pool = (
+            self._cpu_pool if spec.kind is ExecutorKind.CPU else self._blocking_pool
+        )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            pool, functools.partial(spec.handler, **kwargs)
+        )
+
+    @staticmethod
+    def _bind_params(spec: ActionSpec, data: Dict[str, Any]) -> Dict[str, Any]:
+        missing = [param for param in spec.params if param not in data]
+        if missing:
+            raise CommandError(
+                f"Missing parameter(s) for {spec.name}: {', '.join(missing)}"
+            )
+        kwargs = {param: data[param] for param in spec.params}
+        for param in spec.optional:
+            if param in data:
+                kwargs[param] = data[param]
+        return kwargs
+
+    async def run_blocking(self, func: Callable[[], Any]) -> Any:
+        """Run a blocking call on the I/O pool, outside of any action."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._blocking_pool, func)
+
+    def shutdown(self, wait: bool = False):
+        self._blocking_pool.shutdown(wait=wait)
+        self._cpu_pool.shutdown(wait=wait)
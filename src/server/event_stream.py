@@ -0,0 +1,192 @@
+# src/server/event_stream.py
+
+import asyncio
+import itertools
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set
+
+from src.config import settings
+from src.server.codec import SharedMessage
+from src.utils import get_logger, EventBus, NebulaLinkError, event_bus
+from src.utils.events import TOPICS
+
+logger = get_logger(__name__)
+
+
+class EventStream:
+    """
+    Pushes controller events to the clients subscribed to their topic.
+
+    Events of a topic are collected for ``window`` seconds from the first
+    one and then sent as a single ``events`` message, serialized once and
+    shared by every subscriber (once per codec). Events with the same key
+    within a window are merged into one, later fields winning, so a burst
+    of changes costs one push per topic however many events it produced,
+    and a process that was paused and resumed again is reported once with
+    its final state. Topics without subscribers are not collected at all.
+
+    In multi-worker mode every event from the local bus is also handed to
+    ``relay``, which sends it to the other workers; they feed it to their
+    own stream with ``publish``.
+    """
+
+    def __init__(
+        self,
+        enqueue: Callable[[Any, SharedMessage], bool],
+        bus: Optional[EventBus] = None,
+        window: float = settings.EVENT_WINDOW,
+        relay: Optional[
+            Callable[[str, Dict[str, Any], Optional[Hashable]], Awaitable[None]]
+        ] = None,
+    ):
+        """
+        Args:
+            enqueue (Callable[[Any, SharedMessage], bool]): Queues a message for a websocket.
+            bus (Optional[EventBus]): Bus the controllers publish to.
+            window (float): Seconds events of one topic are collected before they are sent.
+            relay (Optional[Callable]): Coroutine function sending an event to the other workers.
+        """
+        self._enqueue = enqueue
+        self.bus = bus or event_bus
+        self.window = window
+        self.relay = relay
+        self._subscribers: Dict[str, Set[Any]] = {topic: set() for topic in TOPICS}
+        # Events collected per topic, by key, in arrival order
+        self._pending: Dict[str, Dict[Hashable, Dict[str, Any]]] = {}
+        self._flushes: Dict[str, asyncio.TimerHandle] = {}
+        # Stands in for the key of events that must not be merged
+        self._unkeyed = itertools.count()
+        self._seq: Dict[str, int] = dict.fromkeys(TOPICS, 0)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.received = 0
+        self.merged = 0
+        self.pushes = 0
+
+    def attach(self, loop: asyncio.AbstractEventLoop):
+        """Start receiving events from the bus on the given event loop."""
+        self._loop = loop
+        self.bus.subscribe(self._on_event)
+
+    def detach(self):
+        if self._loop is not None:
+            self.bus.unsubscribe(self._on_event)
+            self._loop = None
+        for handle in self._flushes.values():
+            handle.cancel()
+        self._flushes.clear()
+        self._pending.clear()
+
+    def _on_event(self, topic: str, event: Dict[str, Any], key: Optional[Hashable]):
+        # Called on whichever thread the controller published from
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        if self.relay is not None:
+            # Other workers may have subscribers even when this one has none
+            asyncio.run_coroutine_threadsafe(self.relay(topic, event, key), loop)
+        if self._subscribers.get(topic):
+            loop.call_soon_threadsafe(self.publish, topic, event, key)
+
+    def publish(
+        self, topic: str, event: Dict[str, Any], key: Optional[Hashable] = None
+    ):
+        """Add an event to the topic's current window, starting one if needed."""
+        if not self._subscribers.get(topic):
+            return
+        self.received += 1
+        if key is None:
+            key = ("unkeyed", next(self._unkeyed))
+        pending = self._pending.setdefault(topic, {})
+        previous = pending.get(key)
+        if previous is None:
+            pending[key] = event
+        else:
+            self.merged += 1
+            pending[key] = {**previous, **event}
+        if topic not in self._flushes:
+            loop = self._loop or asyncio.get_running_loop()
+            self._flushes[topic] = loop.call_later(self.window, self.flush, topic)
+
+    def flush(self, topic: str):
+        """Send the events collected for a topic to its subscribers now."""
+        handle = self._flushes.pop(topic, None)
+        if handle is not None:
+            handle.cancel()
+        pending = self._pending.pop(topic, None)
+        subscribers = self._subscribers.get(topic)
+        if not pending or not subscribers:
+            return
+        self._seq[topic] += 1
+        self.pushes += 1
+        payload = SharedMessage(
+            {
+                "action": "events",
+                "topic": topic,
+                "seq": self._seq[topic],
+                "events": list(pending.values()),
+            }
+        )
+        for websocket in list(subscribers):
+            self._enqueue(websocket, payload)
+
+    def subscribe(
+        self, websocket: Any, topics: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Subscribe a client to event topics.
+
+        Args:
+            websocket (Any): The subscribing client.
+            topics (Optional[List[str]]): Topics to add; all topics if omitted.
+
+        Returns:
+            Dict[str, Any]: All topics the client is now subscribed to.
+
+        Raises:
+            NebulaLinkError: If a topic is unknown.
+        """
+        for topic in self._topics(topics):
+            self._subscribers[topic].add(websocket)
+        return {"topics": self.topics_of(websocket)}
+
+    def unsubscribe(
+        self, websocket: Any, topics: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Unsubscribe a client from some topics, or from all if omitted."""
+        for topic in self._topics(topics):
+            self._subscribers[topic].discard(websocket)
+        return {"topics": self.topics_of(websocket)}
+
+    def move(self, websocket: Any, new_websocket: Any):
+        """Hand all subscriptions of a websocket over to another one."""
+        for subscribers in self._subscribers.values():
+            if websocket in subscribers:
+                subscribers.discard(websocket)
+                subscribers.add(new_websocket)
+
+    def topics_of(self, websocket: Any) -> List[str]:
+        return [topic for topic in TOPICS if websocket in self._subscribers[topic]]
+
+    def _topics(self, topics: Optional[List[str]]) -> List[str]:
+        if topics is None:
+            return list(TOPICS)
+        if isinstance(topics, str):
+            topics = [topics]
+        unknown = [topic for topic in topics if topic not in self._subscribers]
+        if unknown:
+            raise NebulaLinkError(
+                f"Unknown event topic: {', '.join(map(str, unknown))}. "
+                f"Use one of: {', '.join(TOPICS)}"
+            )
+        return topics
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Event and push counts, and subscribers per topic."""
+        return {
+            "received": self.received,
+            "merged": self.merged,
+            "pushes": self.pushes,
+            "subscribers": {
+                topic: len(subscribers)
+                for topic, subscribers in self._subscribers.items()
+            },
+        }
@@ -0,0 +1,365 @@
+# src/server/metrics.py
+
+import asyncio
+import bisect
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.config import settings
+from src.server.compression import CompressionStats
+from src.utils import get_logger, dropped_records
+
+logger = get_logger(__name__)
+
+# Upper bounds in seconds of the latency histogram buckets (Prometheus-style)
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram.
+
+    Recording is a binary search and an increment, cheap enough for every
+    message. Quantiles are estimated by interpolating inside a bucket.
+    """
+
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        # One count per bound, plus the overflow (+Inf) bucket
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q: float) -> float:
+        """Estimate the ``q`` quantile (0-1) in seconds; 0 when nothing was recorded."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            if bucket and seen + bucket >= rank:
+                lower = self.bounds[index - 1] if index else 0.0
+                if index == len(self.bounds):
+                    # Overflow bucket has no upper bound
+                    return lower
+                return lower + (self.bounds[index] - lower) * (rank - seen) / bucket
+            seen += bucket
+        return self.bounds[-1]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "p50_ms": round(self.quantile(0.5) * 1000, 3),
+            "p99_ms": round(self.quantile(0.99) * 1000, 3),
+            "avg_ms": round(self.sum / self.count * 1000, 3) if self.count else 0.0,
+        }
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up a task that sleeps ``interval`` seconds."""
+
+    def __init__(self, interval: float = settings.LOOP_LAG_INTERVAL):
+        self.interval = interval
+        self.last = 0.0
+        self.max = 0.0
+        self.histogram = LatencyHistogram()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self.last = lag
+            self.max = max(self.max, lag)
+            self.histogram.observe(lag)
+
+
+class ServerMetrics:
+    """
+    Counters and histograms of one server.
+
+    The server increments plain attributes on the hot path. Values that
+    already live elsewhere (client count, queue backlogs, bytes sent) are
+    read only when a snapshot is taken.
+    """
+
+    def __init__(
+        self,
+        loop_lag_interval: float = settings.LOOP_LAG_INTERVAL,
+        single_flight: Any = None,
+        events: Any = None,
+        sessions: Any = None,
+        scheduler: Any = None,
+        commands: Any = None,
+    ):
+        self.started = time.monotonic()
+        self.messages_in = 0
+        self.bytes_in = 0
+        self.decode_errors = 0
+        # Outgoing totals of clients that already disconnected
+        self.closed_messages_out = 0
+        self.closed_bytes_out = 0
+        self.closed_dropped = 0
+        self.closed_compression = CompressionStats()
+        self.actions: Dict[str, LatencyHistogram] = {}
+        self.action_errors: Dict[str, int] = {}
+        # Rejected connections and requests, by the limit that was hit
+        self.throttled: Dict[str, int] = {}
+        self.loop_lag = LoopLagMonitor(loop_lag_interval)
+        # SingleFlight of the server, whose executed/shared counts are reported
+        self.single_flight = single_flight
+        # EventStream of the server, whose event and push counts are reported
+        self.events = events
+        # SessionStore of the server, whose session and replay counts are reported
+        self.sessions = sessions
+        # Scheduler of the server, whose job counts and lateness are reported
+        self.scheduler = scheduler
+        # CommandRunner of the controllers, whose per-program latency is reported
+        self.commands = commands
+
+    def received(self, message: Any):
+        self.messages_in += 1
+        self.bytes_in += len(message)
+
+    def observe_action(self, action: str, seconds: float, failed: bool = False):
+        histogram = self.actions.get(action)
+        if histogram is None:
+            histogram = self.actions[action] = LatencyHistogram()
+        histogram.observe(seconds)
+        if failed:
+            self.action_errors[action] = self.action_errors.get(action, 0) + 1
+
+    def throttle(self, reason: str):
+        self.throttled[reason] = self.throttled.get(reason, 0) + 1
+
+    def client_closed(self, connection: Any):
+        self.closed_messages_out += connection.sent
+        self.closed_bytes_out += connection.sent_bytes
+        self.closed_dropped += connection.dropped
+        if connection.compression:
+            self.closed_compression.add(connection.compression)
+
+    def snapshot(self, connections: List[Any]) -> Dict[str, Any]:
+        """
+        Collect the current metrics.
+
+        Args:
+            connections (List[Any]): The live ClientConnections.
+
+        Returns:
+            Dict[str, Any]: The metrics, as returned by the ``stats`` action.
+        """
+        backlogs = sorted((c.backlog for c in connections), reverse=True)
+        # Clients that did not negotiate compression have no stats
+        compression = CompressionStats()
+        compression.add(self.closed_compression)
+        for connection in connections:
+            if connection.compression:
+                compression.add(connection.compression)
+        return {
+            "uptime": round(time.monotonic() - self.started, 3),
+            "clients": len(connections),
+            "messages": {
+                "received": self.messages_in,
+                "sent": self.closed_messages_out + sum(c.sent for c in connections),
+                "dropped": self.closed_dropped + sum(c.dropped for c in connections),
+            },
+            "bytes": {
+                "received": self.bytes_in,
+                "sent": self.closed_bytes_out + sum(c.sent_bytes for c in connections),
+            },
+            "compression": compression.as_dict(),
+            "decode_errors": self.decode_errors,
+            # Log records dropped because the log queue was full
+            "log_dropped": dropped_records(),
+            "throttled": dict(self.throttled),
+            "backlog": {
+                "total": sum(backlogs),
+                "max": backlogs[0] if backlogs else 0,
+                # Largest per-client backlogs; the full list can be long
+                "top": backlogs[:10],
+            },
+            "loop_lag": {
+                "last_ms": round(self.loop_lag.last * 1000, 3),
+                "max_ms": round(self.loop_lag.max * 1000, 3),
+                "p99_ms": round(self.loop_lag.histogram.quantile(0.99) * 1000, 3),
+            },
+            "actions": {
+                action: dict(
+                    histogram.as_dict(), errors=self.action_errors.get(action, 0)
+                )
+                for action, histogram in self.actions.items()
+            },
+            "single_flight": self.single_flight.get_stats() if self.single_flight else {},
+            "events": self.events.get_stats() if self.events else {},
+            # Both have a length, so an empty one is falsy
+            "sessions": self.sessions.get_stats() if self.sessions is not None else {},
+            "scheduler": self.scheduler.get_stats() if self.scheduler is not None else {},
+            "commands": self.commands.get_stats() if self.commands is not None else {},
+        }
+
+    def render_prometheus(self, connections: List[Any]) -> str:
+        """Format the metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot(connections)
+        lines = []
+
+        def metric(name: str, kind: str, value: Any, help_text: str):
+            lines.append(f"# HELP nebulalink_{name} {help_text}")
+            lines.append(f"# TYPE nebulalink_{name} {kind}")
+            lines.append(f"nebulalink_{name} {value}")
+
+        metric("clients", "gauge", snapshot["clients"], "Connected clients.")
+        metric("messages_received_total", "counter", snapshot["messages"]["received"], "Messages received.")
+        metric("messages_sent_total", "counter", snapshot["messages"]["sent"], "Messages sent.")
+        metric("messages_dropped_total", "counter", snapshot["messages"]["dropped"], "Messages dropped by slow-consumer policies.")
+        metric("bytes_received_total", "counter", snapshot["bytes"]["received"], "Payload bytes received.")
+        metric("bytes_sent_total", "counter", snapshot["bytes"]["sent"], "Payload bytes sent, before compression.")
+        compression = snapshot["compression"]
+        metric("compression_raw_bytes_total", "counter", compression["raw_bytes"], "Data message bytes sent to clients with compression, before compression.")
+        metric("compression_wire_bytes_total", "counter", compression["wire_bytes"], "The same messages' bytes on the wire.")
+        metric("compression_ratio", "gauge", compression["ratio"], "Wire bytes per raw byte over all compressing clients.")
+        metric("decode_errors_total", "counter", snapshot["decode_errors"], "Messages that could not be decoded.")
+        metric("log_records_dropped_total", "counter", snapshot["log_dropped"], "Log records dropped because the log queue was full.")
+        metric("client_backlog_total", "gauge", snapshot["backlog"]["total"], "Messages queued for all clients.")
+        metric("client_backlog_max", "gauge", snapshot["backlog"]["max"], "Largest outgoing queue of one client.")
+        metric("event_loop_lag_seconds", "gauge", self.loop_lag.last, "Last measured event loop lag.")
+        metric("event_loop_lag_max_seconds", "gauge", self.loop_lag.max, "Largest measured event loop lag.")
+
+        name = "nebulalink_action_latency_seconds"
+        lines.append(f"# HELP {name} Time to execute an action.")
+        lines.append(f"# TYPE {name} histogram")
+        for action, histogram in sorted(self.actions.items()):
+            cumulative = 0
+            for bound, count in zip(histogram.bounds + (float("inf"),), histogram.counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{name}_bucket{{action="{action}",le="{le}"}} {cumulative}')
+            lines.append(f'{name}_sum{{action="{action}"}} {histogram.sum}')
+            lines.append(f'{name}_count{{action="{action}"}} {histogram.count}')
+
+        name = "nebulalink_action_errors_total"
+        lines.append(f"# HELP {name} Actions that replied with an error.")
+        lines.append(f"# TYPE {name} counter")
+        for action, count in sorted(self.action_errors.items()):
+            lines.append(f'{name}{{action="{action}"}} {count}')
+
+        for kind, help_text in (
+            ("executed", "Shared action calls that ran."),
+            ("shared", "Shared action calls that joined an identical running call."),
+        ):
+            name = f"nebulalink_single_flight_{kind}_total"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for action, stats in sorted(snapshot["single_flight"].items()):
+                lines.append(f'{name}{{action="{action}"}} {stats[kind]}')
+
+        if self.events:
+            events = snapshot["events"]
+            metric("events_received_total", "counter", events["received"], "Controller events collected for subscribers.")
+            metric("events_merged_total", "counter", events["merged"], "Events merged into an earlier event about the same thing.")
+            metric("event_pushes_total", "counter", events["pushes"], "Event messages pushed, one per topic and window.")
+
+        if self.sessions is not None:
+            sessions = snapshot["sessions"]
+            metric("sessions_active", "gauge", sessions["active"], "Sessions, connected or in their grace period.")
+            metric("session_resumes_total", "counter", sessions["resumed"], "Sessions resumed after a reconnect.")
+            metric("session_replayed_messages_total", "counter", sessions["replayed"], "Messages replayed to resumed sessions.")
+
+        if self.scheduler is not None:
+            scheduler = snapshot["scheduler"]
+            metric("scheduled_jobs", "gauge", scheduler["pending"], "Scheduled jobs waiting to run.")
+            metric("scheduled_runs_total", "counter", scheduler["executed"], "Scheduled job runs.")
+            metric("scheduled_failures_total", "counter", scheduler["failed"], "Scheduled job runs that replied with an error.")
+            metric("scheduled_missed_deadlines_total", "counter", scheduler["missed"], "Scheduled job runs started more than SCHEDULER_LATE_AFTER seconds late.")
+            metric("scheduled_skipped_periods_total", "counter", scheduler["skipped"], "Periods of recurring jobs skipped because they were missed.")
+
+        if self.commands is not None:
+            for kind, help_text, value in (
+                ("runs", "External commands run.", lambda stats: stats.count),
+                ("failures", "External commands that failed, timed out or could not start.", lambda stats: stats.failures),
+                ("timeouts", "External commands killed after their timeout.", lambda stats: stats.timeouts),
+                ("seconds", "Time spent running external commands.", lambda stats: stats.total_time),
+            ):
+                name = f"nebulalink_command_{kind}_total"
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for program, stats in sorted(self.commands.stats.items()):
+                    lines.append(f'{name}{{program="{program}"}} {value(stats)}')
+
+        name = "nebulalink_throttled_total"
+        lines.append(f"# HELP {name} Connections and requests rejected by admission control.")
+        lines.append(f"# TYPE {name} counter")
+        for reason, count in sorted(self.throttled.items()):
+            lines.append(f'{name}{{reason="{reason}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+class MetricsEndpoint:
+    """
+    Minimal HTTP server answering ``GET /metrics`` with Prometheus text.
+
+    It runs on its own port so scrapers never go through the WebSocket
+    server, and it only implements what a scraper needs.
+    """
+
+    def __init__(self, render: Callable[[], str], host: str, port: int):
+        self.render = render
+        self.host = host
+        self.port = port
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        if not self.port:
+            self.port = self.server.sockets[0].getsockname()[1]
+        logger.info("Metrics endpoint on http://%s:%s/metrics", self.host, self.port)
+
+    def close(self):
+        if self.server:
+            self.server.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await reader.readline()
+            # Skip the headers; the request has no body
+            while (await reader.readline()).strip():
+                pass
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                status = "200 OK"
+                body = self.render().encode("utf-8")
+            else:
+                status = "404 Not Found"
+                body = b"Not Found\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                "Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n".encode("latin-1")
+                + body
+            )
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
@@ -1,93 +1,838 @@
 # src/server/nebulalink_server.py
 
 import asyncio
+import math
+import time
+from http import HTTPStatus
 import websockets
-import json
-from typing import Set, Dict, Any
+from typing import Dict, Any, List, Optional, Set
 
-from src.utils import get_logger, NebulaLinkError, handle_error
-from src.controllers.power_controller import PowerController
-from src.controllers.display_controller import DisplayController
+from src.config import settings
+from src.utils import (
+    get_logger,
+    configure_logging,
+    dropped_records,
+    ConnectionError,
+    EventBus,
+    NebulaLinkError,
+    PhaseTimer,
+    SchedulerError,
+    command_runner,
+    handle_error,
+)
+from src.controllers.lazy import LazyController, controller_method
 from src.controllers.program_controller import ProgramController
+from src.server.dispatcher import ActionDispatcher, ExecutorKind
+from src.server.client_connection import ClientConnection, SlowConsumerPolicy
+from src.server.program_subscriptions import ProgramSubscriptions
+from src.server.event_stream import EventStream
+from src.server.sessions import Session, SessionStore
+from src.server.scheduler import Scheduler
+from src.server.batch import run_batch
+from src.server.pipeline import RequestPipeline
+from src.server import codec as codecs
+from src.server.codec import SharedMessage
+from src.server import compression
+from src.server.metrics import MetricsEndpoint, ServerMetrics
+from src.server.admission import AdmissionControl, throttled_reply
+from src.server.single_flight import SharedReply, SingleFlight, shared_key
 
 logger = get_logger(__name__)
 
+# Returned by _decode for messages that cannot be decoded
+_INVALID = object()
+
+
+def _power_controller():
+    # Platform modules are imported when the controller is first built, not with the server
+    from src.controllers.power_controller import PowerController
+
+    return PowerController()
+
+
+def _display_controller():
+    from src.controllers.display_controller import DisplayController
+
+    return DisplayController()
+
 
 class NebulaLinkServer:
-    def __init__(self, host: str = "localhost", port: int = 8765):
+    def __init__(
+        self,
+        host: str = settings.HOST,
+        port: int = settings.PORT,
+        power_controller=None,
+        display_controller=None,
+        program_controller: Optional[ProgramController] = None,
+        dispatcher: Optional[ActionDispatcher] = None,
+        client_queue_size: int = settings.CLIENT_QUEUE_SIZE,
+        slow_consumer_policy: SlowConsumerPolicy = SlowConsumerPolicy(
+            settings.SLOW_CONSUMER_POLICY
+        ),
+        max_in_flight: int = settings.MAX_IN_FLIGHT_PER_CONNECTION,
+        bus=None,
+        warmup: bool = settings.CONTROLLER_WARMUP,
+        metrics_port: Optional[int] = settings.METRICS_PORT,
+        admission: Optional[AdmissionControl] = None,
+        max_frame_size: Optional[int] = settings.MAX_FRAME_SIZE,
+        events: Optional[EventBus] = None,
+    ):
+        self.startup = PhaseTimer()
         self.host = host
         self.port = port
-        self.clients: Set[websockets.WebSocketServerProtocol] = set()
-        self.power_controller = PowerController()
-        self.display_controller = DisplayController()
-        self.program_controller = ProgramController()
+        self.clients: Dict[websockets.WebSocketServerProtocol, ClientConnection] = {}
+        self.client_queue_size = client_queue_size
+        self.slow_consumer_policy = slow_consumer_policy
+        self.max_in_flight = max_in_flight
+        # Client count, rate and in-flight limits; rejected requests get a retry-after reply
+        self.admission = admission or AdmissionControl()
+        self.max_frame_size = max_frame_size
+        # permessage-deflate factories offered to clients; empty disables compression
+        self.extensions = compression.server_extensions()
+        # WorkerBus connecting this server to the other workers in multi-worker mode
+        self.bus = bus
+        # Coalesces concurrent identical calls of read-only (shared) actions
+        self.single_flight = SingleFlight()
+        # Pushes controller events to clients subscribed to their topics
+        self.event_stream = EventStream(
+            self._enqueue, events, relay=bus.share_event if bus else None
+        )
+        # Resumable sessions, by token and by every websocket they were attached to
+        self.sessions = SessionStore(self._expire_session)
+        # Tasks waiting for the requests of dropped session connections to finish
+        self._draining: Set[asyncio.Task] = set()
+        # Deferred and recurring controller actions
+        self.scheduler = Scheduler(self._execute_scheduled)
+        self.metrics = ServerMetrics(
+            single_flight=self.single_flight,
+            events=self.event_stream,
+            sessions=self.sessions,
+            scheduler=self.scheduler,
+            commands=command_runner,
+        )
+        # Prometheus endpoint, created on start when metrics_port is set (0 picks a free port)
+        self.metrics_port = metrics_port
+        self.metrics_endpoint: Optional[MetricsEndpoint] = None
+        self.warmup = warmup
+        self._warmup_task: Optional[asyncio.Task] = None
+        with self.startup.phase("controllers"):
+            # Power and display controllers shell out or walk devices when built,
+            # so they are created on first use or by the warmup after listening
+            self.power_controller = power_controller or LazyController(
+                _power_controller, "PowerController"
+            )
+            self.display_controller = display_controller or LazyController(
+                _display_controller, "DisplayController"
+            )
+            self.program_controller = program_controller or ProgramController()
+            self.dispatcher = dispatcher or ActionDispatcher()
+            self.program_subscriptions = ProgramSubscriptions(
+                self.program_controller, self._enqueue
+            )
+            self._register_actions()
         self.server = None
 
+    def _register_actions(self):
+        register = self.dispatcher.register
+        register("ping", self._ping, ExecutorKind.ASYNC, wrap=False)
+
+        # Power actions shell out through the async command runner
+        def power(name: str, **kwargs: Any):
+            handler = controller_method(self.power_controller, name, coroutine=True)
+            register(name, handler, ExecutorKind.ASYNC, **kwargs)
+
+        power("shutdown")
+        power("restart")
+        power("sleep")
+        power("hibernate")
+        power("get_power_plans", shared=True)
+        power("set_power_plan", params=("guid",))
+
+        def display(name: str):
+            return controller_method(self.display_controller, name)
+
+        register("get_display_info", display("get_display_info"), shared=True)
+        register(
+            "set_resolution",
+            display("set_resolution"),
+            params=("display_id", "width", "height"),
+        )
+        register(
+            "set_refresh_rate",
+            display("set_refresh_rate"),
+            params=("display_id", "rate"),
+        )
+        register(
+            "apply_display_layout", display("apply_display_layout"), params=("layout",)
+        )
+        register(
+            "list_modes", display("list_modes"), params=("display_id",), shared=True
+        )
+        register(
+            "find_display_mode",
+            display("find_display_mode"),
+            params=("display_id", "width", "height"),
+            optional=("refresh_rate", "min_refresh"),
+        )
+        register("enable_dummy_display", display("enable_dummy_display"))
+        register("disable_dummy_display", display("disable_dummy_display"))
+
+        program = self.program_controller
+        register(
+            "get_running_programs",
+            program.get_running_programs,
+            ExecutorKind.CPU,
+            optional=("max_age",),
+            shared=True,
+        )
+        register("pause_program", program.pause_program, params=("pid",))
+        register("resume_program", program.resume_program, params=("pid",))
+        # Usually answered from the latest resource sample, but a query made
+        # before the first background sample takes one itself
+        register(
+            "get_program_usage",
+            program.get_program_usage,
+            optional=("sort", "limit", "name"),
+        )
+        bulk = ("pids", "name", "root", "include_children", "max_age")
+        register("pause_programs", program.pause_programs, optional=bulk)
+        register("resume_programs", program.resume_programs, optional=bulk)
+        register(
+            "subscribe_programs",
+            self.program_subscriptions.subscribe,
+            ExecutorKind.ASYNC,
+            optional=("since",),
+            client=True,
+        )
+        register(
+            "unsubscribe_programs",
+            self._unsubscribe_programs,
+            ExecutorKind.ASYNC,
+            client=True,
+        )
+
+        register(
+            "subscribe_events",
+            self._subscribe_events,
+            ExecutorKind.ASYNC,
+            optional=("topics",),
+            client=True,
+        )
+        register(
+            "unsubscribe_events",
+            self._unsubscribe_events,
+            ExecutorKind.ASYNC,
+            optional=("topics",),
+            client=True,
+        )
+
+        register(
+            "hello",
+            self._hello,
+            ExecutorKind.ASYNC,
+            optional=("codec", "session", "ack"),
+            client=True,
+        )
+        register(
+            "schedule",
+            self._schedule,
+            ExecutorKind.ASYNC,
+            params=("request",),
+            optional=("delay", "at", "every"),
+        )
+        register("cancel", self._cancel, ExecutorKind.ASYNC, params=("job",))
+        register("list_scheduled", self._list_scheduled, ExecutorKind.ASYNC)
+        register("stats", self._stats, ExecutorKind.ASYNC)
+        register(
+            "batch",
+            self._batch,
+            ExecutorKind.ASYNC,
+            params=("actions",),
+            optional=("concurrency", "sequential", "stop_on_error"),
+            client=True,
+            wrap=False,
+        )
+
+    async def _ping(self) -> Dict[str, Any]:
+        return {"action": "pong"}
+
+    async def _schedule(
+        self,
+        request: Dict[str, Any],
+        delay: float = None,
+        at: str = None,
+        every: float = None,
+    ) -> Dict[str, Any]:
+        """Schedule a controller action message; it is checked now, not when it runs."""
+        action = request.get("action") if isinstance(request, dict) else None
+        spec = self.dispatcher.get(action)
+        if spec is None or action not in settings.SCHEDULABLE_ACTIONS:
+            raise SchedulerError(f"Action cannot be scheduled: {action}")
+        missing = [param for param in spec.params if param not in request]
+        if missing:
+            raise SchedulerError(
+                f"Missing required parameter(s) for {action}: {', '.join(missing)}"
+            )
+        # A recurring job is charged once, so it may not repeat faster than its class allows
+        limit = self.admission.action_rates.get(self.admission.action_classes.get(action))
+        if limit and isinstance(every, (int, float)) and every * limit[0] < 1:
+            raise SchedulerError(
+                f"{action} cannot repeat more often than every {1 / limit[0]:g}s"
+            )
+        return self.scheduler.schedule(request, delay, at, every)
+
+    async def _cancel(self, job: int) -> Dict[str, Any]:
+        return {"job": job, "cancelled": self.scheduler.cancel(job)}
+
+    async def _list_scheduled(self) -> Dict[str, Any]:
+        return {"jobs": self.scheduler.jobs()}
+
+    async def _execute_scheduled(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        # Runs like a forwarded call, without a connection; the client that
+        # scheduled it was charged by _admit_scheduled
+        return await self.execute(None, request)
+
+    async def _stats(self) -> Dict[str, Any]:
+        return self.metrics.snapshot(list(self.clients.values()))
+
+    def render_metrics(self) -> str:
+        return self.metrics.render_prometheus(list(self.clients.values()))
+
+    async def _unsubscribe_programs(
+        self, websocket: websockets.WebSocketServerProtocol
+    ) -> bool:
+        return self.program_subscriptions.unsubscribe(websocket)
+
+    async def _subscribe_events(
+        self, websocket: websockets.WebSocketServerProtocol, topics: List[str] = None
+    ) -> Dict[str, Any]:
+        return self.event_stream.subscribe(websocket, topics)
+
+    async def _unsubscribe_events(
+        self, websocket: websockets.WebSocketServerProtocol, topics: List[str] = None
+    ) -> Dict[str, Any]:
+        return self.event_stream.unsubscribe(websocket, topics)
+
+    async def _hello(
+        self,
+        websocket: websockets.WebSocketServerProtocol,
+        codec: str = None,
+        session: Any = None,
+        ack: int = 0,
+    ) -> Dict[str, Any]:
+        """
+        Switch the connection's codec, and open or resume a session.
+
+        The reply is the first message in the new codec. It is message 1 of a
+        new session; when a session is resumed the missed messages are
+        replayed ahead of it, and the session keeps its codec.
+        """
+        connection = self.clients.get(websocket)
+        if codec is not None and connection:
+            connection.codec = codecs.get_codec(codec)
+        reply = {}
+        if session is not None and connection:
+            reply["session"] = self._start_session(websocket, connection, session, ack)
+        current = connection.codec if connection else codecs.DEFAULT_CODEC
+        reply.update(
+            codec=current.name,
+            codecs=list(codecs.CODECS),
+            worker=self.bus.index if self.bus else 0,
+        )
+        return reply
+
+    def _start_session(
+        self,
+        websocket: websockets.WebSocketServerProtocol,
+        connection: ClientConnection,
+        token: Any,
+        ack: int,
+    ) -> Dict[str, Any]:
+        """Open a session (``token`` is True) or resume the session ``token``."""
+        if connection.session is not None:
+            raise ConnectionError("The connection already has a session")
+        if token is True:
+            session = self.sessions.open(websocket, connection)
+            return {"token": session.token, "resumed": False}
+
+        session, previous, missed, complete = self.sessions.resume(
+            token, ack, websocket, connection
+        )
+        if previous is not websocket:
+            self.program_subscriptions.move(previous, websocket)
+            self.event_stream.move(previous, websocket)
+            old = self.clients.get(previous)
+            if old is not None:
+                # The client reconnected before the server noticed the old connection
+                # drop; its handler releases the websocket once its requests finish
+                old.evict(1000, "session resumed")
+            else:
+                self.sessions.release(session, previous)
+        return {
+            "token": session.token,
+            "resumed": True,
+            "replayed": len(missed),
+            "complete": complete,
+        }
+
+    def _expire_session(self, session: Session):
+        self.program_subscriptions.unsubscribe(session.websocket)
+        self.event_stream.unsubscribe(session.websocket)
+        for pipeline in session.pipelines.values():
+            asyncio.ensure_future(pipeline.close())
+        session.pipelines.clear()
+
+    async def _drain(
+        self,
+        session: Session,
+        websocket: websockets.WebSocketServerProtocol,
+        pipeline: RequestPipeline,
+    ):
+        """Drop a dropped connection's pipeline, and its websocket, once its requests finished."""
+        await pipeline.drain()
+        session.pipelines.pop(websocket, None)
+        self.sessions.release(session, websocket)
+
     async def register(self, websocket: websockets.WebSocketServerProtocol):
-        self.clients.add(websocket)
-        logger.info(f"New client connected. Total clients: {len(self.clients)}")
+        connection = ClientConnection(
+            websocket,
+            self.client_queue_size,
+            self.slow_consumer_policy,
+            codecs.codec_for_subprotocol(getattr(websocket, "subprotocol", None)),
+        )
+        connection.compression = compression.connection_stats(websocket)
+        connection.limiter = self.admission.limiter()
+        connection.start()
+        self.clients[websocket] = connection
+        logger.info("New client connected. Total clients: %s", len(self.clients))
 
     async def unregister(self, websocket: websockets.WebSocketServerProtocol):
-        self.clients.remove(websocket)
-        logger.info(f"Client disconnected. Total clients: {len(self.clients)}")
+        if self.sessions.for_websocket(websocket) is None:
+            # A session keeps its subscriptions until it expires
+            self.program_subscriptions.unsubscribe(websocket)
+            self.event_stream.unsubscribe(websocket)
+        connection = self.clients.pop(websocket, None)
+        if connection:
+            await connection.close()
+            self.metrics.client_closed(connection)
+            if connection.compression:
+                stats = connection.compression
+                logger.info(
+                    "Client sent %s bytes as %s on the wire (%.0f%%)",
+                    stats.raw_bytes,
+                    stats.wire_bytes,
+                    stats.ratio * 100,
+                )
+        logger.info("Client disconnected. Total clients: %s", len(self.clients))
 
     async def send_to_client(
         self, websocket: websockets.WebSocketServerProtocol, message: Dict[str, Any]
     ):
-        await websocket.send(json.dumps(message))
+        sink = self._sink(websocket)
+        if sink is not None:
+            if isinstance(message, SharedReply):
+                sink.enqueue(message.encode(sink.codec))
+            else:
+                sink.enqueue(sink.codec.encode(message))
+        else:
+            await websocket.send(codecs.DEFAULT_CODEC.encode(message))
 
-    async def broadcast(self, message: Dict[str, Any]):
-        if self.clients:
-            await asyncio.gather(
-                *[client.send(json.dumps(message)) for client in self.clients]
-            )
+    def _enqueue(
+        self, websocket: websockets.WebSocketServerProtocol, message: SharedMessage
+    ) -> bool:
+        sink = self._sink(websocket)
+        if sink is None:
+            return False
+        return sink.enqueue(message.encode(sink.codec))
 
-    async def handle_message(
-        self, websocket: websockets.WebSocketServerProtocol, message: str
-    ):
+    def _sink(self, websocket: websockets.WebSocketServerProtocol) -> Any:
+        """Where messages for a websocket go: its session if it has one, else its connection."""
+        session = self.sessions.for_websocket(websocket)
+        if session is not None:
+            return session
+        return self.clients.get(websocket)
+
+    async def broadcast(self, message: Dict[str, Any], key: Optional[str] = None):
+        """
+        Send a message to every connected client without waiting for any socket.
+
+        The message is serialized once per codec in use and the same payload is
+        queued for each client; slow clients are handled by their slow-consumer policy.
+        In multi-worker mode the message is also published to the other workers.
+
+        Args:
+            message (Dict[str, Any]): The message to send.
+            key (Optional[str]): Coalescing key for clients using the COALESCE policy.
+        """
+        self._broadcast_local(message, key)
+        if self.bus:
+            await self.bus.publish(message, key)
+
+    def _broadcast_local(self, message: Any, key: Optional[str] = None):
+        if not self.clients and not len(self.sessions):
+            return
+        shared = SharedMessage(message)
+        for connection in list(self.clients.values()):
+            sink = connection.session or connection
+            sink.enqueue(shared.encode(sink.codec), key)
+        for session in self.sessions.detached():
+            session.enqueue(shared.encode(session.codec), key)
+
+    async def _batch(
+        self,
+        websocket: websockets.WebSocketServerProtocol,
+        actions: List[Any],
+        concurrency: int = settings.BATCH_CONCURRENCY,
+        sequential: bool = False,
+        stop_on_error: bool = False,
+    ) -> Dict[str, Any]:
+        # The batch takes one token per action class, so bulk work such as
+        # pausing 40 processes costs what one pause_programs call costs
+        throttled = self._batch_retry_after(websocket, actions)
+
+        async def execute(data: Any) -> Dict[str, Any]:
+            if isinstance(data, dict) and data.get("action") == "batch":
+                return {"error": "Nested batches are not supported"}
+            action = data.get("action") if isinstance(data, dict) else None
+            retry_after = throttled.get(self.admission.action_classes.get(action))
+            if retry_after:
+                self.metrics.throttle("action_rate")
+                return throttled_reply(data, "action_rate", retry_after)
+            return await self.execute(websocket, data, admitted=True)
+
+        results = await run_batch(
+            execute, actions, concurrency, sequential, stop_on_error
+        )
+        return {"action": "batch", "results": results}
+
+    async def execute(
+        self,
+        websocket: websockets.WebSocketServerProtocol,
+        data: Any,
+        admitted: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Execute one decoded action message and build its reply.
+
+        Args:
+            websocket (websockets.WebSocketServerProtocol): The requesting client.
+            data (Any): The decoded message.
+            admitted (bool): The action class limit was already checked, once for a whole batch.
+
+        Returns:
+            Dict[str, Any]: The reply, tagged with the request's ``id`` if it had one;
+            failures are returned as ``{"error": ...}``.
+        """
+        spec = None
+        started = time.perf_counter()
         try:
-            data = json.loads(message)
             action = data.get("action")
+            retry_after = 0.0 if admitted else self._action_retry_after(websocket, action)
+            if retry_after:
+                return throttled_reply(data, "action_rate", retry_after)
+            if action == "schedule":
+                throttled = self._admit_scheduled(websocket, data)
+                if throttled:
+                    return throttled
 
-            if action == "ping":
-                await self.send_to_client(websocket, {"action": "pong"})
-            # ... (rest of the actions)
+            spec = self.dispatcher.get(action)
+            if spec is None:
+                logger.warning("Unknown action received: %s", action)
+                reply = {"error": "Unknown action"}
+            elif self._forwarded(action):
+                reply = await self.bus.call(data)
+            elif spec.shared:
+                reply = await self._execute_shared(spec, data, websocket)
             else:
-                logger.warning(f"Unknown action received: {action}")
-                await self.send_to_client(websocket, {"error": "Unknown action"})
-
-        except json.JSONDecodeError:
-            logger.error("Received invalid JSON")
-            await self.send_to_client(websocket, {"error": "Invalid JSON"})
+                reply = await self.dispatcher.dispatch(spec, data, websocket)
+                if spec.wrap:
+                    reply = {"action": action, "result": reply}
         except Exception as e:
             error_details = handle_error(e)
-            await self.send_to_client(websocket, {"error": error_details})
+            reply = {"error": error_details}
+
+        if spec is not None:
+            # Only registered actions get a histogram, so clients cannot add series
+            self.metrics.observe_action(
+                spec.name, time.perf_counter() - started, "error" in reply
+            )
+
+        if isinstance(data, dict) and "id" in data:
+            if isinstance(reply, SharedReply):
+                reply = reply.with_id(data["id"])
+            else:
+                reply = dict(reply, id=data["id"])
+        return reply
+
+    async def _execute_shared(
+        self,
+        spec: Any,
+        data: Dict[str, Any],
+        websocket: websockets.WebSocketServerProtocol,
+    ) -> SharedReply:
+        """Run a shared action, joining an identical call that is already running."""
+
+        async def call() -> SharedMessage:
+            result = await self.dispatcher.dispatch(spec, data, websocket)
+            return SharedMessage({"action": spec.name, "result": result})
+
+        params = {
+            param: data[param] for param in spec.params + spec.optional if param in data
+        }
+        key = shared_key(spec.name, params)
+        if key is None:
+            return SharedReply(await call())
+        return SharedReply(await self.single_flight.do(spec.name, key, call))
+
+    def _batch_retry_after(
+        self, websocket: websockets.WebSocketServerProtocol, actions: Any
+    ) -> Dict[str, float]:
+        connection = self.clients.get(websocket)
+        if connection is None or connection.limiter is None or not isinstance(actions, list):
+            return {}
+        return connection.limiter.check_batch(
+            data.get("action") for data in actions if isinstance(data, dict)
+        )
+
+    def _action_retry_after(
+        self, websocket: websockets.WebSocketServerProtocol, action: Any
+    ) -> float:
+        # Forwarded calls have no connection; the worker that received them checked them
+        connection = self.clients.get(websocket)
+        if connection is None or connection.limiter is None:
+            return 0.0
+        retry_after = connection.limiter.check_action(action)
+        if retry_after:
+            self.metrics.throttle("action_rate")
+        return retry_after
+
+    def _admit_scheduled(
+        self, websocket: websockets.WebSocketServerProtocol, data: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Charge a client for the action it schedules, as if it had sent it now.
+
+        Scheduled runs have no connection, so this is the only point where
+        the client and action class limits can apply to them.
+
+        Returns:
+            Optional[Dict[str, Any]]: The throttled reply, or None if the request is accepted.
+        """
+        connection = self.clients.get(websocket)
+        request = data.get("request")
+        if connection is None or connection.limiter is None or not isinstance(request, dict):
+            return None
+        retry_after = connection.limiter.check_message()
+        if retry_after:
+            self.metrics.throttle("rate")
+            return throttled_reply(data, "rate", retry_after)
+        retry_after = self._action_retry_after(websocket, request.get("action"))
+        if retry_after:
+            return throttled_reply(data, "action_rate", retry_after)
+        return None
+
+    async def _reject(
+        self,
+        websocket: websockets.WebSocketServerProtocol,
+        data: Any,
+        reason: str,
+        retry_after: float,
+    ):
+        self.metrics.throttle(reason)
+        await self.send_to_client(websocket, throttled_reply(data, reason, retry_after))
+
+    def _admit_connection(self, connection: Any, request: Any) -> Any:
+        """Refuse the WebSocket handshake with 503 and Retry-After when the server is full."""
+        if not self.admission.is_full(len(self.clients)):
+            return None
+        self.metrics.throttle("clients")
+        logger.warning("Refused connection: %s clients connected", len(self.clients))
+        response = connection.respond(HTTPStatus.SERVICE_UNAVAILABLE, "Server full\n")
+        response.headers["Retry-After"] = str(math.ceil(self.admission.full_retry_after))
+        return response
+
+    def _forwarded(self, action: str) -> bool:
+        """Whether an action must run on the owner worker instead of this one."""
+        return (
+            self.bus is not None
+            and not self.bus.is_owner
+            and action in settings.WORKER_OWNED_ACTIONS
+        )
+
+    async def _execute_forwarded(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        return await self.execute(None, data)
+
+    async def _decode(
+        self, websocket: websockets.WebSocketServerProtocol, message: str
+    ) -> Any:
+        connection = self.clients.get(websocket)
+        codec = connection.codec if connection else codecs.DEFAULT_CODEC
+        self.metrics.received(message)
+        try:
+            return codec.decode(message)
+        except codecs.DecodeError:
+            self.metrics.decode_errors += 1
+            logger.error("Received invalid %s message", codec.name)
+            error = "Invalid JSON" if codec.name == "json" else "Invalid message"
+            await self.send_to_client(websocket, {"error": error})
+            return _INVALID
+
+    async def _respond(self, websocket: websockets.WebSocketServerProtocol, data: Any):
+        await self.send_to_client(websocket, await self.execute(websocket, data))
+
+    async def handle_message(
+        self, websocket: websockets.WebSocketServerProtocol, message: str
+    ):
+        data = await self._decode(websocket, message)
+        if data is not _INVALID:
+            await self._respond(websocket, data)
 
     async def ws_handler(
-        self, websocket: websockets.WebSocketServerProtocol, path: str
+        self, websocket: websockets.WebSocketServerProtocol, path: str = None
     ):
         await self.register(websocket)
+        limiter = self.clients[websocket].limiter
+        pipeline = RequestPipeline(
+            lambda data: self._respond(websocket, data), self.max_in_flight
+        )
         try:
             async for message in websocket:
-                await self.handle_message(websocket, message)
+                data = await self._decode(websocket, message)
+                if data is _INVALID:
+                    continue
+                retry_after = limiter.check_message()
+                if retry_after:
+                    await self._reject(websocket, data, "rate", retry_after)
+                    continue
+                # Requests with an ID may complete out of order; the rest keep their order
+                tagged = isinstance(data, dict) and "id" in data
+                if tagged and pipeline.full:
+                    # Clients that correlate replies are told to retry; others are
+                    # paused by submit below, which keeps their replies in order
+                    await self._reject(
+                        websocket, data, "in_flight", self.admission.busy_retry_after
+                    )
+                    continue
+                await pipeline.submit(data, ordered=not tagged)
+        except websockets.ConnectionClosedError as e:
+            if e.sent and e.sent.code == 1009:
+                self.metrics.throttle("frame_size")
+                logger.warning(
+                    "Closed connection that sent a message over %s bytes",
+                    self.max_frame_size,
+                )
         finally:
+            session = self.sessions.disconnected(websocket)
+            if session is None:
+                await pipeline.close()
+            else:
+                # Running requests finish and their replies are recorded for replay
+                session.pipelines[websocket] = pipeline
+                task = asyncio.create_task(self._drain(session, websocket, pipeline))
+                self._draining.add(task)
+                task.add_done_callback(self._draining.discard)
             await self.unregister(websocket)
 
     async def start(self):
-        self.server = await websockets.serve(self.ws_handler, self.host, self.port)
-        logger.info(f"Server started on {self.host}:{self.port}")
+        loop = asyncio.get_running_loop()
+        with self.startup.phase("program table"):
+            self.program_subscriptions.attach(loop)
+            self.event_stream.attach(loop)
+            if self.bus is None or self.bus.is_owner:
+                if self.bus:
+                    # Called on the refresh thread with every scan, including the first
+                    self.program_controller.add_scan_listener(
+                        lambda rows: asyncio.run_coroutine_threadsafe(
+                            self.bus.share_processes(rows), loop
+                        )
+                    )
+                self.program_controller.start()
+            else:
+                # The owner scans processes and samples their usage for every worker
+                self.program_controller.follow()
+        if self.bus:
+            with self.startup.phase("worker bus"):
+                self.bus.on_broadcast = self._broadcast_local
+                self.bus.on_call = self._execute_forwarded
+                self.bus.on_processes = self.program_controller.load_processes
+                self.bus.on_event = self.event_stream.publish
+                await self.bus.start()
+        with self.startup.phase("listen"):
+            self.server = await websockets.serve(
+                self.ws_handler,
+                self.host,
+                self.port,
+                subprotocols=codecs.subprotocols(),
+                select_subprotocol=codecs.select_subprotocol,
+                compression=None,
+                extensions=self.extensions,
+                max_size=self.max_frame_size,
+                process_request=self._admit_connection,
+                # Workers share the port; the kernel balances connections between them
+                reuse_port=self.bus is not None,
+            )
+        if not self.port:
+            # Ephemeral port requested; report the one the OS picked
+            self.port = next(iter(self.server.sockets)).getsockname()[1]
+        logger.info("Server started on %s:%s", self.host, self.port)
+        self.metrics.loop_lag.start()
+        # Workers share the metrics port setting, so only the owner serves it
+        if self.metrics_port is not None and (self.bus is None or self.bus.is_owner):
+            self.metrics_endpoint = MetricsEndpoint(
+                self.render_metrics, settings.METRICS_HOST, self.metrics_port
+            )
+            await self.metrics_endpoint.start()
+        self.scheduler.start()
+        logger.info("Startup: %s", self.startup.report())
+        if self.warmup:
+            self._warmup_task = asyncio.create_task(self._warm_controllers())
+
+    async def _warm_controllers(self):
+        """Build lazy controllers on the blocking pool while clients are already served."""
+        lazy = [
+            controller
+            for controller in (self.power_controller, self.display_controller)
+            if isinstance(controller, LazyController) and not controller.loaded
+        ]
+        results = await asyncio.gather(
+            *[self.dispatcher.run_blocking(controller.load) for controller in lazy],
+            return_exceptions=True,
+        )
+        for controller, result in zip(lazy, results):
+            if isinstance(result, Exception):
+                # Not fatal: the controller is built again on its first action
+                logger.warning("Warmup of %s failed: %s", controller.name, result)
 
     def stop(self):
         if self.server:
             self.server.close()
             logger.info("Server stopped")
+        if self._warmup_task:
+            self._warmup_task.cancel()
+        self.metrics.loop_lag.stop()
+        if self.metrics_endpoint:
+            self.metrics_endpoint.close()
+        self.program_controller.stop()
+        self.sessions.close()
+        self.scheduler.stop()
+        self.program_subscriptions.detach()
+        self.event_stream.detach()
+        self.dispatcher.shutdown()
+        dropped = dropped_records()
+        if dropped:
+            logger.warning("%s log records were dropped because the log queue was full", dropped)
 
     async def run(self):
         await self.start()
-        await self.server.wait_closed()
+        try:
+            await self.server.wait_closed()
+        finally:
+            if self.bus:
+                await self.bus.close()
 
 
 def run_server():
+    configure_logging()
     server = NebulaLinkServer()
     asyncio.run(server.run())
 
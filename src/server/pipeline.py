@@ -0,0 +1,76 @@
+# src/server/pipeline.py
+
+import asyncio
+from typing import Any, Awaitable, Callable, Optional, Set
+
+from src.config import settings
+
+
+class RequestPipeline:
+    """
+    Runs the requests of one connection concurrently.
+
+    At most ``max_in_flight`` requests run at once; when the limit is reached
+    ``submit`` waits, which stops the connection's reader and pushes back on
+    the client. Requests submitted as ordered (those without a request ID)
+    still run one after another in arrival order, so clients that cannot
+    correlate replies keep seeing them in request order.
+    """
+
+    def __init__(
+        self,
+        handle: Callable[[Any], Awaitable[None]],
+        max_in_flight: int = settings.MAX_IN_FLIGHT_PER_CONNECTION,
+    ):
+        self._handle = handle
+        self.max_in_flight = max_in_flight
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._tasks: Set[asyncio.Task] = set()
+        self._ordered_tail: Optional[asyncio.Task] = None
+        self._in_flight = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def full(self) -> bool:
+        return self._in_flight >= self.max_in_flight
+
+    async def submit(self, request: Any, ordered: bool = False):
+        """
+        Start handling a request, waiting first if the in-flight limit is reached.
+
+        Args:
+            request (Any): The decoded request.
+            ordered (bool): Run only after the previously submitted ordered request finished.
+        """
+        await self._slots.acquire()
+        self._in_flight += 1
+        previous = self._ordered_tail if ordered else None
+        task = asyncio.create_task(self._run(request, previous))
+        if ordered:
+            self._ordered_tail = task
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, request: Any, previous: Optional[asyncio.Task]):
+        try:
+            if previous is not None and not previous.done():
+                await asyncio.wait([previous])
+            await self._handle(request)
+        finally:
+            self._in_flight -= 1
+            self._slots.release()
+
+    async def drain(self):
+        """Wait until the submitted requests have finished."""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    async def close(self):
+        """Cancel the requests that are still running."""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
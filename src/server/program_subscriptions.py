@@ -0,0 +1,143 @@
+# src/server/program_subscriptions.py
+
+import asyncio
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from src.config import settings
+from src.controllers.process_table import ProcessTableDiff
+from src.server.codec import SharedMessage
+from src.utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class ProgramSubscriptions:
+    """
+    Streams process list changes to subscribed clients.
+
+    A subscriber receives one ``programs_snapshot`` and then a
+    ``programs_delta`` per process table change. Each delta is serialized once
+    and shared by every subscriber (once per codec), so the cost scales with process churn
+    rather than with the number of processes or subscribers. Recent deltas
+    are kept so a client that missed some can catch up from its last
+    sequence number instead of taking a full snapshot.
+    """
+
+    def __init__(
+        self,
+        program_controller,
+        enqueue: Callable[[Any, SharedMessage], bool],
+        history_size: int = settings.PROGRAM_DELTA_HISTORY,
+    ):
+        """
+        Args:
+            program_controller: Controller providing versioned snapshots and change listeners.
+            enqueue (Callable[[Any, SharedMessage], bool]): Queues a message for a websocket.
+            history_size (int): Number of recent deltas kept for catch-up.
+        """
+        self.program_controller = program_controller
+        self._enqueue = enqueue
+        # websocket -> last sequence number delivered to it
+        self._subscribers: Dict[Any, int] = {}
+        self._history: Deque[Tuple[int, SharedMessage]] = deque(maxlen=history_size)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def attach(self, loop: asyncio.AbstractEventLoop):
+        """Start receiving process table changes on the given event loop."""
+        self._loop = loop
+        self.program_controller.add_change_listener(self._on_change)
+
+    def detach(self):
+        if self._loop is not None:
+            self.program_controller.remove_change_listener(self._on_change)
+            self._loop = None
+
+    def _on_change(self, diff: ProcessTableDiff):
+        # Called on the process table's refresh thread
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self.publish, diff)
+
+    def publish(self, diff: ProcessTableDiff):
+        """Send a process table change to every subscriber."""
+        payload = SharedMessage(
+            {
+                "action": "programs_delta",
+                "seq": diff.seq,
+                "added": diff.added,
+                "removed": diff.removed,
+                "changed": diff.changed,
+            }
+        )
+        self._history.append((diff.seq, payload))
+        for websocket, last_seq in list(self._subscribers.items()):
+            # Skip deltas already covered by the snapshot the client received
+            if diff.seq > last_seq:
+                self._subscribers[websocket] = diff.seq
+                self._enqueue(websocket, payload)
+
+    async def subscribe(self, websocket: Any, since: Optional[int] = None) -> int:
+        """
+        Subscribe a client to process list changes.
+
+        The snapshot or replayed deltas are queued for the client directly so
+        they are delivered in sequence order ahead of any later delta.
+
+        Args:
+            websocket (Any): The subscribing client.
+            since (Optional[int]): Last sequence number the client has applied; if the
+                missed deltas are still in the history they are replayed instead of a snapshot.
+
+        Returns:
+            int: The sequence number the client is now synchronized to.
+        """
+        if since is not None:
+            missed = self._deltas_after(since)
+            if missed is not None:
+                for _, payload in missed:
+                    self._enqueue(websocket, payload)
+                seq = missed[-1][0] if missed else since
+                self._subscribers[websocket] = seq
+                return seq
+
+        loop = asyncio.get_running_loop()
+        seq, programs = await loop.run_in_executor(
+            None, self.program_controller.get_programs_snapshot
+        )
+        self._enqueue(
+            websocket,
+            SharedMessage(
+                {"action": "programs_snapshot", "seq": seq, "programs": programs}
+            ),
+        )
+        # Deltas published while the snapshot was being taken
+        for delta_seq, payload in self._history:
+            if delta_seq > seq:
+                self._enqueue(websocket, payload)
+                seq = delta_seq
+        self._subscribers[websocket] = seq
+        return seq
+
+    def unsubscribe(self, websocket: Any) -> bool:
+        return self._subscribers.pop(websocket, None) is not None
+
+    def move(self, websocket: Any, new_websocket: Any):
+        """Hand a subscription over to another websocket, e.g. when a session resumes."""
+        if websocket in self._subscribers:
+            self._subscribers[new_websocket] = self._subscribers.pop(websocket)
+
+    def _deltas_after(self, since: int) -> Optional[list]:
+        current = self._history[-1][0] if self._history else None
+        if current is None or since > current:
+            return None
+        if since == current:
+            return []
+        oldest = self._history[0][0]
+        if since + 1 < oldest:
+            # The client fell further behind than the history reaches
+            return None
+        return [(seq, payload) for seq, payload in self._history if seq > since]
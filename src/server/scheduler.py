@@ -0,0 +1,297 @@
+# src/server/scheduler.py
+
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from dataclasses import dataclass
+from datetime import datetime, time as time_of_day, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from src.config import settings
+from src.server.metrics import LatencyHistogram
+from src.utils import get_logger, SchedulerError
+
+logger = get_logger(__name__)
+
+# Heap entries: (due, job id); the id breaks ties in scheduling order
+_Entry = Tuple[float, int]
+
+
+@dataclass
+class Job:
+    """An action message to execute at ``due`` (scheduler clock), every ``every`` seconds if set."""
+
+    id: int
+    request: Dict[str, Any]
+    due: float
+    every: Optional[float] = None
+    runs: int = 0
+    last_result: Optional[Dict[str, Any]] = None
+
+
+class Scheduler:
+    """
+    Runs action messages at a later time, once or at a fixed interval.
+
+    Pending jobs are kept in a binary heap ordered by due time, so scheduling
+    is O(log n) and finding the next job is O(1). Cancelling only removes the
+    job from the index; its heap entry is skipped when it comes up, and the
+    heap is rebuilt once most of it is cancelled entries (amortized O(1)). A single
+    task sleeps until the earliest due time, so thousands of pending jobs
+    cost no timers of their own.
+
+    Jobs are started up to ``late_after`` seconds after their due time on
+    schedule; later starts count as missed deadlines. A recurring job that
+    missed whole periods (e.g. while the machine slept) runs once and skips
+    the periods it missed.
+    """
+
+    def __init__(
+        self,
+        execute: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+        clock: Callable[[], float] = time.monotonic,
+        wall_clock: Callable[[], float] = time.time,
+        max_jobs: int = settings.SCHEDULER_MAX_JOBS,
+        min_interval: float = settings.SCHEDULER_MIN_INTERVAL,
+        late_after: float = settings.SCHEDULER_LATE_AFTER,
+    ):
+        """
+        Args:
+            execute (Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]): Executes an
+                action message and returns its reply.
+            clock (Callable[[], float]): Monotonic clock due times are measured on.
+            wall_clock (Callable[[], float]): Epoch time, for jobs scheduled at a time of day.
+            max_jobs (int): Largest number of pending jobs.
+            min_interval (float): Shortest interval of a recurring job, in seconds.
+            late_after (float): Seconds after its due time a job start counts as a missed deadline.
+        """
+        self.execute = execute
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self.max_jobs = max_jobs
+        self.min_interval = min_interval
+        self.late_after = late_after
+        self._heap: List[_Entry] = []
+        self._jobs: Dict[int, Job] = {}
+        self._ids = itertools.count(1)
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
+        self.executed = 0
+        self.failed = 0
+        self.cancelled = 0
+        # Runs that started more than late_after seconds after their due time
+        self.missed = 0
+        # Periods of recurring jobs that were skipped because they were missed entirely
+        self.skipped = 0
+        # Seconds between due time and start of every run
+        self.lateness = LatencyHistogram()
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def schedule(
+        self,
+        request: Dict[str, Any],
+        delay: Optional[float] = None,
+        at: Optional[str] = None,
+        every: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Schedule an action message.
+
+        Args:
+            request (Dict[str, Any]): The action message to execute.
+            delay (Optional[float]): Seconds until the first run.
+            at (Optional[str]): Time of the first run: an ISO 8601 date and time, or a
+                time of day such as ``"02:00"`` for its next occurrence (local time).
+            every (Optional[float]): Repeat every this many seconds until cancelled.
+                Without ``delay`` or ``at`` the first run is one interval from now.
+
+        Returns:
+            Dict[str, Any]: The scheduled job, as listed by ``jobs``.
+
+        Raises:
+            SchedulerError: If the timing is invalid or too many jobs are pending.
+        """
+        if delay is not None and at is not None:
+            raise SchedulerError("Give either delay or at, not both")
+        if every is not None:
+            every = float(every)
+            if not every >= self.min_interval:
+                raise SchedulerError(f"Interval must be at least {self.min_interval}s")
+        if at is not None:
+            delay = self._seconds_until(at)
+        elif delay is None:
+            if every is None:
+                raise SchedulerError("Give delay, at or every")
+            delay = every
+        delay = float(delay)
+        if not delay >= 0 or math.isinf(delay):
+            raise SchedulerError(f"Invalid delay: {delay}")
+        if len(self._jobs) >= self.max_jobs:
+            raise SchedulerError(f"Too many scheduled jobs ({self.max_jobs})")
+
+        job = Job(next(self._ids), dict(request), self.clock() + delay, every)
+        self._jobs[job.id] = job
+        self._push(job)
+        logger.info(
+            "Scheduled %s as job %s in %.1fs", request.get("action"), job.id, delay
+        )
+        return self.describe(job)
+
+    def cancel(self, job_id: int) -> bool:
+        """Cancel a pending job; False if there is no such job."""
+        job = self._jobs.pop(job_id, None)
+        if job is None:
+            return False
+        self.cancelled += 1
+        # Rebuild once cancelled entries make up most of the heap
+        if len(self._heap) > 64 and len(self._heap) > 2 * len(self._jobs):
+            self._heap = [(pending.due, pending.id) for pending in self._jobs.values()]
+            heapq.heapify(self._heap)
+        return True
+
+    def jobs(self) -> List[Dict[str, Any]]:
+        """Pending jobs, soonest first."""
+        pending = sorted(self._jobs.values(), key=lambda job: (job.due, job.id))
+        return [self.describe(job) for job in pending]
+
+    def describe(self, job: Job) -> Dict[str, Any]:
+        due_in = max(0.0, job.due - self.clock())
+        at = datetime.fromtimestamp(self.wall_clock() + due_in)
+        return {
+            "job": job.id,
+            "request": job.request,
+            "due_in": round(due_in, 3),
+            "at": at.isoformat(timespec="seconds"),
+            "every": job.every,
+            "runs": job.runs,
+            "last_result": job.last_result,
+        }
+
+    def next_due(self) -> Optional[float]:
+        """Due time of the earliest pending job, or None if there is none."""
+        while self._heap:
+            due, job_id = self._heap[0]
+            job = self._jobs.get(job_id)
+            if job is not None and job.due == due:
+                return due
+            # Cancelled, or rescheduled with a newer entry
+            heapq.heappop(self._heap)
+        return None
+
+    def pop_due(self, now: float) -> List[Job]:
+        """
+        Take the jobs due at ``now``, in due order, and reschedule the recurring ones.
+
+        Returns:
+            List[Job]: The jobs to run; their lateness is recorded here.
+        """
+        due_jobs = []
+        while True:
+            due = self.next_due()
+            if due is None or due > now:
+                break
+            _, job_id = heapq.heappop(self._heap)
+            job = self._jobs[job_id]
+            due_jobs.append(job)
+
+            late = now - due
+            self.lateness.observe(late)
+            if late > self.late_after:
+                self.missed += 1
+                logger.warning("Job %s started %.1fs late", job.id, late)
+
+            if job.every is None:
+                del self._jobs[job.id]
+            else:
+                # Skip whole periods that were missed instead of running them back to back
+                periods = math.floor(late / job.every) + 1
+                self.skipped += periods - 1
+                job.due = due + periods * job.every
+                self._push(job)
+        return due_jobs
+
+    async def run_due(self) -> List[Job]:
+        """Run the jobs that are due now and wait for them to finish."""
+        due_jobs = self.pop_due(self.clock())
+        await asyncio.gather(*(self._run(job) for job in due_jobs))
+        return due_jobs
+
+    async def _run(self, job: Job):
+        job.runs += 1
+        try:
+            reply = await self.execute(dict(job.request))
+        except Exception as e:
+            reply = {"error": str(e)}
+        if "error" in reply:
+            self.failed += 1
+            logger.error("Scheduled job %s failed: %s", job.id, reply["error"])
+        self.executed += 1
+        job.last_result = reply
+
+    def start(self):
+        """Start running jobs on time in a background task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        for task in self._running:
+            task.cancel()
+
+    async def _loop(self):
+        while True:
+            self._wake.clear()
+            due = self.next_due()
+            timeout = None if due is None else max(0.0, due - self.clock())
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            # Jobs run in their own tasks so a slow action does not hold up the others
+            for job in self.pop_due(self.clock()):
+                task = asyncio.create_task(self._run(job))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+
+    def _push(self, job: Job):
+        entry = (job.due, job.id)
+        earliest = self.next_due()
+        heapq.heappush(self._heap, entry)
+        if earliest is None or job.due < earliest:
+            # The loop is sleeping until a later job
+            self._wake.set()
+
+    def _seconds_until(self, at: str) -> float:
+        now = self.wall_clock()
+        try:
+            target = datetime.combine(
+                datetime.fromtimestamp(now).date(), time_of_day.fromisoformat(at)
+            )
+            if target.timestamp() <= now:
+                target += timedelta(days=1)
+        except (TypeError, ValueError):
+            try:
+                target = datetime.fromisoformat(at)
+            except (TypeError, ValueError):
+                raise SchedulerError(f"Invalid time: {at}")
+            if target.timestamp() <= now:
+                raise SchedulerError(f"Time is in the past: {at}")
+        return target.timestamp() - now
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._jobs),
+            "executed": self.executed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "missed": self.missed,
+            "skipped": self.skipped,
+            "lateness": self.lateness.as_dict(),
+        }
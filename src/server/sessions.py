@@ -0,0 +1,247 @@
+# src/server/sessions.py
+
+import asyncio
+import itertools
+import secrets
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from src.config import settings
+from src.server.client_connection import SlowConsumerPolicy
+from src.server.codec import Codec, Payload
+from src.utils import get_logger, ConnectionError
+
+logger = get_logger(__name__)
+
+
+class Session:
+    """
+    Outgoing side of a client that may reconnect.
+
+    Every message sent to the client through the session is numbered, from 1
+    in the order it was queued, and kept in a bounded replay ring. The client
+    counts the messages it received; after a reconnect it reports that count
+    and gets the messages after it again. While no connection is attached,
+    messages are only recorded.
+    """
+
+    def __init__(self, token: str, codec: Codec, replay_size: int):
+        self.token = token
+        # Number of the last message queued
+        self.seq = 0
+        self._ring: Deque[Payload] = deque(maxlen=replay_size)
+        self._codec = codec
+        self.connection = None
+        # Websocket of the current (or last) connection; subscriptions are keyed by it
+        self.websocket: Any = None
+        # Request pipelines of dropped connections by websocket, until their requests finish
+        self.pipelines: Dict[Any, Any] = {}
+        # Grace period timer while no connection is attached
+        self.expiry: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def codec(self) -> Codec:
+        return self.connection.codec if self.connection else self._codec
+
+    @property
+    def attached(self) -> bool:
+        return self.connection is not None
+
+    def enqueue(self, payload: Payload, key: Optional[str] = None) -> bool:
+        """
+        Record a message and queue it for the attached connection, if any.
+
+        The coalescing key is ignored: replacing a queued message would
+        break the numbering the client counts on.
+        """
+        self.seq += 1
+        self._ring.append(payload)
+        if self.connection is not None:
+            self.connection.enqueue(payload)
+        return True
+
+    def missed(self, ack: int) -> Tuple[List[Payload], bool]:
+        """
+        Get the recorded messages after ``ack``.
+
+        Returns:
+            Tuple[List[Payload], bool]: The messages still in the ring, and whether
+            they are all of them (False if some were already pushed out).
+        """
+        first = self.seq - len(self._ring) + 1
+        start = max(ack + 1, first)
+        return list(itertools.islice(self._ring, start - first, None)), ack + 1 >= first
+
+    def attach(self, websocket: Any, connection: Any):
+        self.websocket = websocket
+        self.connection = connection
+        connection.session = self
+
+    def detach(self):
+        self._codec = self.connection.codec
+        self.connection.session = None
+        self.connection = None
+
+
+class SessionStore:
+    """
+    Sessions by token, kept for ``grace_period`` seconds after their client disconnects.
+
+    Messages addressed to any websocket a session was ever attached to are
+    routed to it, so replies to requests that were running when the
+    connection dropped are recorded too.
+    """
+
+    def __init__(
+        self,
+        on_expire: Callable[[Session], None],
+        replay_size: int = settings.SESSION_REPLAY_SIZE,
+        grace_period: float = settings.SESSION_GRACE_PERIOD,
+    ):
+        """
+        Args:
+            on_expire (Callable[[Session], None]): Releases what an expired session holds.
+            replay_size (int): Messages kept per session for replay.
+            grace_period (float): Seconds a disconnected session is kept.
+        """
+        self.on_expire = on_expire
+        self.replay_size = replay_size
+        self.grace_period = grace_period
+        self._sessions: Dict[str, Session] = {}
+        self._by_websocket: Dict[Any, Session] = {}
+        self.opened = 0
+        self.resumed = 0
+        self.replayed = 0
+        self.expired = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def for_websocket(self, websocket: Any) -> Optional[Session]:
+        return self._by_websocket.get(websocket)
+
+    def detached(self) -> List[Session]:
+        return [session for session in self._sessions.values() if not session.attached]
+
+    def open(self, websocket: Any, connection: Any) -> Session:
+        """Start a session on a connection."""
+        session = Session(secrets.token_urlsafe(16), connection.codec, self.replay_size)
+        self._sessions[session.token] = session
+        self._attach(session, websocket, connection)
+        self.opened += 1
+        return session
+
+    def resume(
+        self, token: str, ack: int, websocket: Any, connection: Any
+    ) -> Tuple[Session, Any, List[Payload], bool]:
+        """
+        Move a session to a new connection and replay what the client missed.
+
+        The missed messages are queued on the connection directly, ahead of
+        anything sent through the session afterwards.
+
+        Args:
+            token (str): The session token.
+            ack (int): Number of messages the client received in the session.
+            websocket (Any): The new connection's websocket.
+            connection (Any): The new connection.
+
+        Returns:
+            Tuple[Session, Any, List[Payload], bool]: The session, the websocket it
+            was attached to before, the replayed messages and whether none were lost.
+
+        Raises:
+            ConnectionError: If the session is unknown or expired, or ``ack`` is invalid.
+        """
+        session = self._sessions.get(token) if isinstance(token, str) else None
+        if session is None:
+            raise ConnectionError("Unknown or expired session")
+        if not isinstance(ack, int) or not 0 <= ack <= session.seq:
+            raise ConnectionError(
+                f"Invalid ack {ack}; the session has sent {session.seq} messages"
+            )
+        if session.expiry is not None:
+            session.expiry.cancel()
+            session.expiry = None
+
+        previous = session.websocket
+        if session.attached:
+            # The old connection has not noticed it is gone yet
+            session.detach()
+        connection.codec = session.codec
+        self._attach(session, websocket, connection)
+        missed, complete = session.missed(ack)
+        for payload in missed:
+            connection.enqueue(payload)
+        self.resumed += 1
+        self.replayed += len(missed)
+        logger.info("Resumed session with %s missed messages", len(missed))
+        return session, previous, missed, complete
+
+    def _attach(self, session: Session, websocket: Any, connection: Any):
+        session.attach(websocket, connection)
+        self._by_websocket[websocket] = session
+        # A session connection that falls behind is disconnected rather than
+        # dropping messages, and catches up by resuming
+        connection.policy = SlowConsumerPolicy.DISCONNECT
+
+    def release(self, session: Session, websocket: Any):
+        """
+        Stop routing messages addressed to an old websocket of a session.
+
+        Does nothing while the websocket is the session's current one or its
+        dropped connection is still finishing requests, whose replies must
+        still be recorded.
+        """
+        if (
+            websocket is not session.websocket
+            and websocket not in session.pipelines
+            and self._by_websocket.get(websocket) is session
+        ):
+            del self._by_websocket[websocket]
+
+    def disconnected(self, websocket: Any) -> Optional[Session]:
+        """
+        Handle a closed connection that belonged to a session.
+
+        If it was the session's current connection, the session is detached
+        and its grace period starts; a connection the session already moved
+        away from changes nothing.
+
+        Returns:
+            Optional[Session]: The session, or None if the websocket never had one.
+        """
+        session = self._by_websocket.get(websocket)
+        if session is not None and session.websocket is websocket and session.attached:
+            session.detach()
+            loop = asyncio.get_running_loop()
+            session.expiry = loop.call_later(self.grace_period, self._expire, session)
+        return session
+
+    def _expire(self, session: Session):
+        session.expiry = None
+        if session.attached:
+            session.detach()
+        self._sessions.pop(session.token, None)
+        for websocket in [ws for ws, s in self._by_websocket.items() if s is session]:
+            del self._by_websocket[websocket]
+        self.expired += 1
+        logger.info("Session expired after %s messages", session.seq)
+        self.on_expire(session)
+
+    def close(self):
+        """Expire every session now, e.g. when the server stops."""
+        for session in list(self._sessions.values()):
+            if session.expiry is not None:
+                session.expiry.cancel()
+            self._expire(session)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "active": len(self._sessions),
+            "detached": len(self.detached()),
+            "opened": self.opened,
+            "resumed": self.resumed,
+            "replayed": self.replayed,
+            "expired": self.expired,
+        }
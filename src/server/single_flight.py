@@ -0,0 +1,117 @@
+# src/server/single_flight.py
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from src.server.codec import Codec, Payload, SharedMessage
+
+# Marks a SharedReply without a request ID (IDs may be any JSON value, including None)
+_NO_ID = object()
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls.
+
+    The first caller for a key runs the call; callers arriving with the same
+    key while it runs wait for the same result (or exception) instead of
+    starting their own. Nothing is cached once the call finishes, so a later
+    call always sees fresh data.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        # Calls started and calls that joined one already running, by name
+        self.executed: Dict[str, int] = {}
+        self.shared: Dict[str, int] = {}
+
+    async def do(
+        self, name: str, key: Hashable, call: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Run ``call``, or wait for the identical call already running.
+
+        Args:
+            name (str): Name the call is counted under, e.g. the action.
+            key (Hashable): Identifies identical calls.
+            call (Callable[[], Awaitable[Any]]): Starts the call.
+
+        Returns:
+            Any: The result of the call.
+        """
+        future = self._calls.get(key)
+        if future is not None:
+            self.shared[name] = self.shared.get(name, 0) + 1
+            # Shielded so one waiter being cancelled does not cancel the others
+            return await asyncio.shield(future)
+
+        self.executed[name] = self.executed.get(name, 0) + 1
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await call()
+        except BaseException as e:
+            future.set_exception(e)
+            # Retrieved here so a call nobody joined does not log "never retrieved"
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Executed and shared call counts with the share ratio, by name."""
+        stats = {}
+        for name, executed in self.executed.items():
+            shared = self.shared.get(name, 0)
+            stats[name] = {
+                "executed": executed,
+                "shared": shared,
+                "hit_ratio": round(shared / (executed + shared), 3),
+            }
+        return stats
+
+
+class SharedReply(dict):
+    """
+    Reply to one of several coalesced requests.
+
+    It is an ordinary reply dictionary, but encoding goes through the
+    SharedMessage built once for the call, so every client using the same
+    codec gets the same payload. The request ID, if any, is added to the
+    shared payload by ``Codec.tag``.
+    """
+
+    __slots__ = ("shared", "request_id")
+
+    def __init__(self, shared: SharedMessage, request_id: Any = _NO_ID):
+        super().__init__(shared.message)
+        if request_id is not _NO_ID:
+            self["id"] = request_id
+        self.shared = shared
+        self.request_id = request_id
+
+    def with_id(self, request_id: Any) -> "SharedReply":
+        return SharedReply(self.shared, request_id)
+
+    def encode(self, codec: Codec) -> Payload:
+        payload = self.shared.encode(codec)
+        if self.request_id is _NO_ID:
+            return payload
+        return codec.tag(payload, self.shared.message, self.request_id)
+
+
+def shared_key(name: str, kwargs: Dict[str, Any]) -> Optional[Hashable]:
+    """Key identifying calls of ``name`` with these arguments, or None if they are not hashable."""
+    key = (name, tuple(sorted(kwargs.items())))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
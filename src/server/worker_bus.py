@@ -0,0 +1,200 @@
+# src/server/worker_bus.py
+
+import asyncio
+import itertools
+import json
+import os
+import struct
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from src.config import settings
+from src.utils import get_logger, CommandError
+
+logger = get_logger(__name__)
+
+# Frames are a 4-byte big-endian length followed by a JSON document
+_HEADER = struct.Struct("!I")
+
+
+async def write_frame(writer: asyncio.StreamWriter, message: Dict[str, Any]):
+    data = json.dumps(message).encode("utf-8")
+    writer.write(_HEADER.pack(len(data)) + data)
+    await writer.drain()
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Dict[str, Any]:
+    header = await reader.readexactly(_HEADER.size)
+    (length,) = _HEADER.unpack(header)
+    return json.loads(await reader.readexactly(length))
+
+
+class WorkerBus:
+    """
+    Local message bus between the worker processes of one server.
+
+    Every worker listens on a Unix socket in ``socket_dir``. Broadcasts are
+    fanned out to every other worker, which delivers them to its own
+    clients, and calls for stateful actions are forwarded to the owner
+    worker so they run exactly once. The owner also shares its process
+    table scans, so the other workers do not scan the same processes again,
+    and every worker relays the controller events it publishes, so event
+    subscribers get them whichever worker they are connected to.
+    """
+
+    def __init__(
+        self,
+        index: int,
+        count: int,
+        socket_dir: str,
+        owner: int = settings.WORKER_OWNER,
+        call_timeout: float = settings.WORKER_CALL_TIMEOUT,
+    ):
+        self.index = index
+        self.count = count
+        self.socket_dir = socket_dir
+        self.owner = owner
+        self.call_timeout = call_timeout
+        # Delivers a broadcast received from another worker to local clients
+        self.on_broadcast: Optional[Callable[[Any, Optional[str]], None]] = None
+        # Executes an action forwarded to the owner and returns its reply
+        self.on_call: Optional[Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]] = None
+        # Loads a process table scan shared by the owner
+        self.on_processes: Optional[Callable[[List[Any]], None]] = None
+        # Publishes a controller event relayed by another worker to local subscribers
+        self.on_event: Optional[Callable[[str, Dict[str, Any], Any], None]] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._peers: Dict[int, asyncio.StreamWriter] = {}
+        self._peer_locks: Dict[int, asyncio.Lock] = {}
+        self._calls: Dict[int, asyncio.Future] = {}
+        self._call_ids = itertools.count()
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def is_owner(self) -> bool:
+        return self.index == self.owner
+
+    def path(self, index: int) -> str:
+        return os.path.join(self.socket_dir, f"worker-{index}.sock")
+
+    async def start(self):
+        path = self.path(self.index)
+        if os.path.exists(path):
+            os.unlink(path)
+        self._server = await asyncio.start_unix_server(self._handle_peer, path=path)
+
+    async def close(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        for writer in self._peers.values():
+            writer.close()
+        self._peers.clear()
+        for task in list(self._tasks):
+            task.cancel()
+        for future in self._calls.values():
+            future.cancel()
+        self._calls.clear()
+
+    def _spawn(self, coro: Awaitable[Any]):
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _connect(self, index: int) -> asyncio.StreamWriter:
+        lock = self._peer_locks.setdefault(index, asyncio.Lock())
+        async with lock:
+            writer = self._peers.get(index)
+            if writer is None or writer.is_closing():
+                reader, writer = await asyncio.open_unix_connection(self.path(index))
+                self._peers[index] = writer
+                self._spawn(self._read_replies(index, reader))
+            return writer
+
+    async def _send(self, index: int, message: Dict[str, Any]) -> bool:
+        try:
+            await write_frame(await self._connect(index), message)
+            return True
+        except OSError as e:
+            logger.warning("Worker %s cannot reach worker %s: %s", self.index, index, e)
+            self._peers.pop(index, None)
+            return False
+
+    async def publish(self, message: Any, key: Optional[str] = None):
+        """Deliver a broadcast to the clients of every other worker."""
+        frame = {"type": "broadcast", "message": message, "key": key}
+        await asyncio.gather(
+            *[self._send(index, frame) for index in range(self.count) if index != self.index]
+        )
+
+    async def share_processes(self, rows: List[Any]):
+        """Send the rows of a process table scan to every other worker."""
+        frame = {"type": "processes", "rows": rows}
+        await asyncio.gather(
+            *[self._send(index, frame) for index in range(self.count) if index != self.index]
+        )
+
+    async def share_event(self, topic: str, event: Dict[str, Any], key: Any = None):
+        """Send a controller event to every other worker."""
+        frame = {"type": "event", "topic": topic, "event": event, "key": key}
+        await asyncio.gather(
+            *[self._send(index, frame) for index in range(self.count) if index != self.index]
+        )
+
+    async def call(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Execute an action message on the owner worker.
+
+        Returns:
+            Dict[str, Any]: The owner's reply.
+
+        Raises:
+            CommandError: If the owner cannot be reached or does not reply in time.
+        """
+        call_id = next(self._call_ids)
+        future = asyncio.get_running_loop().create_future()
+        self._calls[call_id] = future
+        try:
+            frame = {"type": "call", "id": call_id, "data": data}
+            if not await self._send(self.owner, frame):
+                raise CommandError("Owner worker is unavailable")
+            return await asyncio.wait_for(future, self.call_timeout)
+        except asyncio.TimeoutError:
+            raise CommandError("Owner worker did not reply in time")
+        finally:
+            self._calls.pop(call_id, None)
+
+    async def _read_replies(self, index: int, reader: asyncio.StreamReader):
+        try:
+            while True:
+                frame = await read_frame(reader)
+                future = self._calls.get(frame.get("id"))
+                if future is not None and not future.done():
+                    future.set_result(frame["reply"])
+        except (asyncio.IncompleteReadError, ConnectionError):
+            self._peers.pop(index, None)
+
+    async def _handle_peer(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        try:
+            while True:
+                frame = await read_frame(reader)
+                if frame["type"] == "broadcast" and self.on_broadcast:
+                    self.on_broadcast(frame["message"], frame.get("key"))
+                elif frame["type"] == "processes" and self.on_processes:
+                    self.on_processes(frame["rows"])
+                elif frame["type"] == "event" and self.on_event:
+                    self.on_event(frame["topic"], frame["event"], frame.get("key"))
+                elif frame["type"] == "call" and self.on_call:
+                    self._spawn(self._answer(writer, frame))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _answer(self, writer: asyncio.StreamWriter, frame: Dict[str, Any]):
+        reply = await self.on_call(frame["data"])
+        try:
+            await write_frame(writer, {"type": "reply", "id": frame["id"], "reply": reply})
+        except OSError as e:
+            logger.warning("Worker %s failed to reply to a call: %s", self.index, e)
@@ -0,0 +1,129 @@
+# src/server/workers.py
+
+import asyncio
+import multiprocessing
+import shutil
+import socket
+import tempfile
+from typing import Callable, List, Optional
+
+from src.config import settings
+from src.utils import get_logger, ConfigurationError
+
+logger = get_logger(__name__)
+
+
+def default_server_factory(**kwargs):
+    from src.server.nebulalink_server import NebulaLinkServer
+
+    return NebulaLinkServer(**kwargs)
+
+
+def _worker_main(
+    index: int,
+    count: int,
+    host: str,
+    port: int,
+    socket_dir: str,
+    server_factory: Callable[..., object],
+):
+    from src.server.worker_bus import WorkerBus
+    from src.utils import configure_logging
+
+    # Spawned workers start without the parent's logging setup
+    configure_logging()
+    bus = WorkerBus(index, count, socket_dir)
+    server = server_factory(host=host, port=port, bus=bus)
+    try:
+        asyncio.run(server.run())
+    except KeyboardInterrupt:
+        pass
+
+
+class WorkerPool:
+    """
+    Runs the server in several processes that share one listening port.
+
+    Each worker binds the port with SO_REUSEPORT, so the kernel spreads
+    incoming connections across workers and parsing and fan-out scale with
+    cores. Workers are connected by a WorkerBus over Unix sockets: broadcasts
+    reach the clients of every worker, and stateful actions (WORKER_OWNED_ACTIONS)
+    are forwarded to worker WORKER_OWNER so they are not run more than once.
+
+    SO_REUSEPORT and Unix sockets are only available on Linux/BSD/macOS.
+    """
+
+    def __init__(
+        self,
+        count: int = settings.WORKERS,
+        host: str = settings.HOST,
+        port: int = settings.PORT,
+        server_factory: Callable[..., object] = default_server_factory,
+    ):
+        if not hasattr(socket, "SO_REUSEPORT") or not hasattr(socket, "AF_UNIX"):
+            raise ConfigurationError(
+                "Multi-worker mode requires SO_REUSEPORT and Unix sockets"
+            )
+        if count < 1:
+            raise ConfigurationError("Worker count must be at least 1")
+        self.count = count
+        self.host = host
+        self.port = port
+        self.server_factory = server_factory
+        self.socket_dir: Optional[str] = None
+        self.processes: List[multiprocessing.Process] = []
+
+    def start(self):
+        self.socket_dir = tempfile.mkdtemp(prefix="nebulalink-")
+        # Spawned workers import a clean interpreter instead of inheriting parent state
+        context = multiprocessing.get_context("spawn")
+        for index in range(self.count):
+            process = context.Process(
+                target=_worker_main,
+                args=(
+                    index,
+                    self.count,
+                    self.host,
+                    self.port,
+                    self.socket_dir,
+                    self.server_factory,
+                ),
+                name=f"nebulalink-worker-{index}",
+                daemon=True,
+            )
+            process.start()
+            self.processes.append(process)
+        logger.info(
+            "Started %s workers on %s:%s (owner: worker %s)",
+            self.count,
+            self.host,
+            self.port,
+            settings.WORKER_OWNER,
+        )
+
+    def join(self):
+        for process in self.processes:
+            process.join()
+
+    def stop(self, timeout: float = 5.0):
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()
+        for process in self.processes:
+            process.join(timeout)
+        self.processes.clear()
+        if self.socket_dir:
+            shutil.rmtree(self.socket_dir, ignore_errors=True)
+            self.socket_dir = None
+        logger.info("Workers stopped")
+
+
+def run_workers(count: int = settings.WORKERS, host: str = settings.HOST, port: int = settings.PORT):
+    pool = WorkerPool(count, host, port)
+    pool.start()
+    try:
+        pool.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.stop()
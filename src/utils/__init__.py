@@ -1,6 +1,12 @@
 # src/utils/__init__.py
 
-from .logging_config import setup_logger, get_logger
+from .logging_config import (
+    setup_logger,
+    configure_logging,
+    shutdown_logging,
+    dropped_records,
+    get_logger
+)
 from .error_handling import (
     NebulaLinkError,
     ConfigurationError,
@@ -9,12 +15,19 @@ from .error_handling import (
     PowerControlError,
     DisplayControlError,
     ProgramControlError,
+    SchedulerError,
     handle_error,
     log_and_raise
 )
+from .timing import PhaseTimer
+from .command_runner import CommandRunner, CommandResult, command_runner
+from .events import EventBus, event_bus
 
 __all__ = [
     'setup_logger',
+    'configure_logging',
+    'shutdown_logging',
+    'dropped_records',
     'get_logger',
     'NebulaLinkError',
     'ConfigurationError',
@@ -23,6 +36,13 @@ __all__ = [
     'PowerControlError',
     'DisplayControlError',
     'ProgramControlError',
+    'SchedulerError',
     'handle_error',
-    'log_and_raise'
+    'log_and_raise',
+    'PhaseTimer',
+    'CommandRunner',
+    'CommandResult',
+    'command_runner',
+    'EventBus',
+    'event_bus'
 ]
\ No newline at end of file
@@ -0,0 +1,190 @@
+# src/utils/command_runner.py
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.config import settings
+from src.utils.error_handling import CommandError
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Bytes read from a pipe at a time
+_CHUNK_SIZE = 4096
+
+
+@dataclass
+class CommandResult:
+    """Outcome of a finished command."""
+
+    args: List[str]
+    returncode: int
+    stdout: str
+    stderr: str
+    duration: float
+    # True when output beyond the runner's max_output was discarded
+    truncated: bool = False
+
+
+@dataclass
+class CommandStats:
+    """Latency and outcome counters for one program."""
+
+    count: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+
+    def record(self, duration: float, failed: bool = False, timed_out: bool = False):
+        self.count += 1
+        self.failures += failed
+        self.timeouts += timed_out
+        self.total_time += duration
+        self.max_time = max(self.max_time, duration)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "avg_ms": round(self.total_time / self.count * 1000, 3) if self.count else 0.0,
+            "max_ms": round(self.max_time * 1000, 3),
+        }
+
+
+class CommandRunner:
+    """
+    Runs external commands without blocking the event loop.
+
+    Commands are started with ``asyncio.create_subprocess_exec``; at most
+    ``max_concurrency`` run at once and each is killed after ``timeout``
+    seconds. Output is read in chunks while the command runs and capped at
+    ``max_output`` bytes per stream, so a chatty command cannot fill the
+    pipe or memory. Latency is recorded per program name.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = settings.COMMAND_CONCURRENCY,
+        timeout: float = settings.COMMAND_TIMEOUT,
+        max_output: int = settings.COMMAND_MAX_OUTPUT,
+    ):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_output = max_output
+        self.stats: Dict[str, CommandStats] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _limit(self) -> asyncio.Semaphore:
+        # Asyncio primitives belong to one loop; the shared runner may outlive it
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    async def _read(self, stream: asyncio.StreamReader) -> tuple:
+        chunks = []
+        size = 0
+        truncated = False
+        while True:
+            chunk = await stream.read(_CHUNK_SIZE)
+            if not chunk:
+                break
+            if size < self.max_output:
+                chunks.append(chunk[: self.max_output - size])
+            truncated = truncated or size + len(chunk) > self.max_output
+            size += len(chunk)
+        return b"".join(chunks).decode("utf-8", errors="replace"), truncated
+
+    async def run(
+        self,
+        args: Sequence[str],
+        timeout: Optional[float] = None,
+        check: bool = True,
+    ) -> CommandResult:
+        """
+        Run a command and capture its output.
+
+        Args:
+            args (Sequence[str]): Program and arguments; no shell is involved.
+            timeout (Optional[float]): Seconds before the command is killed; defaults to the runner's.
+            check (bool): Raise if the command exits with a non-zero code.
+
+        Returns:
+            CommandResult: The exit code, output and duration.
+
+        Raises:
+            CommandError: If the command cannot be started, times out, or fails with check=True.
+        """
+        args = [str(arg) for arg in args]
+        program = os.path.basename(args[0])
+        stats = self.stats.setdefault(program, CommandStats())
+        timeout = self.timeout if timeout is None else timeout
+
+        async with self._limit():
+            started = time.perf_counter()
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *args,
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+            except OSError as e:
+                stats.record(time.perf_counter() - started, failed=True)
+                raise CommandError(f"Failed to start {program}: {str(e)}")
+
+            try:
+                (stdout, out_truncated), (stderr, err_truncated), returncode = (
+                    await asyncio.wait_for(
+                        asyncio.gather(
+                            self._read(process.stdout),
+                            self._read(process.stderr),
+                            process.wait(),
+                        ),
+                        timeout,
+                    )
+                )
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                duration = time.perf_counter() - started
+                stats.record(duration, failed=True, timed_out=True)
+                logger.warning("Command %s timed out after %.1fs", program, duration)
+                raise CommandError(f"{program} timed out after {timeout}s")
+            except asyncio.CancelledError:
+                process.kill()
+                raise
+
+        duration = time.perf_counter() - started
+        stats.record(duration, failed=returncode != 0)
+        logger.debug(
+            "Command %s exited with %s in %.1fms",
+            program,
+            returncode,
+            duration * 1000,
+        )
+        result = CommandResult(
+            args, returncode, stdout, stderr, duration, out_truncated or err_truncated
+        )
+        if check and returncode != 0:
+            detail = stderr.strip() or stdout.strip()
+            raise CommandError(
+                f"{program} exited with code {returncode}"
+                + (f": {detail}" if detail else "")
+            )
+        return result
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-program latency metrics, keyed by program name."""
+        return {program: stats.as_dict() for program, stats in self.stats.items()}
+
+
+# Shared by the controllers so the concurrency limit applies across all of them
+command_runner = CommandRunner()
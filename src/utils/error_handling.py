@@ -50,6 +50,12 @@ class ProgramControlError(NebulaLinkError):
     pass
 
 
+class SchedulerError(NebulaLinkError):
+    """Raised when an action cannot be scheduled."""
+
+    pass
+
+
 def handle_error(error: Exception) -> Dict[str, Any]:
     """
     Handle exceptions and return a dictionary with error details.
@@ -63,7 +69,7 @@ def handle_error(error: Exception) -> Dict[str, Any]:
     error_type = type(error).__name__
     error_message = str(error)
 
-    logger.error(f"Error occurred: {error_type} - {error_message}")
+    logger.error("Error occurred: %s - %s", error_type, error_message)
 
     return {"error": error_type, "message": error_message}
 
@@ -78,7 +84,7 @@ def log_and_raise(error: Exception):
     Raises:
         Exception: The same exception that was passed in.
     """
-    logger.error(f"Error occurred: {type(error).__name__} - {str(error)}")
+    logger.error("Error occurred: %s - %s", type(error).__name__, error)
     raise error
 
 
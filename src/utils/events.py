@@ -0,0 +1,60 @@
+# src/utils/events.py
+
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Topics the controllers publish to
+TOPICS = ("display", "power", "programs")
+
+EventListener = Callable[[str, Dict[str, Any], Optional[Hashable]], None]
+
+
+class EventBus:
+    """
+    In-process publish/subscribe channel for state changes.
+
+    Controllers publish an event (a small dictionary with a ``type``) to a
+    topic after they changed something; listeners are called synchronously
+    on the publishing thread, which may be a pool or background thread, so
+    they must only hand the event off. An event may carry a key naming what
+    it is about (a display, a process); consumers use it to merge events
+    about the same thing.
+    """
+
+    def __init__(self):
+        self._listeners: List[EventListener] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, listener: EventListener):
+        with self._lock:
+            self._listeners = self._listeners + [listener]
+
+    def unsubscribe(self, listener: EventListener):
+        with self._lock:
+            self._listeners = [item for item in self._listeners if item != listener]
+
+    def publish(
+        self, topic: str, event: Dict[str, Any], key: Optional[Hashable] = None
+    ):
+        """
+        Publish an event to every listener.
+
+        Args:
+            topic (str): One of TOPICS.
+            event (Dict[str, Any]): The event; must not be modified afterwards.
+            key (Optional[Hashable]): What the event is about, for merging.
+        """
+        # The list is replaced, never modified, so it can be iterated without the lock
+        for listener in self._listeners:
+            try:
+                listener(topic, event, key)
+            except Exception as e:
+                logger.error("Event listener failed: %s", e)
+
+
+# Shared by the controllers and the server unless they are given their own bus
+event_bus = EventBus()
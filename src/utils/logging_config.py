@@ -1,18 +1,99 @@
 # src/utils/logging_config.py
 
+import atexit
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import os
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
-def setup_logger(name: str, log_file: Optional[str] = None, level: int = logging.INFO) -> logging.Logger:
+from src.config import settings
+
+# Text format used by the console and file handlers
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Pipelines installed by setup_logger, by logger name
+_pipelines: Dict[str, Tuple["BoundedQueueHandler", QueueListener]] = {}
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry)
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    QueueHandler for a bounded queue.
+
+    The calling thread only merges the message arguments and enqueues the
+    record; formatting and I/O happen on the QueueListener thread. When the
+    queue is full the record is dropped (and counted) with the "drop" policy,
+    or the caller waits for room with the "block" policy.
+    """
+
+    def __init__(self, log_queue: queue.Queue, policy: str = settings.LOG_QUEUE_POLICY):
+        super().__init__(log_queue)
+        if policy not in ("drop", "block"):
+            raise ValueError(f"Unknown log queue policy: {policy}")
+        self.policy = policy
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Unlike QueueHandler.prepare, leave formatting to the listener thread;
+        # only resolve what may change or go away after this call returns
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        if self.policy == "block":
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def setup_logger(
+    name: str,
+    log_file: Optional[str] = None,
+    level: int = logging.INFO,
+    json_format: bool = settings.LOG_JSON,
+    queue_size: int = settings.LOG_QUEUE_SIZE,
+    policy: str = settings.LOG_QUEUE_POLICY,
+    console: bool = True,
+) -> logging.Logger:
     """
     Set up a logger with console and optionally file output.
 
+    Records go through a bounded queue to a listener thread that owns the
+    console and file handlers, so logging never blocks the event loop on I/O.
+    Calling this again for the same logger replaces its pipeline instead of
+    adding handlers.
+
     Args:
         name (str): Name of the logger.
         log_file (Optional[str]): Path to the log file. If None, only console logging is set up.
         level (int): Logging level. Defaults to logging.INFO.
+        json_format (bool): Write one JSON object per record instead of text.
+        queue_size (int): Records buffered between the logger and the listener thread.
+        policy (str): "drop" or "block" when the queue is full.
+        console (bool): Also write to the console (stderr).
 
     Returns:
         logging.Logger: Configured logger instance.
@@ -20,23 +101,59 @@ def setup_logger(name: str, log_file: Optional[str] = None, level: int = logging
     # Create logger
     logger = logging.getLogger(name)
     logger.setLevel(level)
+    shutdown_logger(name)
 
     # Create formatter
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    formatter = JsonFormatter() if json_format else logging.Formatter(LOG_FORMAT)
 
     # Create console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    handlers = []
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
 
     # Create file handler if log_file is provided
     if log_file:
         file_handler = RotatingFileHandler(log_file, maxBytes=1024*1024, backupCount=5)
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
 
+    queue_handler = BoundedQueueHandler(queue.Queue(queue_size), policy)
+    listener = QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    logger.addHandler(queue_handler)
+    listener.start()
+    _pipelines[name] = (queue_handler, listener)
     return logger
 
+
+def shutdown_logger(name: str):
+    """Detach a logger's pipeline, writing out the records still queued."""
+    pipeline = _pipelines.pop(name, None)
+    if pipeline:
+        queue_handler, listener = pipeline
+        logging.getLogger(name).removeHandler(queue_handler)
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+@atexit.register
+def shutdown_logging():
+    for name in list(_pipelines):
+        shutdown_logger(name)
+
+
+def dropped_records() -> int:
+    """Records dropped by full log queues since they were set up."""
+    return sum(handler.dropped for handler, _ in _pipelines.values())
+
+
+def configure_logging(log_file: Optional[str] = settings.LOG_FILE) -> logging.Logger:
+    """Set up the ``src`` logger, the parent of every server module's logger, from settings."""
+    return setup_logger("src", log_file, logging.getLevelName(settings.LOG_LEVEL))
+
+
 def get_logger(name: str) -> logging.Logger:
     """
     Get or create a logger with the given name.
@@ -65,4 +182,4 @@ if __name__ == "__main__":
 
     # Get a logger for a specific module
     module_logger = get_logger("nebulalink.server")
-    module_logger.info("This is a log message from a specific module")
\ No newline at end of file
+    module_logger.info("This is a log message from a specific module")
@@ -0,0 +1,37 @@
+# src/utils/timing.py
+
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Tuple
+
+
+class PhaseTimer:
+    """Records how long consecutive named phases take, e.g. during startup."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - started))
+
+    @property
+    def total(self) -> float:
+        return time.perf_counter() - self.started
+
+    def report(self) -> str:
+        """
+        Format the recorded phases for logging.
+
+        Returns:
+            str: e.g. ``"controllers 0.1ms, listen 2.3ms (total 2.5ms)"``.
+        """
+        phases = ", ".join(
+            f"{name} {duration * 1000:.1f}ms" for name, duration in self.phases
+        )
+        return f"{phases} (total {self.total * 1000:.1f}ms)"
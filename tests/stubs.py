@@ -0,0 +1,314 @@
+# tests/stubs.py
+
+"""Platform-independent stand-ins for the controllers, used to exercise the server on any OS."""
+
+import asyncio
+import fnmatch
+from typing import Any, Dict, List
+
+from src.controllers.display_backend import DisplayBackend
+from src.controllers.process_table import ProcessTableDiff
+from src.utils import CommandResult, DisplayControlError
+
+POWERCFG_LIST = """
+Existing Power Schemes (* Active)
+-----------------------------------
+Power Scheme GUID: 381b4222-f694-41f0-9685-ff5bb260df2e  (Balanced) *
+Power Scheme GUID: 8c5e7fda-e8bf-4a96-9a85-a6e23a8c635c  (High performance)
+Power Scheme GUID: a1841308-3541-4fab-bc81-f71556f20b4a  (Power saver)
+"""
+
+
+class FakeCommandRunner:
+    """Records commands instead of running them; answers with fixed output."""
+
+    def __init__(self, stdout: str = "", error: Exception = None):
+        self.stdout = stdout
+        self.error = error
+        self.commands: List[List[str]] = []
+
+    async def run(self, args, timeout=None, check=True) -> CommandResult:
+        self.commands.append(list(args))
+        if self.error:
+            raise self.error
+        return CommandResult(list(args), 0, self.stdout, "", 0.0)
+
+
+class StubPowerController:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls: List[str] = []
+        self.power_plans = [
+            {"guid": "381b4222-f694-41f0-9685-ff5bb260df2e", "name": "Balanced"},
+            {"guid": "8c5e7fda-e8bf-4a96-9a85-a6e23a8c635c", "name": "High performance"},
+        ]
+
+    async def _call(self, name: str, message: str) -> Dict[str, str]:
+        self.calls.append(name)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return {"status": "success", "message": message}
+
+    async def shutdown(self) -> Dict[str, str]:
+        return await self._call("shutdown", "Shutdown initiated")
+
+    async def restart(self) -> Dict[str, str]:
+        return await self._call("restart", "Restart initiated")
+
+    async def sleep(self) -> Dict[str, str]:
+        return await self._call("sleep", "Sleep mode initiated")
+
+    async def hibernate(self) -> Dict[str, str]:
+        return await self._call("hibernate", "Hibernation initiated")
+
+    async def get_power_plans(self) -> List[Dict[str, str]]:
+        return self.power_plans
+
+    async def set_power_plan(self, guid: str) -> Dict[str, str]:
+        return await self._call("set_power_plan", f"Power plan set to {guid}")
+
+
+class StubDisplayController:
+    def __init__(self):
+        self.displays = [
+            {
+                "id": 0,
+                "name": "\\\\.\\DISPLAY1",
+                "friendly_name": "Stub Display",
+                "resolution": "1920x1080",
+                "refresh_rate": 60,
+            }
+        ]
+
+    def get_display_info(self) -> List[Dict[str, Any]]:
+        return self.displays
+
+    def set_resolution(self, display_id: int, width: int, height: int) -> Dict[str, str]:
+        self.displays[display_id]["resolution"] = f"{width}x{height}"
+        return {"status": "success", "message": f"Resolution set to {width}x{height}"}
+
+    def set_refresh_rate(self, display_id: int, rate: int) -> Dict[str, str]:
+        self.displays[display_id]["refresh_rate"] = rate
+        return {"status": "success", "message": f"Refresh rate set to {rate}Hz"}
+
+    def apply_display_layout(self, layout: List[Dict[str, Any]]) -> Dict[str, Any]:
+        for entry in layout:
+            display = self.displays[entry["display_id"]]
+            if "width" in entry:
+                display["resolution"] = f"{entry['width']}x{entry['height']}"
+            display["refresh_rate"] = entry.get("refresh_rate", display["refresh_rate"])
+        changed = [entry["display_id"] for entry in layout]
+        return {"status": "success", "changed": changed, "message": "Layout applied"}
+
+    def list_modes(self, display_id: int) -> Dict[str, Any]:
+        return {
+            "display_id": display_id,
+            "modes": [{"width": 1920, "height": 1080, "refresh_rates": [60]}],
+        }
+
+    def find_display_mode(self, display_id: int, width: int, height: int, **kwargs):
+        return {"width": 1920, "height": 1080, "refresh_rate": 60}
+
+    def enable_dummy_display(self) -> Dict[str, str]:
+        return {"status": "success", "message": "Dummy display enabled (placeholder)"}
+
+    def disable_dummy_display(self) -> Dict[str, str]:
+        return {"status": "success", "message": "Dummy display disabled (placeholder)"}
+
+
+# Resolutions and refresh rates of the modes every FakeDisplayBackend display supports
+FAKE_RESOLUTIONS = [
+    (640, 480), (800, 600), (1024, 768), (1152, 864), (1280, 720), (1280, 800),
+    (1280, 960), (1280, 1024), (1360, 768), (1366, 768), (1440, 900), (1600, 900),
+    (1600, 1200), (1680, 1050), (1920, 1080), (1920, 1200), (2048, 1152),
+    (2560, 1080), (2560, 1440), (2560, 1600), (3440, 1440), (3840, 1600),
+    (3840, 2160), (5120, 1440), (5120, 2880),
+]
+FAKE_REFRESH_RATES = [24, 30, 50, 59, 60, 75, 100, 120, 144, 165, 240]
+
+
+class FakeDisplayBackend(DisplayBackend):
+    """In-memory display topology that counts enumerations, mode listings and changes."""
+
+    def __init__(self, count: int = 1):
+        self.devices = [
+            {
+                "name": f"\\\\.\\DISPLAY{i + 1}",
+                "friendly_name": f"Fake Display {i + 1}",
+                "width": 1920,
+                "height": 1080,
+                "refresh_rate": 60,
+            }
+            for i in range(count)
+        ]
+        self.enumerations = 0
+        self.mode_listings = 0
+        self.changes = 0
+        self.fail_next = False
+        # Staged modes by device name, applied by commit
+        self.staged: Dict[str, tuple] = {}
+        self.commits = 0
+        self.fail_commit = False
+        # Device whose next staged mode is rejected
+        self.reject_device = None
+        # 4K modes only go up to 60Hz, like on a typical HDMI 2.0 link
+        self.modes = [
+            {"width": width, "height": height, "refresh_rate": rate}
+            for width, height in FAKE_RESOLUTIONS
+            for rate in FAKE_REFRESH_RATES
+            if width * height < 3840 * 2160 or rate <= 60
+        ]
+
+    def enumerate(self) -> List[Dict[str, Any]]:
+        self.enumerations += 1
+        return [dict(device) for device in self.devices]
+
+    def plug(self, name: str, width: int = 1280, height: int = 720):
+        self.devices.append(
+            {
+                "name": name,
+                "friendly_name": "Hotplugged Display",
+                "width": width,
+                "height": height,
+                "refresh_rate": 60,
+            }
+        )
+
+    def list_modes(self, device_name: str) -> List[Dict[str, Any]]:
+        self.mode_listings += 1
+        return list(self.modes)
+
+    def _device(self, device_name: str) -> Dict[str, Any]:
+        self.changes += 1
+        if self.fail_next:
+            self.fail_next = False
+            raise DisplayControlError("Failed to change display settings. Error code: -2")
+        return next(device for device in self.devices if device["name"] == device_name)
+
+    def set_resolution(self, device_name: str, width: int, height: int):
+        device = self._device(device_name)
+        device["width"], device["height"] = width, height
+
+    def set_refresh_rate(self, device_name: str, rate: int):
+        self._device(device_name)["refresh_rate"] = rate
+
+    def stage_mode(self, device_name: str, width: int, height: int, refresh_rate):
+        self._device(device_name)
+        if device_name == self.reject_device:
+            self.reject_device = None
+            raise DisplayControlError(f"Failed to stage mode for {device_name}. Error code: -2")
+        self.staged[device_name] = (width, height, refresh_rate)
+
+    def commit(self):
+        self.commits += 1
+        staged, self.staged = self.staged, {}
+        if self.fail_commit:
+            self.fail_commit = False
+            raise DisplayControlError("Failed to apply display layout. Error code: -1")
+        for device_name, (width, height, refresh_rate) in staged.items():
+            device = next(d for d in self.devices if d["name"] == device_name)
+            device.update(width=width, height=height, refresh_rate=refresh_rate)
+
+
+class StubProgramController:
+    def __init__(self, count: int = 3):
+        self.programs = [{"pid": 1000 + i, "name": f"program{i}.exe"} for i in range(count)]
+        self.paused = set()
+        self.seq = 0
+        self.listeners = []
+        self.scan_listeners = []
+        self.following = False
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def follow(self):
+        self.following = True
+
+    def load_processes(self, rows):
+        self.programs = [{"pid": row[0], "name": row[1]} for row in rows]
+
+    def add_scan_listener(self, listener):
+        self.scan_listeners.append(listener)
+
+    def get_running_programs(self, max_age: float = None) -> List[Dict[str, Any]]:
+        return list(self.programs)
+
+    def get_program_usage(self, sort: str = "cpu", limit: int = 20, name: str = None):
+        programs = [
+            {"pid": p["pid"], "name": p["name"], "cpu_percent": float(i), "rss": 1024 * i}
+            for i, p in enumerate(self.programs)
+            if name is None or fnmatch.fnmatch(p["name"], name)
+        ]
+        key = "rss" if sort == "memory" else "cpu_percent"
+        programs.sort(key=lambda p: p[key], reverse=True)
+        return {"age": 0.0, "total": len(self.programs), "programs": programs[:limit]}
+
+    def get_programs_snapshot(self, max_age: float = None):
+        return self.seq, list(self.programs)
+
+    def add_change_listener(self, listener):
+        self.listeners.append(listener)
+
+    def remove_change_listener(self, listener):
+        self.listeners.remove(listener)
+
+    def spawn(self, name: str) -> ProcessTableDiff:
+        """Simulate a process starting and notify listeners like the process table does."""
+        program = {"pid": 1000 + len(self.programs), "name": name}
+        self.programs.append(program)
+        self.seq += 1
+        diff = ProcessTableDiff(self.seq, added=[program])
+        for listener in list(self.listeners):
+            listener(diff)
+        return diff
+
+    def pause_program(self, pid: int) -> Dict[str, str]:
+        self.paused.add(pid)
+        return {"status": "success", "message": f"Program with PID {pid} paused"}
+
+    def resume_program(self, pid: int) -> Dict[str, str]:
+        self.paused.discard(pid)
+        return {"status": "success", "message": f"Program with PID {pid} resumed"}
+
+    def _select(self, pids=None, name=None, root=None, **kwargs) -> List[int]:
+        if name is not None:
+            return [p["pid"] for p in self.programs if fnmatch.fnmatch(p["name"], name)]
+        return list(pids) if pids is not None else [root]
+
+    def pause_programs(self, **selection) -> Dict[str, Any]:
+        pids = self._select(**selection)
+        self.paused.update(pids)
+        results = [{"pid": pid, "status": "paused"} for pid in pids]
+        return {"status": "success", "paused": len(pids), "failed": 0, "results": results}
+
+    def resume_programs(self, **selection) -> Dict[str, Any]:
+        pids = self._select(**selection)
+        self.paused.difference_update(pids)
+        results = [{"pid": pid, "status": "resumed"} for pid in pids]
+        return {"status": "success", "resumed": len(pids), "failed": 0, "results": results}
+
+
+class FakeWebSocket:
+    """Collects everything the server sends; stands in for a client connection."""
+
+    def __init__(self):
+        self.sent: List[str] = []
+
+    async def send(self, message: str):
+        self.sent.append(message)
+
+
+def stub_server_factory(**kwargs):
+    """Build a NebulaLinkServer backed by stub controllers (picklable for worker processes)."""
+    from src.server.nebulalink_server import NebulaLinkServer
+
+    return NebulaLinkServer(
+        power_controller=StubPowerController(),
+        display_controller=StubDisplayController(),
+        program_controller=StubProgramController(),
+        **kwargs,
+    )
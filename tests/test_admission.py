@@ -0,0 +1,238 @@
+# tests/test_admission.py
+
+import asyncio
+import json
+
+import pytest
+import pytest_asyncio
+import websockets
+
+from src.server.admission import AdmissionControl, TokenBucket, throttled_reply
+from src.server.nebulalink_server import NebulaLinkServer
+from tests.stubs import StubDisplayController, StubPowerController, StubProgramController
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_token_bucket_burst_and_refill():
+    bucket = TokenBucket(rate=2.0, burst=3, now=0.0)
+    assert [bucket.take(0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.take(0.0) == pytest.approx(0.5)
+    # Half a second later one token is back
+    assert bucket.take(0.5) == 0.0
+    assert bucket.take(0.5) == pytest.approx(0.5)
+    # Idle time never fills the bucket past its burst
+    bucket.take(100.0)
+    assert bucket.tokens == pytest.approx(2.0)
+
+
+def test_limiter_checks_action_classes_separately():
+    clock = FakeClock()
+    admission = AdmissionControl(
+        client_rate=(10.0, 5),
+        action_rates={"power": (1.0, 1)},
+        action_classes={"shutdown": "power", "sleep": "power"},
+        clock=clock,
+    )
+    limiter = admission.limiter()
+    assert limiter.check_action("shutdown") == 0.0
+    # Same class, same bucket
+    assert limiter.check_action("sleep") == pytest.approx(1.0)
+    # Unclassified actions only count against the client bucket
+    assert limiter.check_action("ping") == 0.0
+    assert [limiter.check_message() for _ in range(5)] == [0.0] * 5
+    assert limiter.check_message() == pytest.approx(0.1)
+    clock.now = 1.0
+    assert limiter.check_action("shutdown") == 0.0
+    # Each connection has its own buckets
+    assert admission.limiter().check_action("shutdown") == 0.0
+
+
+def test_batch_is_checked_once_per_action_class():
+    admission = AdmissionControl(
+        action_rates={"power": (1.0, 1), "programs": (1.0, 1)},
+        action_classes={"sleep": "power", "pause_program": "programs"},
+        clock=FakeClock(),
+    )
+    limiter = admission.limiter()
+    assert limiter.check_batch(["pause_program"] * 40 + ["ping"]) == {}
+    limiter.check_action("sleep")
+    assert limiter.check_batch(["sleep", "pause_program"]) == {
+        "power": pytest.approx(1.0),
+        "programs": pytest.approx(1.0),
+    }
+
+
+def test_disabled_limits():
+    admission = AdmissionControl(max_clients=None, client_rate=None, action_rates={})
+    limiter = admission.limiter()
+    assert not admission.is_full(10_000)
+    assert all(limiter.check_message() == 0.0 for _ in range(1000))
+    assert all(limiter.check_action("shutdown") == 0.0 for _ in range(1000))
+
+
+def test_throttled_reply():
+    reply = throttled_reply({"action": "ping", "id": 7}, "rate", 0.01234)
+    assert reply == {
+        "error": "Too many requests",
+        "reason": "rate",
+        "retry_after": 0.013,
+        "action": "ping",
+        "id": 7,
+    }
+
+
+def make_server(**admission) -> NebulaLinkServer:
+    return NebulaLinkServer(
+        port=0,
+        power_controller=StubPowerController(delay=0.3),
+        display_controller=StubDisplayController(),
+        program_controller=StubProgramController(),
+        admission=AdmissionControl(**admission),
+        max_frame_size=1024,
+        warmup=False,
+    )
+
+
+@pytest_asyncio.fixture
+async def start_server():
+    servers = []
+
+    async def start(**admission) -> NebulaLinkServer:
+        server = make_server(**admission)
+        await server.start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+        await server.server.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_server_full_returns_retry_after(start_server):
+    server = await start_server(max_clients=1, full_retry_after=3)
+    uri = f"ws://localhost:{server.port}"
+    async with websockets.connect(uri):
+        while not server.clients:
+            await asyncio.sleep(0.01)
+        with pytest.raises(websockets.InvalidStatus) as refused:
+            await websockets.connect(uri)
+        assert refused.value.response.status_code == 503
+        assert refused.value.response.headers["Retry-After"] == "3"
+    assert server.metrics.throttled == {"clients": 1}
+
+
+@pytest.mark.asyncio
+async def test_client_rate_limit_replies_with_retry_after(start_server):
+    server = await start_server(client_rate=(1.0, 3))
+    async with websockets.connect(f"ws://localhost:{server.port}") as websocket:
+        for i in range(5):
+            await websocket.send(json.dumps({"action": "ping", "id": i}))
+        replies = [json.loads(await websocket.recv()) for _ in range(5)]
+    throttled = [reply for reply in replies if "error" in reply]
+    assert len(throttled) == 2
+    assert {reply["id"] for reply in throttled} == {3, 4}
+    assert all(reply["reason"] == "rate" for reply in throttled)
+    assert all(0 < reply["retry_after"] <= 1.0 for reply in throttled)
+    assert server.metrics.snapshot([])["throttled"] == {"rate": 2}
+
+
+@pytest.mark.asyncio
+async def test_batch_takes_one_token_per_action_class(start_server):
+    server = await start_server(action_rates={"programs": (0.1, 1)})
+    batch = {
+        "action": "batch",
+        "actions": [{"action": "pause_program", "pid": 1000}] * 3 + [{"action": "ping"}],
+        "sequential": True,
+    }
+    async with websockets.connect(f"ws://localhost:{server.port}") as websocket:
+        await websocket.send(json.dumps(batch))
+        first = json.loads(await websocket.recv())["results"]
+        await websocket.send(json.dumps(batch))
+        second = json.loads(await websocket.recv())["results"]
+    assert [result.get("reason") for result in first] == [None] * 4
+    assert [result.get("reason") for result in second] == ["action_rate"] * 3 + [None]
+    assert second[3] == {"action": "pong"}
+    assert server.metrics.throttled == {"action_rate": 3}
+
+
+@pytest.mark.asyncio
+async def test_large_batch_is_admitted_under_default_limits():
+    server = NebulaLinkServer(
+        port=0, program_controller=StubProgramController(), warmup=False
+    )
+    await server.start()
+    batch = {
+        "action": "batch",
+        "actions": [{"action": "pause_program", "pid": pid} for pid in range(2000, 2040)],
+    }
+    try:
+        async with websockets.connect(f"ws://localhost:{server.port}") as websocket:
+            await websocket.send(json.dumps(batch))
+            results = json.loads(await websocket.recv())["results"]
+    finally:
+        server.stop()
+        await server.server.wait_closed()
+    assert all(result["result"]["status"] == "success" for result in results)
+    assert len(server.program_controller.paused) == 40
+    assert server.metrics.throttled == {}
+
+
+@pytest.mark.asyncio
+async def test_scheduled_actions_count_against_their_class(start_server):
+    server = await start_server(action_rates={"power": (0.5, 3)})
+    async with websockets.connect(f"ws://localhost:{server.port}") as websocket:
+        # A recurring job is charged once, so it cannot outpace the class rate
+        await websocket.send(
+            json.dumps({"action": "schedule", "request": {"action": "sleep"}, "every": 1})
+        )
+        error = json.loads(await websocket.recv())["error"]
+        assert error["error"] == "SchedulerError"
+
+        for i in range(3):
+            await websocket.send(
+                json.dumps(
+                    {"action": "schedule", "request": {"action": "shutdown"}, "delay": 0, "id": i}
+                )
+            )
+        replies = sorted(
+            [json.loads(await websocket.recv()) for _ in range(3)], key=lambda r: r["id"]
+        )
+    assert "job" in replies[0]["result"] and "job" in replies[1]["result"]
+    assert replies[2]["reason"] == "action_rate"
+    assert replies[2]["action"] == "schedule"
+    assert server.metrics.throttled == {"action_rate": 1}
+
+
+@pytest.mark.asyncio
+async def test_in_flight_limit_rejects_tagged_requests(start_server):
+    server = await start_server()
+    server.max_in_flight = 1
+    async with websockets.connect(f"ws://localhost:{server.port}") as websocket:
+        await websocket.send(json.dumps({"action": "sleep", "id": "slow"}))
+        await websocket.send(json.dumps({"action": "ping", "id": "busy"}))
+        rejected = json.loads(await websocket.recv())
+        assert rejected["id"] == "busy"
+        assert rejected["reason"] == "in_flight"
+        assert json.loads(await websocket.recv())["id"] == "slow"
+
+
+@pytest.mark.asyncio
+async def test_oversized_frame_closes_connection(start_server):
+    server = await start_server()
+    async with websockets.connect(f"ws://localhost:{server.port}") as websocket:
+        await websocket.send("x" * 2048)
+        with pytest.raises(websockets.ConnectionClosedError):
+            await websocket.recv()
+        assert websocket.close_code == 1009
+    while server.clients:
+        await asyncio.sleep(0.01)
+    assert server.metrics.throttled == {"frame_size": 1}
@@ -0,0 +1,83 @@
+# tests/test_batch.py
+
+import asyncio
+
+import pytest
+from src.server.batch import run_batch, SKIPPED
+from src.utils import CommandError
+
+
+class Recorder:
+    """Executes fake actions, tracking how many run at the same time."""
+
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+        self.order = []
+
+    async def __call__(self, data):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(data.get("delay", 0.01))
+            self.order.append(data["n"])
+            if data.get("fail"):
+                return {"error": {"error": "CommandError", "message": "failed"}}
+            return {"action": "echo", "result": data["n"]}
+        finally:
+            self.running -= 1
+
+
+@pytest.mark.asyncio
+async def test_results_in_request_order():
+    recorder = Recorder()
+    actions = [{"n": n, "delay": 0.05 - n * 0.01} for n in range(5)]
+    results = await run_batch(recorder, actions, concurrency=5)
+    assert [result["result"] for result in results] == [0, 1, 2, 3, 4]
+    assert recorder.order == [4, 3, 2, 1, 0]
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit():
+    recorder = Recorder()
+    await run_batch(recorder, [{"n": n} for n in range(20)], concurrency=4)
+    assert recorder.peak == 4
+
+
+@pytest.mark.asyncio
+async def test_sequential():
+    recorder = Recorder()
+    actions = [{"n": n, "delay": 0.03 - n * 0.01} for n in range(3)]
+    await run_batch(recorder, actions, sequential=True)
+    assert recorder.order == [0, 1, 2]
+    assert recorder.peak == 1
+
+
+@pytest.mark.asyncio
+async def test_sequential_stop_on_error():
+    recorder = Recorder()
+    actions = [{"n": 0}, {"n": 1, "fail": True}, {"n": 2}]
+    results = await run_batch(recorder, actions, sequential=True, stop_on_error=True)
+    assert "error" in results[1]
+    assert results[2] is SKIPPED
+    assert recorder.order == [0, 1]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_stop_on_error_skips_unstarted():
+    recorder = Recorder()
+    actions = [{"n": 0, "fail": True}] + [{"n": n} for n in range(1, 6)]
+    results = await run_batch(recorder, actions, concurrency=1, stop_on_error=True)
+    assert "error" in results[0]
+    assert all(result is SKIPPED for result in results[1:])
+
+
+@pytest.mark.asyncio
+async def test_invalid_batches():
+    recorder = Recorder()
+    with pytest.raises(CommandError):
+        await run_batch(recorder, {"n": 1})
+    with pytest.raises(CommandError):
+        await run_batch(recorder, [{"n": 1}], concurrency=0)
+    with pytest.raises(CommandError):
+        await run_batch(recorder, [{"n": n} for n in range(1000)])
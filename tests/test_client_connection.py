@@ -0,0 +1,82 @@
+# tests/test_client_connection.py
+
+import asyncio
+
+import pytest
+from src.server.client_connection import ClientConnection, SlowConsumerPolicy
+
+
+class StalledWebSocket:
+    """A client whose socket accepts no data until it is released."""
+
+    def __init__(self):
+        self.sent = []
+        self.released = asyncio.Event()
+        self.close_code = None
+
+    async def send(self, message):
+        await self.released.wait()
+        self.sent.append(message)
+
+    async def close(self, code=1000, reason=""):
+        self.close_code = code
+
+
+async def make_connection(policy, max_queue=3):
+    websocket = StalledWebSocket()
+    connection = ClientConnection(websocket, max_queue=max_queue, policy=policy)
+    connection.start()
+    # Let the writer pick up the first message and block on it
+    connection.enqueue("first")
+    await asyncio.sleep(0)
+    return websocket, connection
+
+
+@pytest.mark.asyncio
+async def test_messages_delivered_in_order():
+    websocket, connection = await make_connection(SlowConsumerPolicy.DROP_OLDEST)
+    for i in range(3):
+        assert connection.enqueue(f"m{i}")
+    websocket.released.set()
+    await asyncio.sleep(0.01)
+    assert websocket.sent == ["first", "m0", "m1", "m2"]
+    await connection.close()
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest():
+    websocket, connection = await make_connection(SlowConsumerPolicy.DROP_OLDEST)
+    for i in range(5):
+        connection.enqueue(f"m{i}")
+    assert connection.backlog == 3
+    assert connection.dropped == 2
+    websocket.released.set()
+    await asyncio.sleep(0.01)
+    assert websocket.sent == ["first", "m2", "m3", "m4"]
+    await connection.close()
+
+
+@pytest.mark.asyncio
+async def test_coalesce_replaces_pending_message_with_same_key():
+    websocket, connection = await make_connection(SlowConsumerPolicy.COALESCE)
+    connection.enqueue("programs v1", key="programs")
+    connection.enqueue("other")
+    connection.enqueue("programs v2", key="programs")
+    assert connection.backlog == 2
+    assert connection.coalesced == 1
+    websocket.released.set()
+    await asyncio.sleep(0.01)
+    assert websocket.sent == ["first", "programs v2", "other"]
+    await connection.close()
+
+
+@pytest.mark.asyncio
+async def test_disconnect_slow_consumer():
+    websocket, connection = await make_connection(SlowConsumerPolicy.DISCONNECT)
+    for i in range(3):
+        assert connection.enqueue(f"m{i}")
+    assert not connection.enqueue("overflow")
+    await asyncio.sleep(0)
+    assert connection.closed
+    assert websocket.close_code == 1008
+    assert not connection.enqueue("after close")
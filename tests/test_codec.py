@@ -0,0 +1,56 @@
+# tests/test_codec.py
+
+from unittest.mock import MagicMock
+
+import pytest
+from src.server import codec as codecs
+from src.server.codec import JsonCodec, SharedMessage, DecodeError
+from src.utils import CommandError
+
+MESSAGE = {
+    "action": "get_running_programs",
+    "result": [{"pid": 4, "name": "System"}, {"pid": 1234, "name": "gäme.exe"}],
+    "id": 7,
+}
+
+
+@pytest.mark.parametrize("name", list(codecs.CODECS))
+def test_round_trip(name):
+    codec = codecs.get_codec(name)
+    payload = codec.encode(MESSAGE)
+    assert isinstance(payload, bytes if codec.binary else str)
+    assert codec.decode(payload) == MESSAGE
+
+
+@pytest.mark.parametrize("name", list(codecs.CODECS))
+def test_invalid_payload(name):
+    codec = codecs.get_codec(name)
+    with pytest.raises(DecodeError):
+        codec.decode(b"\xc1" if codec.binary else "{not json")
+
+
+def test_json_codecs_share_wire_format():
+    assert JsonCodec().decode(codecs.DEFAULT_CODEC.encode(MESSAGE)) == MESSAGE
+
+
+def test_unknown_codec():
+    with pytest.raises(CommandError):
+        codecs.get_codec("xml")
+
+
+def test_subprotocol_selection():
+    offered = ["chat", "nebulalink.json"]
+    assert codecs.select_subprotocol(None, offered) == "nebulalink.json"
+    assert codecs.select_subprotocol(None, ["chat"]) is None
+    assert codecs.codec_for_subprotocol(None) is codecs.DEFAULT_CODEC
+    assert codecs.codec_for_subprotocol("nebulalink.json") is codecs.CODECS["json"]
+
+
+def test_shared_message_encodes_once_per_codec():
+    codec = MagicMock()
+    codec.name = "mock"
+    codec.encode.return_value = "payload"
+    shared = SharedMessage(MESSAGE)
+    assert shared.encode(codec) == "payload"
+    assert shared.encode(codec) == "payload"
+    codec.encode.assert_called_once_with(MESSAGE)
@@ -0,0 +1,93 @@
+# tests/test_command_runner.py
+
+import asyncio
+import sys
+import time
+
+import pytest
+from src.utils import CommandError, CommandRunner
+
+pytestmark = pytest.mark.skipif(
+    sys.platform == "win32", reason="uses POSIX sleep/echo as stand-ins"
+)
+
+
+@pytest.mark.asyncio
+async def test_captures_output():
+    runner = CommandRunner()
+    result = await runner.run(["echo", "hello"])
+    assert result.returncode == 0
+    assert result.stdout == "hello\n"
+    assert not result.truncated
+
+
+@pytest.mark.asyncio
+async def test_does_not_block_event_loop():
+    runner = CommandRunner()
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    await runner.run(["sleep", "0.3"])
+    task.cancel()
+    assert ticks >= 10
+
+
+@pytest.mark.asyncio
+async def test_timeout_kills_command():
+    runner = CommandRunner(timeout=0.2)
+    start = time.perf_counter()
+    with pytest.raises(CommandError, match="timed out"):
+        await runner.run(["sleep", "5"])
+    assert time.perf_counter() - start < 2
+    assert runner.get_stats()["sleep"]["timeouts"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit():
+    runner = CommandRunner(max_concurrency=2)
+    start = time.perf_counter()
+    await asyncio.gather(*[runner.run(["sleep", "0.2"]) for _ in range(4)])
+    # Four commands two at a time take two rounds
+    assert time.perf_counter() - start >= 0.4
+
+
+@pytest.mark.asyncio
+async def test_nonzero_exit():
+    runner = CommandRunner()
+    with pytest.raises(CommandError, match="exited with code 3"):
+        await runner.run(["sh", "-c", "echo failed >&2; exit 3"])
+    result = await runner.run(["sh", "-c", "exit 3"], check=False)
+    assert result.returncode == 3
+    assert runner.get_stats()["sh"]["failures"] == 2
+
+
+@pytest.mark.asyncio
+async def test_missing_program():
+    runner = CommandRunner()
+    with pytest.raises(CommandError, match="Failed to start"):
+        await runner.run(["powercfg-does-not-exist", "/list"])
+
+
+@pytest.mark.asyncio
+async def test_output_is_capped():
+    runner = CommandRunner(max_output=1000)
+    result = await runner.run(["sh", "-c", "yes x | head -c 100000"])
+    assert len(result.stdout) == 1000
+    assert result.truncated
+
+
+@pytest.mark.asyncio
+async def test_latency_stats():
+    runner = CommandRunner()
+    await runner.run(["echo", "a"])
+    await runner.run(["echo", "b"])
+    stats = runner.get_stats()["echo"]
+    assert stats["count"] == 2
+    assert stats["failures"] == 0
+    assert stats["max_ms"] >= stats["avg_ms"] > 0
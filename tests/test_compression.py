@@ -0,0 +1,79 @@
+# tests/test_compression.py
+
+import json
+
+import pytest
+from websockets.extensions.permessage_deflate import PerMessageDeflate
+from websockets.frames import Frame, Opcode
+
+from src.server.compression import (
+    ThresholdPerMessageDeflate,
+    ThresholdPerMessageDeflateFactory,
+    server_extensions,
+)
+
+LARGE = json.dumps(
+    [{"pid": 1000 + i, "name": f"process_{i % 10}.exe"} for i in range(200)]
+).encode()
+
+
+@pytest.fixture
+def extension():
+    return ThresholdPerMessageDeflate(False, False, 12, 12, {"memLevel": 5}, min_size=256)
+
+
+@pytest.fixture
+def peer():
+    # The client side of the same negotiated extension
+    return PerMessageDeflate(False, False, 12, 12)
+
+
+def test_small_messages_are_not_compressed(extension, peer):
+    frame = Frame(Opcode.TEXT, b'{"action": "pong"}')
+    encoded = extension.encode(frame)
+    assert encoded is frame
+    assert not encoded.rsv1
+    assert peer.decode(encoded).data == frame.data
+    assert extension.stats.uncompressed_messages == 1
+
+
+def test_large_messages_are_compressed(extension, peer):
+    encoded = extension.encode(Frame(Opcode.TEXT, LARGE))
+    assert encoded.rsv1
+    assert len(encoded.data) < len(LARGE) / 4
+    assert peer.decode(encoded).data == LARGE
+    stats = extension.stats
+    assert stats.compressed_messages == 1
+    assert stats.raw_bytes == len(LARGE)
+    assert stats.wire_bytes == len(encoded.data)
+    assert stats.ratio < 0.25
+
+
+def test_mixed_messages_keep_compression_context(extension, peer):
+    for data in [LARGE, b"ping", LARGE, b"pong", LARGE]:
+        assert peer.decode(extension.encode(Frame(Opcode.TEXT, data))).data == data
+
+
+def test_fragmented_small_message_stays_uncompressed(extension, peer):
+    first = extension.encode(Frame(Opcode.TEXT, b"ab", fin=False))
+    rest = extension.encode(Frame(Opcode.CONT, b"cd"))
+    assert not first.rsv1 and rest.data == b"cd"
+    assert peer.decode(first).data + peer.decode(rest).data == b"abcd"
+
+
+def test_factory_builds_threshold_extension():
+    factory = ThresholdPerMessageDeflateFactory(
+        min_size=100, server_max_window_bits=10, client_max_window_bits=10
+    )
+    _, extension = factory.process_request_params([], [])
+    assert isinstance(extension, ThresholdPerMessageDeflate)
+    assert extension.min_size == 100
+    assert extension.local_max_window_bits == 10
+
+
+def test_server_extensions_can_be_disabled():
+    assert server_extensions(enabled=False) == []
+    (factory,) = server_extensions(window_bits=11, mem_level=4, min_size=64)
+    assert factory.min_size == 64
+    assert factory.server_max_window_bits == 11
+    assert factory.compress_settings == {"memLevel": 4}
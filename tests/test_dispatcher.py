@@ -0,0 +1,83 @@
+# tests/test_dispatcher.py
+
+import asyncio
+import threading
+import time
+
+import pytest
+from src.server.dispatcher import ActionDispatcher, ExecutorKind
+from src.utils import CommandError
+
+
+@pytest.fixture
+def dispatcher():
+    dispatcher = ActionDispatcher(blocking_workers=2, cpu_workers=1)
+    yield dispatcher
+    dispatcher.shutdown()
+
+
+def test_register_rejects_duplicates(dispatcher):
+    dispatcher.register("ping", lambda: None)
+    with pytest.raises(ValueError):
+        dispatcher.register("ping", lambda: None)
+
+
+def test_async_kind_requires_coroutine(dispatcher):
+    with pytest.raises(ValueError):
+        dispatcher.register("ping", lambda: None, ExecutorKind.ASYNC)
+
+
+def test_lookup(dispatcher):
+    spec = dispatcher.register("echo", lambda text: text, params=("text",))
+    assert dispatcher.get("echo") is spec
+    assert dispatcher.get("missing") is None
+    assert "echo" in dispatcher
+    assert list(dispatcher) == ["echo"]
+
+
+@pytest.mark.asyncio
+async def test_dispatch_binds_params(dispatcher):
+    spec = dispatcher.register("add", lambda a, b: a + b, params=("a", "b"))
+    assert await dispatcher.dispatch(spec, {"action": "add", "a": 1, "b": 2}) == 3
+
+
+@pytest.mark.asyncio
+async def test_dispatch_optional_param(dispatcher):
+    spec = dispatcher.register("greet", lambda name="you": name, optional=("name",))
+    assert await dispatcher.dispatch(spec, {"action": "greet"}) == "you"
+    assert await dispatcher.dispatch(spec, {"action": "greet", "name": "me"}) == "me"
+
+
+@pytest.mark.asyncio
+async def test_dispatch_missing_param(dispatcher):
+    spec = dispatcher.register("add", lambda a, b: a + b, params=("a", "b"))
+    with pytest.raises(CommandError):
+        await dispatcher.dispatch(spec, {"action": "add", "a": 1})
+
+
+@pytest.mark.asyncio
+async def test_executor_kinds(dispatcher):
+    async def on_loop():
+        return threading.current_thread().name
+
+    def off_loop():
+        return threading.current_thread().name
+
+    async_spec = dispatcher.register("a", on_loop, ExecutorKind.ASYNC)
+    blocking_spec = dispatcher.register("b", off_loop, ExecutorKind.BLOCKING)
+    cpu_spec = dispatcher.register("c", off_loop, ExecutorKind.CPU)
+
+    assert await dispatcher.dispatch(async_spec, {}) == threading.current_thread().name
+    assert (await dispatcher.dispatch(blocking_spec, {})).startswith("nebulalink-io")
+    assert (await dispatcher.dispatch(cpu_spec, {})).startswith("nebulalink-cpu")
+
+
+@pytest.mark.asyncio
+async def test_blocking_call_does_not_block_loop(dispatcher):
+    spec = dispatcher.register("slow", lambda: time.sleep(0.3))
+    task = asyncio.create_task(dispatcher.dispatch(spec, {}))
+
+    start = time.perf_counter()
+    await asyncio.sleep(0.01)
+    assert time.perf_counter() - start < 0.2
+    await task
@@ -1,10 +1,15 @@
 # tests/test_display_controller.py
 
+import sys
+import time
 import unittest
+from src.controllers.display_backend import DisplayBackend
 from src.controllers.display_controller import DisplayController
-from src.utils import DisplayControlError
+from src.utils import DisplayControlError, EventBus
+from tests.stubs import FakeDisplayBackend
 
 
+@unittest.skipUnless(sys.platform == "win32", "requires Windows display APIs")
 class TestDisplayController(unittest.TestCase):
     def setUp(self):
         self.controller = DisplayController()
@@ -60,5 +65,200 @@ class TestDisplayController(unittest.TestCase):
             self.controller.set_refresh_rate(999, 60)
 
 
+class TestDisplayCache(unittest.TestCase):
+    def setUp(self):
+        self.backend = FakeDisplayBackend(count=2)
+        self.controller = DisplayController(backend=self.backend, cache_ttl=60)
+
+    def test_enumerates_lazily_once(self):
+        self.assertEqual(self.backend.enumerations, 0)
+        first = self.controller.get_display_info()
+        second = self.controller.get_display_info()
+        self.assertIs(first, second)
+        self.assertEqual(self.backend.enumerations, 1)
+        self.assertEqual([d["id"] for d in first], [0, 1])
+        self.assertEqual(first[0]["resolution"], "1920x1080")
+
+    def test_writes_invalidate_cache(self):
+        self.controller.get_display_info()
+        generation = self.controller.generation
+        self.controller.set_resolution(1, 1280, 720)
+        self.controller.set_refresh_rate(1, 144)
+        self.assertEqual(self.controller.generation, generation + 2)
+        display = self.controller.get_display_info()[1]
+        self.assertEqual(display["resolution"], "1280x720")
+        self.assertEqual(display["refresh_rate"], 144)
+        # Each read after a write re-enumerates once
+        self.assertEqual(self.backend.enumerations, 3)
+
+    def test_failed_write_invalidates_cache(self):
+        self.controller.get_display_info()
+        self.backend.fail_next = True
+        with self.assertRaises(DisplayControlError):
+            self.controller.set_resolution(0, 800, 600)
+        self.controller.get_display_info()
+        self.assertEqual(self.backend.enumerations, 2)
+
+    def test_invalidate_picks_up_hotplug(self):
+        self.assertEqual(len(self.controller.get_display_info()), 2)
+        self.backend.plug("\\\\.\\DISPLAY3")
+        self.assertEqual(len(self.controller.get_display_info()), 2)
+        self.controller.invalidate()
+        displays = self.controller.get_display_info()
+        self.assertEqual(len(displays), 3)
+        self.assertEqual(displays[2]["resolution"], "1280x720")
+
+    def test_ttl_expiry(self):
+        controller = DisplayController(backend=self.backend, cache_ttl=0.05)
+        controller.get_display_info()
+        self.backend.plug("\\\\.\\DISPLAY3")
+        time.sleep(0.06)
+        self.assertEqual(len(controller.get_display_info()), 3)
+        self.assertEqual(self.backend.enumerations, 2)
+
+    def test_invalid_display_id(self):
+        with self.assertRaises(DisplayControlError):
+            self.controller.set_resolution(999, 1920, 1080)
+        with self.assertRaises(DisplayControlError):
+            self.controller.set_refresh_rate(-1, 60)
+
+
+class TestDisplayModes(unittest.TestCase):
+    def setUp(self):
+        self.backend = FakeDisplayBackend(count=2)
+        self.controller = DisplayController(backend=self.backend, cache_ttl=60)
+
+    def test_modes_are_listed_once_per_display(self):
+        modes = self.controller.list_modes(0)["modes"]
+        self.assertEqual(len(modes), 25)
+        self.controller.list_modes(0)
+        self.controller.set_resolution(0, 2560, 1440)
+        self.controller.list_modes(0)
+        self.assertEqual(self.backend.mode_listings, 1)
+        self.controller.list_modes(1)
+        self.assertEqual(self.backend.mode_listings, 2)
+        # A hotplug notification may mean a different monitor
+        self.controller.invalidate()
+        self.controller.list_modes(0)
+        self.assertEqual(self.backend.mode_listings, 3)
+
+    def test_unsupported_modes_never_reach_the_driver(self):
+        with self.assertRaisesRegex(DisplayControlError, "nearest is 2560x1440"):
+            self.controller.set_resolution(0, 2560, 1439)
+        self.controller.set_resolution(0, 3840, 2160)
+        with self.assertRaisesRegex(DisplayControlError, r"supported: \[24, 30, 50, 59, 60\]"):
+            self.controller.set_refresh_rate(0, 144)
+        self.assertEqual(self.backend.changes, 1)
+        self.assertEqual(self.controller.get_display_info()[0]["resolution"], "3840x2160")
+
+    def test_find_display_mode(self):
+        mode = self.controller.find_display_mode(0, 2560, 1440, min_refresh=120)
+        self.assertEqual(mode, {"width": 2560, "height": 1440, "refresh_rate": 240})
+        with self.assertRaises(DisplayControlError):
+            self.controller.find_display_mode(0, 2560, 1440, min_refresh=1000)
+        with self.assertRaises(DisplayControlError):
+            self.controller.find_display_mode(5, 2560, 1440)
+
+    def test_backend_without_mode_listing(self):
+        backend = FakeDisplayBackend()
+        # Fall back to the base class, which cannot list modes
+        backend.list_modes = lambda device_name: DisplayBackend.list_modes(backend, device_name)
+        controller = DisplayController(backend=backend, cache_ttl=60)
+        controller.set_resolution(0, 1234, 567)
+        self.assertEqual(backend.changes, 1)
+        with self.assertRaises(DisplayControlError):
+            controller.list_modes(0)
+
+
+class TestDisplayLayout(unittest.TestCase):
+    STREAMING = [
+        {"display_id": 0, "width": 2560, "height": 1440, "refresh_rate": 144},
+        {"display_id": 1, "width": 1280, "height": 720, "refresh_rate": 60},
+    ]
+    DESKTOP = [
+        {"display_id": 0, "width": 3840, "height": 2160},
+        {"display_id": 1, "width": 1920, "height": 1080},
+    ]
+
+    def setUp(self):
+        self.backend = FakeDisplayBackend(count=2)
+        self.controller = DisplayController(backend=self.backend, cache_ttl=60)
+
+    def modes(self):
+        return [(d["resolution"], d["refresh_rate"]) for d in self.controller.get_display_info()]
+
+    def test_profile_switch_is_one_mode_switch(self):
+        result = self.controller.apply_display_layout(self.STREAMING)
+        self.assertEqual(result["changed"], [0, 1])
+        self.assertEqual(self.backend.commits, 1)
+        self.assertEqual(self.modes(), [("2560x1440", 144), ("1280x720", 60)])
+
+        self.controller.apply_display_layout(self.DESKTOP)
+        self.assertEqual(self.backend.commits, 2)
+        # 144Hz is not available in 4K, so the highest 4K rate is used
+        self.assertEqual(self.modes(), [("3840x2160", 60), ("1920x1080", 60)])
+
+    def test_unchanged_displays_are_not_staged(self):
+        result = self.controller.apply_display_layout(
+            [{"display_id": 0}, {"display_id": 1, "refresh_rate": 120}]
+        )
+        self.assertEqual(result["changed"], [1])
+        self.assertEqual(list(self.backend.staged), [])
+        result = self.controller.apply_display_layout([{"display_id": 1, "refresh_rate": 120}])
+        self.assertEqual(result["changed"], [])
+        self.assertEqual(self.backend.commits, 1)
+
+    def test_invalid_layouts_are_rejected_before_staging(self):
+        for layout in (
+            [],
+            [{"display_id": 7}],
+            [{"display_id": 0}, {"display_id": 0, "width": 1280, "height": 720}],
+            self.STREAMING[:1] + [{"display_id": 1, "width": 1280, "height": 721}],
+        ):
+            with self.assertRaises(DisplayControlError):
+                self.controller.apply_display_layout(layout)
+        self.assertEqual(self.backend.changes, 0)
+        self.assertEqual(self.backend.commits, 0)
+
+    def test_staging_failure_restores_previous_layout(self):
+        before = self.modes()
+        self.backend.reject_device = self.backend.devices[1]["name"]
+        with self.assertRaisesRegex(DisplayControlError, "previous layout restored"):
+            self.controller.apply_display_layout(self.STREAMING)
+        # Only the rollback was applied
+        self.assertEqual(self.backend.commits, 1)
+        self.assertEqual(self.modes(), before)
+
+    def test_commit_failure_restores_previous_layout(self):
+        before = self.modes()
+        generation = self.controller.generation
+        self.backend.fail_commit = True
+        with self.assertRaisesRegex(DisplayControlError, "previous layout restored"):
+            self.controller.apply_display_layout(self.STREAMING)
+        self.assertEqual(self.backend.commits, 2)
+        self.assertEqual(self.modes(), before)
+        self.assertGreater(self.controller.generation, generation)
+
+    def test_changes_are_published_per_display(self):
+        events = EventBus()
+        received = []
+        events.subscribe(lambda *args: received.append(args))
+        self.controller.events = events
+        self.controller.apply_display_layout(self.STREAMING)
+        self.backend.fail_commit = True
+        with self.assertRaises(DisplayControlError):
+            self.controller.apply_display_layout(self.DESKTOP)
+        # The failed layout was rolled back, so only the first one is published
+        self.assertEqual(
+            received,
+            [
+                ("display", {"type": "mode_changed", "display_id": 0, "width": 2560,
+                             "height": 1440, "refresh_rate": 144}, 0),
+                ("display", {"type": "mode_changed", "display_id": 1, "width": 1280,
+                             "height": 720, "refresh_rate": 60}, 1),
+            ],
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,56 @@
+# tests/test_display_modes.py
+
+from src.controllers.display_modes import DisplayModeCatalog
+from tests.stubs import FakeDisplayBackend
+
+
+def make_catalog() -> DisplayModeCatalog:
+    return DisplayModeCatalog(FakeDisplayBackend().modes)
+
+
+def test_supports_is_exact():
+    catalog = make_catalog()
+    assert catalog.supports(2560, 1440)
+    assert catalog.supports(2560, 1440, 144)
+    assert not catalog.supports(2560, 1441)
+    assert not catalog.supports(3840, 2160, 120)
+    assert catalog.rates[(3840, 2160)] == [24, 30, 50, 59, 60]
+
+
+def test_nearest_with_minimum_refresh():
+    catalog = make_catalog()
+    # Closest to 2560x1440 at 120Hz or more; the highest rate wins without a preference
+    assert catalog.nearest(2560, 1440, min_refresh=120) == {
+        "width": 2560,
+        "height": 1440,
+        "refresh_rate": 240,
+    }
+    preferred = catalog.nearest(2560, 1440, refresh_rate=120, min_refresh=120)
+    assert preferred["refresh_rate"] == 120
+    # 4K tops out at 60Hz, so a high refresh request falls back to another resolution
+    assert catalog.nearest(3840, 2160, min_refresh=120) == {
+        "width": 3840,
+        "height": 1600,
+        "refresh_rate": 240,
+    }
+    assert catalog.nearest(1919, 1081, refresh_rate=61) == {
+        "width": 1920,
+        "height": 1080,
+        "refresh_rate": 60,
+    }
+    assert catalog.nearest(1920, 1080, min_refresh=500) is None
+
+
+def test_as_list_groups_rates_by_resolution():
+    modes = make_catalog().as_list()
+    assert modes[0] == {"width": 5120, "height": 2880, "refresh_rates": [24, 30, 50, 59, 60]}
+    assert modes[-1]["width"] == 640
+    assert sum(len(mode["refresh_rates"]) for mode in modes) == len(make_catalog())
+
+
+def test_duplicate_modes_are_merged():
+    # Drivers list each mode once per color depth
+    catalog = DisplayModeCatalog(
+        [{"width": 1920, "height": 1080, "refresh_rate": 60}] * 3
+    )
+    assert len(catalog) == 1
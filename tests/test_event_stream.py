@@ -0,0 +1,162 @@
+# tests/test_event_stream.py
+
+import asyncio
+import json
+
+import pytest
+import pytest_asyncio
+import websockets
+
+from src.controllers.display_controller import DisplayController
+from src.server.event_stream import EventStream
+from src.server.nebulalink_server import NebulaLinkServer
+from src.utils import EventBus, NebulaLinkError
+from tests.stubs import FakeDisplayBackend, StubPowerController, StubProgramController
+
+
+class Outbox:
+    def __init__(self):
+        self.messages = {}
+
+    def __call__(self, websocket, payload):
+        self.messages.setdefault(websocket, []).append(payload)
+        return True
+
+    def decoded(self, websocket):
+        return [shared.message for shared in self.messages.get(websocket, [])]
+
+
+@pytest.fixture
+def bus():
+    return EventBus()
+
+
+@pytest.fixture
+def outbox():
+    return Outbox()
+
+
+@pytest_asyncio.fixture
+async def stream(bus, outbox):
+    stream = EventStream(outbox, bus, window=0.05)
+    stream.attach(asyncio.get_running_loop())
+    yield stream
+    stream.detach()
+
+
+def test_bus_calls_every_listener(bus):
+    received = []
+
+    def failing(topic, event, key):
+        raise RuntimeError("listener bug")
+
+    bus.subscribe(failing)
+    bus.subscribe(lambda *args: received.append(args))
+    bus.publish("power", {"type": "plan_changed"}, key="plan")
+    assert received == [("power", {"type": "plan_changed"}, "plan")]
+    bus.unsubscribe(failing)
+    bus.publish("display", {"type": "topology_changed"})
+    assert len(received) == 2
+
+
+@pytest.mark.asyncio
+async def test_burst_is_pushed_as_one_message(stream, bus, outbox):
+    stream.subscribe("a", ["programs"])
+    stream.subscribe("b")
+    for pid in range(200):
+        bus.publish("programs", {"type": "exited", "pid": pid, "name": "x"}, key=pid)
+    await asyncio.sleep(0.1)
+
+    (push,) = outbox.messages["a"]
+    assert push is outbox.messages["b"][0]
+    assert push.message["action"] == "events"
+    assert push.message["topic"] == "programs"
+    assert push.message["seq"] == 1
+    assert [event["pid"] for event in push.message["events"]] == list(range(200))
+    assert stream.get_stats()["pushes"] == 1
+
+
+@pytest.mark.asyncio
+async def test_events_with_the_same_key_are_merged(stream, outbox):
+    stream.subscribe("client", ["display", "programs"])
+    stream.publish("display", {"type": "mode_changed", "display_id": 0, "width": 1280}, 0)
+    stream.publish("display", {"type": "mode_changed", "display_id": 0, "refresh_rate": 60}, 0)
+    stream.publish("display", {"type": "topology_changed"})
+    stream.publish("programs", {"type": "paused", "pid": 7}, 7)
+    stream.publish("programs", {"type": "resumed", "pid": 7}, 7)
+    await asyncio.sleep(0.1)
+
+    pushes = {message["topic"]: message["events"] for message in outbox.decoded("client")}
+    assert pushes["display"] == [
+        {"type": "mode_changed", "display_id": 0, "width": 1280, "refresh_rate": 60},
+        {"type": "topology_changed"},
+    ]
+    assert pushes["programs"] == [{"type": "resumed", "pid": 7}]
+    assert stream.merged == 2
+
+
+@pytest.mark.asyncio
+async def test_topics_without_subscribers_are_not_collected(stream, bus, outbox):
+    stream.subscribe("client", ["power"])
+    bus.publish("programs", {"type": "started", "pid": 1}, key=1)
+    await asyncio.sleep(0.1)
+    assert outbox.messages == {}
+    assert stream.received == 0
+
+    assert stream.unsubscribe("client") == {"topics": []}
+    stream.publish("power", {"type": "plan_changed"}, "plan")
+    assert stream.received == 0
+
+
+def test_unknown_topic_is_rejected(outbox):
+    stream = EventStream(outbox, EventBus())
+    with pytest.raises(NebulaLinkError):
+        stream.subscribe("client", ["display", "weather"])
+    assert stream.subscribe("client", "power") == {"topics": ["power"]}
+
+
+@pytest_asyncio.fixture
+async def server(bus):
+    backend = FakeDisplayBackend(count=2)
+    server = NebulaLinkServer(
+        port=0,
+        power_controller=StubPowerController(),
+        display_controller=DisplayController(backend=backend, events=bus),
+        program_controller=StubProgramController(),
+        events=bus,
+        warmup=False,
+    )
+    server.event_stream.window = 0.05
+    await server.start()
+    yield server
+    server.stop()
+    await server.server.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_display_changes_are_pushed_to_subscribers(server):
+    uri = f"ws://localhost:{server.port}"
+    async with websockets.connect(uri) as subscriber, websockets.connect(uri) as other:
+        await subscriber.send(json.dumps({"action": "subscribe_events", "topics": ["display"]}))
+        assert json.loads(await subscriber.recv()) == {
+            "action": "subscribe_events",
+            "result": {"topics": ["display"]},
+        }
+        await other.send(
+            json.dumps({"action": "set_resolution", "display_id": 1, "width": 1280, "height": 720})
+        )
+        assert json.loads(await other.recv())["result"]["status"] == "success"
+
+        push = json.loads(await asyncio.wait_for(subscriber.recv(), timeout=1))
+        assert push == {
+            "action": "events",
+            "topic": "display",
+            "seq": 1,
+            "events": [{"type": "mode_changed", "display_id": 1, "width": 1280, "height": 720}],
+        }
+        # The client that made the change did not subscribe
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(other.recv(), timeout=0.1)
+    while server.clients:
+        await asyncio.sleep(0.01)
+    assert server.metrics.snapshot([])["events"]["subscribers"]["display"] == 0
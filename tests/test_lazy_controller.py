@@ -0,0 +1,70 @@
+# tests/test_lazy_controller.py
+
+import threading
+import time
+
+import pytest
+from src.controllers.lazy import LazyController, controller_method
+from tests.stubs import StubPowerController
+
+
+class CountingFactory:
+    def __init__(self, delay: float = 0.0, failures: int = 0):
+        self.delay = delay
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("powercfg not found")
+        return StubPowerController()
+
+
+@pytest.mark.asyncio
+async def test_builds_on_first_call():
+    factory = CountingFactory()
+    lazy = LazyController(factory, "PowerController")
+    hibernate = lazy.method("hibernate", coroutine=True)
+    assert factory.calls == 0
+    assert not lazy.loaded
+
+    assert (await hibernate())["status"] == "success"
+    assert (await hibernate())["status"] == "success"
+    assert factory.calls == 1
+    assert lazy.loaded
+    assert lazy.load_time is not None
+    assert lazy.calls == ["hibernate", "hibernate"]
+
+
+def test_concurrent_first_use_builds_once():
+    factory = CountingFactory(delay=0.05)
+    lazy = LazyController(factory)
+    threads = [threading.Thread(target=lazy.load) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert factory.calls == 1
+
+
+def test_failed_build_is_retried():
+    factory = CountingFactory(failures=1)
+    lazy = LazyController(factory)
+    with pytest.raises(RuntimeError):
+        lazy.load()
+    assert not lazy.loaded
+    assert lazy.power_plans[0]["name"] == "Balanced"
+    assert factory.calls == 2
+
+
+def test_controller_method_does_not_load():
+    factory = CountingFactory()
+    lazy = LazyController(factory)
+    controller_method(lazy, "restart")
+    assert factory.calls == 0
+
+    stub = StubPowerController()
+    assert controller_method(stub, "restart") == stub.restart
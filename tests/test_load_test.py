@@ -0,0 +1,65 @@
+# tests/test_load_test.py
+
+import pytest
+from benchmarks.load_test import DRAW_CHUNK, LoadTest, compare, parse_mix
+
+
+def test_parse_mix():
+    assert parse_mix("ping=3, batch") == {"ping": 3, "batch": 1}
+    with pytest.raises(ValueError):
+        parse_mix("reboot=1")
+
+
+def test_compare_flags_regressions_beyond_tolerance():
+    baseline = {
+        "throughput": {"msgs_per_sec": 1000},
+        "latency": {"p50_ms": 2.0, "p99_ms": 10.0},
+    }
+    results = {
+        "throughput": {"msgs_per_sec": 700},
+        "latency": {"p50_ms": 2.1, "p99_ms": 15.0},
+    }
+    regressions = compare(results, baseline, tolerance=0.2)
+    assert [line.split(":")[0] for line in regressions] == [
+        "throughput.msgs_per_sec",
+        "latency.p99_ms",
+    ]
+    assert compare(baseline, baseline, tolerance=0.0) == []
+
+
+@pytest.mark.asyncio
+async def test_short_run():
+    # Fixed counts rather than a time limit, so the results do not depend on timing
+    test = LoadTest(
+        clients=3,
+        seconds=0.3,
+        mix={"ping": 2, "programs": 1, "batch": 1},
+        broadcast_rate=100,
+        programs=50,
+        seed=1,
+        requests=20,
+        broadcasts=5,
+    )
+    results = await test.run()
+    assert results["throughput"]["requests"] == 60
+    assert results["throughput"]["errors"] == 0
+    assert results["broadcast"]["count"] == 15
+    assert results["memory"]["per_connection_kb"] > 0
+
+
+@pytest.mark.asyncio
+async def test_timed_run_draws_requests_as_it_goes():
+    test = LoadTest(
+        clients=2,
+        seconds=0.2,
+        mix={"ping": 1},
+        broadcast_rate=0,
+        programs=10,
+        seed=1,
+    )
+    results = await test.run()
+    assert results["throughput"]["requests"] > 0
+    assert results["throughput"]["errors"] == 0
+    # A timed schedule is endless, and built only as far as it is read
+    (schedule, _) = test._schedule()
+    assert [next(schedule) for _ in range(DRAW_CHUNK + 1)] == ["ping"] * (DRAW_CHUNK + 1)
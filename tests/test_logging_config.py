@@ -0,0 +1,87 @@
+# tests/test_logging_config.py
+
+import json
+import logging
+import queue
+
+import pytest
+from src.utils.logging_config import (
+    BoundedQueueHandler,
+    setup_logger,
+    shutdown_logger,
+)
+
+
+class CountingArg:
+    def __init__(self):
+        self.formatted = 0
+
+    def __str__(self):
+        self.formatted += 1
+        return "arg"
+
+
+@pytest.fixture
+def log_name():
+    name = "src.tests.logging"
+    yield name
+    shutdown_logger(name)
+
+
+def read_lines(path):
+    with open(path) as f:
+        return f.read().splitlines()
+
+
+def test_repeated_setup_does_not_stack_handlers(log_name, tmp_path):
+    log_file = tmp_path / "server.log"
+    for _ in range(3):
+        logger = setup_logger(log_name, str(log_file))
+    assert len(logger.handlers) == 1
+    logger.info("Client %s connected", 1)
+    shutdown_logger(log_name)
+    lines = read_lines(log_file)
+    assert len(lines) == 1
+    assert lines[0].endswith("INFO - Client 1 connected")
+
+
+def test_json_output(log_name, tmp_path):
+    log_file = tmp_path / "server.log"
+    logger = setup_logger(log_name, str(log_file), json_format=True)
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("Failed %s", "action")
+    shutdown_logger(log_name)
+    (line,) = read_lines(log_file)
+    entry = json.loads(line)
+    assert entry["level"] == "ERROR"
+    assert entry["message"] == "Failed action"
+    assert "ValueError: boom" in entry["exception"]
+
+
+def test_filtered_records_are_not_formatted(log_name):
+    logger = setup_logger(log_name, level=logging.WARNING)
+    arg = CountingArg()
+    logger.info("Not logged: %s", arg)
+    assert arg.formatted == 0
+
+
+def test_drop_policy_counts_dropped_records():
+    handler = BoundedQueueHandler(queue.Queue(2), policy="drop")
+    logger = logging.getLogger("src.tests.drop")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        for i in range(5):
+            logger.warning("record %s", i)
+    finally:
+        logger.removeHandler(handler)
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+    assert handler.queue.get_nowait().msg == "record 0"
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        BoundedQueueHandler(queue.Queue(), policy="spill")
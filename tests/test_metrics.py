@@ -0,0 +1,139 @@
+# tests/test_metrics.py
+
+import asyncio
+import time
+
+import pytest
+from src.server.compression import CompressionStats
+from src.utils.command_runner import CommandRunner, CommandStats
+from src.server.metrics import (
+    LatencyHistogram,
+    LoopLagMonitor,
+    MetricsEndpoint,
+    ServerMetrics,
+)
+
+
+class FakeConnection:
+    def __init__(self, backlog=0, sent=0, sent_bytes=0, dropped=0, compression=None):
+        self.backlog = backlog
+        self.sent = sent
+        self.sent_bytes = sent_bytes
+        self.dropped = dropped
+        self.compression = compression
+
+
+def test_histogram_quantiles():
+    histogram = LatencyHistogram()
+    for _ in range(98):
+        histogram.observe(0.0008)
+    histogram.observe(0.2)
+    histogram.observe(0.2)
+    assert histogram.count == 100
+    assert 0.0005 < histogram.quantile(0.5) <= 0.001
+    assert 0.1 < histogram.quantile(0.99) <= 0.25
+    assert histogram.as_dict()["p50_ms"] <= 1.0
+
+
+def test_histogram_overflow_and_empty():
+    histogram = LatencyHistogram()
+    assert histogram.quantile(0.99) == 0.0
+    histogram.observe(120.0)
+    assert histogram.quantile(0.5) == 60.0
+
+
+def test_snapshot_combines_live_and_closed_clients():
+    metrics = ServerMetrics()
+    metrics.received('{"action": "ping"}')
+    metrics.observe_action("ping", 0.001)
+    metrics.observe_action("set_power_plan", 0.01, failed=True)
+    metrics.client_closed(
+        FakeConnection(sent=5, sent_bytes=100, dropped=1, compression=CompressionStats(600, 100, 1, 2))
+    )
+
+    snapshot = metrics.snapshot(
+        [
+            FakeConnection(backlog=3, sent=2, sent_bytes=40, compression=CompressionStats(200, 100, 1, 0)),
+            FakeConnection(backlog=7),
+        ]
+    )
+    assert snapshot["clients"] == 2
+    assert snapshot["messages"] == {"received": 1, "sent": 7, "dropped": 1}
+    assert snapshot["bytes"] == {"received": 18, "sent": 140}
+    assert snapshot["backlog"] == {"total": 10, "max": 7, "top": [7, 3]}
+    assert snapshot["compression"] == {
+        "raw_bytes": 800,
+        "wire_bytes": 200,
+        "compressed_messages": 2,
+        "uncompressed_messages": 2,
+        "ratio": 0.25,
+    }
+    assert snapshot["actions"]["ping"]["count"] == 1
+    assert snapshot["actions"]["set_power_plan"]["errors"] == 1
+
+
+def test_prometheus_text():
+    metrics = ServerMetrics()
+    metrics.observe_action("ping", 0.0003)
+    metrics.observe_action("ping", 0.002)
+    text = metrics.render_prometheus([FakeConnection(backlog=2)])
+    assert "nebulalink_clients 1" in text
+    assert "nebulalink_client_backlog_max 2" in text
+    assert 'nebulalink_action_latency_seconds_bucket{action="ping",le="0.0005"} 1' in text
+    assert 'nebulalink_action_latency_seconds_bucket{action="ping",le="+Inf"} 2' in text
+    assert 'nebulalink_action_latency_seconds_count{action="ping"} 2' in text
+
+
+def test_dropped_log_records_are_reported(monkeypatch):
+    monkeypatch.setattr("src.server.metrics.dropped_records", lambda: 3)
+    metrics = ServerMetrics()
+    assert metrics.snapshot([])["log_dropped"] == 3
+    assert "nebulalink_log_records_dropped_total 3" in metrics.render_prometheus([])
+
+
+def test_command_stats_are_reported():
+    runner = CommandRunner()
+    runner.stats["powercfg"] = CommandStats()
+    runner.stats["powercfg"].record(0.25)
+    runner.stats["powercfg"].record(1.0, failed=True, timed_out=True)
+    metrics = ServerMetrics(commands=runner)
+
+    assert metrics.snapshot([])["commands"] == {
+        "powercfg": {"count": 2, "failures": 1, "timeouts": 1, "avg_ms": 625.0, "max_ms": 1000.0}
+    }
+    text = metrics.render_prometheus([])
+    assert 'nebulalink_command_runs_total{program="powercfg"} 2' in text
+    assert 'nebulalink_command_failures_total{program="powercfg"} 1' in text
+    assert 'nebulalink_command_timeouts_total{program="powercfg"} 1' in text
+    assert 'nebulalink_command_seconds_total{program="powercfg"} 1.25' in text
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_monitor_sees_blocking_call():
+    monitor = LoopLagMonitor(interval=0.01)
+    monitor.start()
+    await asyncio.sleep(0.03)
+    time.sleep(0.1)
+    await asyncio.sleep(0.03)
+    monitor.stop()
+    assert monitor.max >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint():
+    endpoint = MetricsEndpoint(lambda: "nebulalink_clients 0\n", "localhost", 0)
+    await endpoint.start()
+    try:
+        async def get(path):
+            reader, writer = await asyncio.open_connection("localhost", endpoint.port)
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+            response = await reader.read()
+            writer.close()
+            return response.decode()
+
+        response = await get("/metrics")
+        assert response.startswith("HTTP/1.1 200 OK")
+        assert response.endswith("nebulalink_clients 0\n")
+        assert (await get("/")).startswith("HTTP/1.1 404")
+    finally:
+        endpoint.close()
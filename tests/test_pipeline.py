@@ -0,0 +1,66 @@
+# tests/test_pipeline.py
+
+import asyncio
+
+import pytest
+from src.server.pipeline import RequestPipeline
+
+
+class Handler:
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+        self.completed = []
+
+    async def __call__(self, request):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(request["delay"])
+            self.completed.append(request["n"])
+        finally:
+            self.running -= 1
+
+
+@pytest.mark.asyncio
+async def test_unordered_requests_complete_out_of_order():
+    handler = Handler()
+    pipeline = RequestPipeline(handler, max_in_flight=4)
+    await pipeline.submit({"n": 0, "delay": 0.05})
+    await pipeline.submit({"n": 1, "delay": 0.0})
+    await pipeline.drain()
+    assert handler.completed == [1, 0]
+
+
+@pytest.mark.asyncio
+async def test_ordered_requests_keep_order_without_blocking_unordered():
+    handler = Handler()
+    pipeline = RequestPipeline(handler, max_in_flight=4)
+    await pipeline.submit({"n": 0, "delay": 0.05}, ordered=True)
+    await pipeline.submit({"n": 1, "delay": 0.0}, ordered=True)
+    await pipeline.submit({"n": 2, "delay": 0.0})
+    await pipeline.drain()
+    assert handler.completed == [2, 0, 1]
+
+
+@pytest.mark.asyncio
+async def test_in_flight_limit():
+    handler = Handler()
+    pipeline = RequestPipeline(handler, max_in_flight=3)
+    for n in range(10):
+        await pipeline.submit({"n": n, "delay": 0.01})
+        assert pipeline.in_flight <= 3
+    await pipeline.drain()
+    assert handler.peak == 3
+    assert sorted(handler.completed) == list(range(10))
+
+
+@pytest.mark.asyncio
+async def test_close_cancels_running_requests():
+    handler = Handler()
+    pipeline = RequestPipeline(handler, max_in_flight=2)
+    await pipeline.submit({"n": 0, "delay": 10})
+    await asyncio.sleep(0)
+    await pipeline.close()
+    assert pipeline.in_flight == 0
+    assert handler.completed == []
@@ -1,9 +1,12 @@
 # tests/test_power_controller.py
 
 import pytest
-from unittest.mock import patch, MagicMock
 from src.controllers import PowerController
-from src.utils import PowerControlError
+from src.utils import CommandError, EventBus, PowerControlError
+from tests.stubs import POWERCFG_LIST, FakeCommandRunner
+
+BALANCED = "381b4222-f694-41f0-9685-ff5bb260df2e"
+HIGH_PERFORMANCE = "8c5e7fda-e8bf-4a96-9a85-a6e23a8c635c"
 
 
 @pytest.fixture
@@ -11,26 +14,124 @@ def power_controller():
     return PowerController()
 
 
-def test_get_power_plans(power_controller):
-    plans = power_controller.get_power_plans()
+@pytest.mark.asyncio
+async def test_get_power_plans(power_controller):
+    plans = await power_controller.get_power_plans()
     assert isinstance(plans, list)
     assert all(isinstance(plan, dict) for plan in plans)
     assert all("guid" in plan and "name" in plan for plan in plans)
 
 
-@patch("subprocess.run", side_effect=Exception("Test error"))
-def test_set_power_plan_error(mock_run, power_controller):
+@pytest.mark.asyncio
+async def test_power_plans_are_parsed_and_cached():
+    runner = FakeCommandRunner(POWERCFG_LIST)
+    controller = PowerController(runner=runner)
+    plans = await controller.get_power_plans()
+    assert plans[:2] == [
+        {"guid": BALANCED, "name": "Balanced", "active": True},
+        {"guid": HIGH_PERFORMANCE, "name": "High performance", "active": False},
+    ]
+    await controller.get_power_plans()
+    assert runner.commands == [["powercfg", "/list"]]
+
+
+@pytest.mark.asyncio
+async def test_failed_power_plan_listing_is_retried():
+    runner = FakeCommandRunner(error=CommandError("Failed to start powercfg"))
+    controller = PowerController(runner=runner)
+    assert await controller.get_power_plans() == []
+    runner.error = None
+    runner.stdout = POWERCFG_LIST
+    assert len(await controller.get_power_plans()) == 3
+
+
+@pytest.mark.asyncio
+async def test_set_power_plan_tracks_active_plan():
+    runner = FakeCommandRunner(POWERCFG_LIST)
+    controller = PowerController(runner=runner)
+    result = await controller.set_power_plan(HIGH_PERFORMANCE.upper())
+    assert result["status"] == "success"
+    plans = await controller.get_power_plans()
+    assert [plan["name"] for plan in plans if plan["active"]] == ["High performance"]
+    assert runner.commands == [
+        ["powercfg", "/list"],
+        ["powercfg", "/setactive", HIGH_PERFORMANCE],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_set_power_plan_by_name():
+    runner = FakeCommandRunner(POWERCFG_LIST)
+    controller = PowerController(runner=runner)
+    await controller.set_power_plan("power saver")
+    assert runner.commands[-1] == [
+        "powercfg",
+        "/setactive",
+        "a1841308-3541-4fab-bc81-f71556f20b4a",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_unknown_power_plan_fails_without_command():
+    runner = FakeCommandRunner(POWERCFG_LIST)
+    controller = PowerController(runner=runner)
+    await controller.get_power_plans()
+    with pytest.raises(PowerControlError, match="Unknown power plan"):
+        await controller.set_power_plan("test-guid")
+    assert runner.commands == [["powercfg", "/list"]]
+
+
+@pytest.mark.asyncio
+async def test_set_power_plan_error():
+    controller = PowerController(runner=FakeCommandRunner(error=Exception("Test error")))
     with pytest.raises(PowerControlError) as exc_info:
-        power_controller.set_power_plan("test-guid")
+        await controller.set_power_plan("test-guid")
     assert "Unexpected error while setting power plan: Test error" in str(
         exc_info.value
     )
 
 
-@patch("subprocess.run", side_effect=Exception("Test error"))
-def test_set_power_plan_error(mock_run, power_controller):
+@pytest.mark.asyncio
+async def test_set_power_plan_publishes_event():
+    events = EventBus()
+    received = []
+    events.subscribe(lambda *args: received.append(args))
+    controller = PowerController(runner=FakeCommandRunner(POWERCFG_LIST), events=events)
+    await controller.set_power_plan("high performance")
+    assert received == [
+        (
+            "power",
+            {"type": "plan_changed", "guid": HIGH_PERFORMANCE, "name": "High performance"},
+            "plan",
+        )
+    ]
+    with pytest.raises(PowerControlError):
+        await controller.set_power_plan("Unknown")
+    assert len(received) == 1
+
+
+@pytest.mark.asyncio
+async def test_set_power_plan_command_error():
+    runner = FakeCommandRunner(error=CommandError("powercfg exited with code 1"))
+    controller = PowerController(runner=runner)
     with pytest.raises(PowerControlError):
-        power_controller.set_power_plan("test-guid")
+        await controller.set_power_plan("test-guid")
+    # Without a listing the GUID is passed to powercfg unvalidated
+    assert runner.commands == [
+        ["powercfg", "/list"],
+        ["powercfg", "/setactive", "test-guid"],
+    ]
 
 
-# Add more tests for shutdown, restart, sleep, and hibernate methods
+@pytest.mark.asyncio
+async def test_shutdown_restart_hibernate_commands():
+    runner = FakeCommandRunner()
+    controller = PowerController(runner=runner)
+    assert (await controller.shutdown())["status"] == "success"
+    assert (await controller.restart())["status"] == "success"
+    assert (await controller.hibernate())["status"] == "success"
+    assert runner.commands == [
+        ["shutdown", "/s", "/t", "0"],
+        ["shutdown", "/r", "/t", "0"],
+        ["shutdown", "/h"],
+    ]
@@ -0,0 +1,69 @@
+# tests/test_power_plans.py
+
+import asyncio
+import time
+
+import pytest
+from src.controllers.power_plans import PowerPlanCatalog, parse_power_plans
+from tests.stubs import POWERCFG_LIST, FakeCommandRunner
+
+
+def test_parse_power_plans():
+    plans, active = parse_power_plans(POWERCFG_LIST)
+    assert [plan["name"] for plan in plans] == [
+        "Balanced",
+        "High performance",
+        "Power saver",
+    ]
+    assert active == "381b4222-f694-41f0-9685-ff5bb260df2e"
+
+
+def test_parse_ignores_other_lines():
+    plans, active = parse_power_plans("Existing Power Schemes (* Active)\n\n")
+    assert plans == []
+    assert active is None
+
+
+@pytest.mark.asyncio
+async def test_lists_once_within_ttl():
+    runner = FakeCommandRunner(POWERCFG_LIST)
+    catalog = PowerPlanCatalog(runner, ttl=60)
+    await asyncio.gather(*[catalog.plans() for _ in range(5)])
+    await catalog.resolve("Balanced")
+    assert len(runner.commands) == 1
+
+
+@pytest.mark.asyncio
+async def test_relists_after_ttl_and_invalidate():
+    runner = FakeCommandRunner(POWERCFG_LIST)
+    catalog = PowerPlanCatalog(runner, ttl=0.05)
+    await catalog.plans()
+    time.sleep(0.06)
+    await catalog.plans()
+    assert len(runner.commands) == 2
+
+    catalog.ttl = 60
+    catalog.invalidate()
+    await catalog.plans()
+    assert len(runner.commands) == 3
+
+
+@pytest.mark.asyncio
+async def test_resolve_by_guid_and_name():
+    catalog = PowerPlanCatalog(FakeCommandRunner(POWERCFG_LIST))
+    by_guid = await catalog.resolve("8C5E7FDA-E8BF-4A96-9A85-A6E23A8C635C")
+    by_name = await catalog.resolve("High Performance")
+    assert by_guid is by_name
+    assert await catalog.resolve("Ultimate") is None
+
+
+@pytest.mark.asyncio
+async def test_mark_active():
+    catalog = PowerPlanCatalog(FakeCommandRunner(POWERCFG_LIST))
+    catalog.mark_active("A1841308-3541-4FAB-BC81-F71556F20B4A")
+    active = [plan["name"] for plan in await catalog.plans() if plan["active"]]
+    # A listing reports the active plan as powercfg sees it
+    assert active == ["Balanced"]
+    catalog.mark_active("a1841308-3541-4fab-bc81-f71556f20b4a")
+    active = [plan["name"] for plan in await catalog.plans() if plan["active"]]
+    assert active == ["Power saver"]
@@ -0,0 +1,139 @@
+# tests/test_process_table.py
+
+import os
+import time
+from unittest.mock import patch, MagicMock
+
+import pytest
+from src.controllers.process_table import ProcessTable
+
+
+def make_process(pid, name, create_time=100.0, ppid=None):
+    proc = MagicMock()
+    proc.info = {"pid": pid, "name": name, "create_time": create_time, "ppid": ppid}
+    return proc
+
+
+@pytest.fixture
+def table():
+    return ProcessTable(refresh_interval=0.05, max_age=60)
+
+
+@patch("psutil.process_iter")
+def test_refresh_diffs_by_pid_and_create_time(mock_process_iter, table):
+    mock_process_iter.return_value = [make_process(1, "init"), make_process(2, "a")]
+    diff = table.refresh()
+    assert diff.seq == 1
+    assert diff.added == [{"pid": 1, "name": "init"}, {"pid": 2, "name": "a"}]
+
+    # pid 2 was recycled by a new process, pid 3 started
+    mock_process_iter.return_value = [
+        make_process(1, "init"),
+        make_process(2, "b", create_time=200.0),
+        make_process(3, "c"),
+    ]
+    diff = table.refresh()
+    assert diff.seq == 2
+    assert diff.added == [{"pid": 2, "name": "b"}, {"pid": 3, "name": "c"}]
+    assert diff.removed == [{"pid": 2, "name": "a"}]
+    assert diff.changed == []
+
+
+@patch("psutil.process_iter")
+def test_unchanged_refresh_keeps_sequence(mock_process_iter, table):
+    mock_process_iter.return_value = [make_process(1, "init")]
+    table.refresh()
+    diff = table.refresh()
+    assert not diff
+    assert table.seq == 1
+
+
+@patch("psutil.process_iter")
+def test_snapshot_served_from_cache_within_staleness_bound(mock_process_iter, table):
+    mock_process_iter.return_value = [make_process(1, "init")]
+    first = table.snapshot()
+    second = table.snapshot()
+    assert first is second
+    assert mock_process_iter.call_count == 1
+
+    table.snapshot(max_age=0)
+    assert mock_process_iter.call_count == 2
+
+
+@patch("psutil.process_iter")
+def test_lookup_by_pid(mock_process_iter, table):
+    proc = make_process(42, "game.exe")
+    mock_process_iter.return_value = [proc]
+    table.refresh()
+    assert table.lookup(42) is proc
+    assert table.get_entry(42) == {"pid": 42, "name": "game.exe"}
+    assert table.lookup(43) is None
+
+
+@patch("psutil.process_iter")
+def test_listener_receives_diffs(mock_process_iter, table):
+    diffs = []
+    table.add_listener(diffs.append)
+    mock_process_iter.return_value = [make_process(1, "init")]
+    table.refresh()
+    table.refresh()
+    assert [diff.seq for diff in diffs] == [1]
+
+
+def test_background_refresh_finds_current_process(table):
+    table.start()
+    try:
+        deadline = time.monotonic() + 5
+        while table.lookup(os.getpid()) is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert table.lookup(os.getpid()) is not None
+    finally:
+        table.stop()
+
+
+@patch("psutil.process_iter")
+def test_descendants_and_name_match(mock_process_iter, table):
+    mock_process_iter.return_value = [
+        make_process(0, "idle", ppid=0),
+        make_process(1, "init", ppid=0),
+        make_process(10, "Launcher.exe", ppid=1),
+        make_process(11, "game.exe", ppid=10),
+        make_process(12, "helper.exe", ppid=10),
+        make_process(13, "crash_reporter.exe", ppid=11),
+    ]
+    table.refresh()
+    assert table.descendants(10) == [11, 12, 13]
+    assert table.descendants(13) == []
+    # pid 0 is its own parent; the walk must not loop
+    assert table.descendants(0) == [1, 10, 11, 12, 13]
+    assert table.match("launcher.EXE") == [10]
+    assert sorted(table.match("*.exe")) == [10, 11, 12, 13]
+    # Entries sent to clients do not carry the parent pid
+    assert table.get_entry(11) == {"pid": 11, "name": "game.exe"}
+
+
+@patch("psutil.process_iter")
+def test_mirror_loads_scans_of_another_table(mock_process_iter, table):
+    scans = []
+    table.add_scan_listener(scans.append)
+    mock_process_iter.return_value = [
+        make_process(1, "init", ppid=0),
+        make_process(10, "game.exe", ppid=1),
+    ]
+    table.refresh()
+    assert scans == [[[1, "init", 100.0, 0], [10, "game.exe", 100.0, 1]]]
+
+    mirror = ProcessTable(max_age=0)
+    mirror.mirror = True
+    diffs = []
+    mirror.add_listener(diffs.append)
+    mirror.load(scans[0])
+    # A mirror never scans, however stale it is
+    assert mirror.snapshot() == [{"pid": 1, "name": "init"}, {"pid": 10, "name": "game.exe"}]
+    assert mock_process_iter.call_count == 1
+    assert mirror.descendants(1) == [10]
+    assert mirror.match("GAME*") == [10]
+    assert mirror.lookup(10) is None
+
+    mirror.load([[1, "init", 100.0, 0]])
+    assert [diff.removed for diff in diffs] == [[], [{"pid": 10, "name": "game.exe"}]]
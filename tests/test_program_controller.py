@@ -1,9 +1,18 @@
 # tests/test_program_controller.py
 
+import os
+import shutil
+import subprocess
+import sys
+import time
+import uuid
+
+import psutil
 import pytest
 from unittest.mock import patch, MagicMock
 from src.controllers import ProgramController
-from src.utils import ProgramControlError
+from src.controllers.process_table import ProcessTableDiff
+from src.utils import EventBus, ProgramControlError
 
 @pytest.fixture
 def program_controller():
@@ -41,4 +50,131 @@ def test_pause_program_error(mock_process, program_controller):
     with pytest.raises(ProgramControlError):
         program_controller.pause_program(1234)
 
-# Add more tests for error cases
\ No newline at end of file
+# Add more tests for error cases
+
+
+def test_bulk_selection_is_validated(program_controller):
+    with pytest.raises(ProgramControlError):
+        program_controller.pause_programs()
+    with pytest.raises(ProgramControlError):
+        program_controller.pause_programs(pids=[1], root=1)
+    with pytest.raises(ProgramControlError, match="at least one"):
+        program_controller.pause_programs(pids=[])
+
+
+def test_bulk_refuses_to_pause_the_server(program_controller):
+    result = program_controller.pause_programs(pids=[os.getpid()])
+    assert result["status"] == "error"
+    assert result["results"][0]["status"] == "error"
+
+
+linux_only = pytest.mark.skipif(
+    not sys.platform.startswith("linux") or shutil.which("sleep") is None,
+    reason="Spawns sleep processes and checks their state through /proc",
+)
+
+
+def wait_for_status(pids, status, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if all(psutil.Process(pid).status() == status for pid in pids):
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def sleep_tree(tmp_path):
+    """A shell with two sleep children, all named by a unique link to sleep."""
+    name = f"nlsleep{uuid.uuid4().hex[:8]}"
+    link = tmp_path / name
+    link.symlink_to(shutil.which("sleep"))
+    shell = subprocess.Popen(["sh", "-c", f"{link} 30 & {link} 30 & wait"])
+    children = []
+    deadline = time.monotonic() + 5
+    while len(children) < 2 and time.monotonic() < deadline:
+        children = psutil.Process(shell.pid).children()
+        time.sleep(0.01)
+    yield name, shell.pid, [child.pid for child in children]
+    for process in [psutil.Process(shell.pid)] + children:
+        try:
+            process.resume()
+            process.kill()
+        except psutil.NoSuchProcess:
+            pass
+    shell.wait()
+
+
+@linux_only
+def test_pause_and_resume_process_tree(program_controller, sleep_tree):
+    _, root, children = sleep_tree
+    result = program_controller.pause_programs(root=root, include_children=True, max_age=0)
+    assert result["status"] == "success"
+    assert result["paused"] == 3
+    # The root is suspended first
+    assert [r["pid"] for r in result["results"]] == [root] + children
+    assert wait_for_status([root] + children, psutil.STATUS_STOPPED)
+
+    result = program_controller.resume_programs(root=root, include_children=True, max_age=0)
+    assert result["resumed"] == 3
+    # Children are resumed before their parent
+    assert result["results"][-1]["pid"] == root
+    assert wait_for_status([root] + children, psutil.STATUS_SLEEPING)
+
+
+@linux_only
+def test_pause_by_name_and_pid_list(program_controller, sleep_tree):
+    name, root, children = sleep_tree
+    result = program_controller.pause_programs(name=f"{name.upper()}*", max_age=0)
+    assert sorted(r["pid"] for r in result["results"]) == sorted(children)
+    assert all(r["name"] == name for r in result["results"])
+    assert wait_for_status(children, psutil.STATUS_STOPPED)
+    assert psutil.Process(root).status() != psutil.STATUS_STOPPED
+
+    gone = max(psutil.pids()) + 100000
+    result = program_controller.resume_programs(pids=children + [gone])
+    assert result["status"] == "partial"
+    assert result["resumed"] == 2
+    # Resumed in the reverse of the pause order
+    assert result["results"][0] == {
+        "pid": gone,
+        "status": "error",
+        "error": f"No process found with PID {gone}",
+    }
+    assert wait_for_status(children, psutil.STATUS_SLEEPING)
+
+
+@patch('psutil.Process')
+def test_process_changes_are_published(mock_process):
+    events = EventBus()
+    received = []
+    events.subscribe(lambda *args: received.append(args))
+    controller = ProgramController(events=events)
+    table = controller.process_table
+
+    # The first scan lists every process as started; it is not published
+    table._listeners[0](ProcessTableDiff(1, added=[{"pid": 1, "name": "a"}], initial=True))
+    table._listeners[0](
+        ProcessTableDiff(2, added=[{"pid": 2, "name": "b"}], removed=[{"pid": 3, "name": "c"}])
+    )
+    controller.pause_program(2)
+    controller.resume_programs(pids=[2])
+    assert received == [
+        ("programs", {"type": "started", "pid": 2, "name": "b"}, 2),
+        ("programs", {"type": "exited", "pid": 3, "name": "c"}, 3),
+        ("programs", {"type": "paused", "pid": 2, "name": None}, 2),
+        ("programs", {"type": "resumed", "pid": 2, "name": None}, 2),
+    ]
+
+
+@patch('psutil.Process')
+def test_followers_leave_process_changes_to_the_owner(mock_process):
+    events = EventBus()
+    received = []
+    events.subscribe(lambda *args: received.append(args))
+    controller = ProgramController(events=events)
+    controller.follow()
+
+    controller.process_table._listeners[0](ProcessTableDiff(2, added=[{"pid": 2, "name": "b"}]))
+    controller.pause_program(2)
+    assert received == [("programs", {"type": "paused", "pid": 2, "name": None}, 2)]
@@ -0,0 +1,97 @@
+# tests/test_program_subscriptions.py
+
+import pytest
+from src.server.program_subscriptions import ProgramSubscriptions
+from tests.stubs import StubProgramController
+
+
+class Outbox:
+    def __init__(self):
+        self.messages = {}
+
+    def __call__(self, websocket, payload):
+        self.messages.setdefault(websocket, []).append(payload)
+        return True
+
+    def decoded(self, websocket):
+        return [shared.message for shared in self.messages.get(websocket, [])]
+
+
+@pytest.fixture
+def controller():
+    return StubProgramController(count=2)
+
+
+@pytest.fixture
+def outbox():
+    return Outbox()
+
+
+@pytest.fixture
+def subscriptions(controller, outbox):
+    return ProgramSubscriptions(controller, outbox, history_size=3)
+
+
+@pytest.mark.asyncio
+async def test_subscribe_sends_snapshot(subscriptions, outbox):
+    assert await subscriptions.subscribe("client") == 0
+    (snapshot,) = outbox.decoded("client")
+    assert snapshot["action"] == "programs_snapshot"
+    assert snapshot["seq"] == 0
+    assert [program["pid"] for program in snapshot["programs"]] == [1000, 1001]
+
+
+@pytest.mark.asyncio
+async def test_deltas_are_encoded_once_and_shared(subscriptions, controller, outbox):
+    await subscriptions.subscribe("a")
+    await subscriptions.subscribe("b")
+    subscriptions.publish(controller.spawn("new.exe"))
+
+    delta_a = outbox.messages["a"][-1]
+    assert delta_a is outbox.messages["b"][-1]
+    assert delta_a.message == {
+        "action": "programs_delta",
+        "seq": 1,
+        "added": [{"pid": 1002, "name": "new.exe"}],
+        "removed": [],
+        "changed": [],
+    }
+
+
+@pytest.mark.asyncio
+async def test_deltas_covered_by_snapshot_are_skipped(subscriptions, controller, outbox):
+    diff = controller.spawn("new.exe")
+    await subscriptions.subscribe("client")
+    subscriptions.publish(diff)
+    assert [message["action"] for message in outbox.decoded("client")] == [
+        "programs_snapshot"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_resync_replays_missed_deltas(subscriptions, controller, outbox):
+    for i in range(3):
+        subscriptions.publish(controller.spawn(f"p{i}.exe"))
+    assert await subscriptions.subscribe("client", since=1) == 3
+    assert [message["seq"] for message in outbox.decoded("client")] == [2, 3]
+
+
+@pytest.mark.asyncio
+async def test_resync_beyond_history_falls_back_to_snapshot(
+    subscriptions, controller, outbox
+):
+    for i in range(5):
+        subscriptions.publish(controller.spawn(f"p{i}.exe"))
+    assert await subscriptions.subscribe("client", since=0) == 5
+    (snapshot,) = outbox.decoded("client")
+    assert snapshot["action"] == "programs_snapshot"
+    assert len(snapshot["programs"]) == 7
+
+
+@pytest.mark.asyncio
+async def test_unsubscribe(subscriptions, controller, outbox):
+    await subscriptions.subscribe("client")
+    assert subscriptions.unsubscribe("client")
+    subscriptions.publish(controller.spawn("new.exe"))
+    assert len(outbox.messages["client"]) == 1
+    assert not subscriptions.unsubscribe("client")
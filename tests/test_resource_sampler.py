@@ -0,0 +1,124 @@
+# tests/test_resource_sampler.py
+
+import os
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.controllers import ProgramController
+from src.controllers.resource_sampler import ResourceSampler
+from src.utils import ProgramControlError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_process(pid, name, cpu, rss=0, threads=1, io=(0, 0), create_time=1.0):
+    proc = MagicMock()
+    proc.info = {
+        "pid": pid,
+        "name": name,
+        "create_time": create_time,
+        # None is what psutil reports for attributes it was denied
+        "cpu_times": SimpleNamespace(user=cpu, system=0.0) if cpu is not None else None,
+        "memory_info": SimpleNamespace(rss=rss),
+        "num_threads": threads,
+        "io_counters": SimpleNamespace(read_bytes=io[0], write_bytes=io[1]),
+    }
+    return proc
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def sampler(clock):
+    return ResourceSampler(interval=60, clock=clock)
+
+
+@patch("psutil.process_iter")
+def test_rates_between_samples(mock_process_iter, sampler, clock):
+    mock_process_iter.return_value = [
+        make_process(1, "idle", 10.0),
+        make_process(2, "game.exe", 20.0, io=(1000, 0)),
+        make_process(3, "recycled", 5.0),
+        make_process(4, "protected", None),
+    ]
+    first = sampler.sample()
+    assert list(first.cpu_percent) == [0.0] * 4
+
+    clock.now += 2.0
+    mock_process_iter.return_value = [
+        make_process(1, "idle", 10.0),
+        make_process(2, "game.exe", 23.0, io=(5000, 800)),
+        # Same pid, different process
+        make_process(3, "recycled", 9.0, create_time=2.0),
+        make_process(4, "protected", None),
+        make_process(5, "new", 1.0),
+    ]
+    sample = sampler.sample()
+    assert list(sample.cpu_percent) == [0.0, 150.0, 0.0, 0.0, 0.0]
+    assert list(sample.read_rate) == [0.0, 2000.0, 0.0, 0.0, 0.0]
+    assert list(sample.write_rate) == [0.0, 400.0, 0.0, 0.0, 0.0]
+    assert sampler.latest is sample
+
+
+@patch("psutil.process_iter")
+def test_top_n_and_name_filter(mock_process_iter, sampler, clock):
+    processes = [
+        make_process(pid, f"proc{pid}.exe", 0.0, rss=pid * 1024, threads=pid)
+        for pid in range(1, 51)
+    ]
+    mock_process_iter.return_value = processes
+    sampler.sample()
+    clock.now += 1.0
+    for proc in processes:
+        # CPU use falls as the pid grows
+        user = (60 - proc.info["pid"]) / 100
+        proc.info["cpu_times"] = SimpleNamespace(user=user, system=0.0)
+    sampler.sample()
+
+    _, top = sampler.query("cpu", 3)
+    assert [row["pid"] for row in top] == [1, 2, 3]
+    assert top[0] == {
+        "pid": 1,
+        "name": "proc1.exe",
+        "cpu_percent": 59.0,
+        "rss": 1024,
+        "threads": 1,
+        "read_bytes_per_sec": 0,
+        "write_bytes_per_sec": 0,
+    }
+    _, top = sampler.query("memory", 2)
+    assert [row["pid"] for row in top] == [50, 49]
+    _, top = sampler.query("threads", 5, name="PROC1*")
+    assert [row["pid"] for row in top] == [19, 18, 17, 16, 15]
+    with pytest.raises(ValueError):
+        sampler.query("disk")
+
+
+def test_sample_of_this_machine(sampler):
+    sample = sampler.sample()
+    row = list(sample.pids).index(os.getpid())
+    assert sample.rss[row] > 0
+    assert sample.threads[row] >= 1
+    assert sample.cpu_times[row] >= 0
+
+
+def test_program_usage(clock):
+    controller = ProgramController(sampler=ResourceSampler(clock=clock))
+    usage = controller.get_program_usage("memory", limit=5)
+    assert usage["total"] >= len(usage["programs"]) > 0
+    assert usage["age"] == 0.0
+    rss = [program["rss"] for program in usage["programs"]]
+    assert rss == sorted(rss, reverse=True)
+    with pytest.raises(ProgramControlError):
+        controller.get_program_usage("disk")
@@ -0,0 +1,216 @@
+# tests/test_scheduler.py
+
+import asyncio
+import json
+import time
+from datetime import datetime
+
+import pytest
+
+from src.server.nebulalink_server import NebulaLinkServer
+from src.server.scheduler import Scheduler
+from src.utils import SchedulerError
+from tests.stubs import (
+    FakeWebSocket,
+    StubDisplayController,
+    StubPowerController,
+    StubProgramController,
+)
+
+# 2026-03-02 01:00 local time
+WALL_START = datetime(2026, 3, 2, 1, 0).timestamp()
+
+
+class VirtualClock:
+    """Monotonic and wall clock that only move when the test advances them."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def wall(self) -> float:
+        return WALL_START + self.now - 1000.0
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+class Recorder:
+    def __init__(self):
+        self.requests = []
+
+    async def __call__(self, request):
+        self.requests.append(request)
+        if request.get("fail"):
+            return {"error": "failed"}
+        return {"action": request["action"], "result": "ok"}
+
+    def actions(self):
+        return [request["action"] for request in self.requests]
+
+
+@pytest.fixture
+def clock():
+    return VirtualClock()
+
+
+@pytest.fixture
+def recorder():
+    return Recorder()
+
+
+@pytest.fixture
+def scheduler(clock, recorder):
+    return Scheduler(recorder, clock=clock, wall_clock=clock.wall, late_after=1.0)
+
+
+@pytest.mark.asyncio
+async def test_jobs_run_in_due_order(scheduler, clock, recorder):
+    scheduler.schedule({"action": "resume_program", "pid": 1}, delay=10)
+    scheduler.schedule({"action": "pause_program", "pid": 1}, delay=0)
+    scheduler.schedule({"action": "sleep"}, delay=1800)
+
+    await scheduler.run_due()
+    assert recorder.actions() == ["pause_program"]
+    clock.advance(10)
+    await scheduler.run_due()
+    assert recorder.actions() == ["pause_program", "resume_program"]
+    assert [job["request"]["action"] for job in scheduler.jobs()] == ["sleep"]
+    assert scheduler.jobs()[0]["due_in"] == 1790
+    assert scheduler.get_stats()["missed"] == 0
+
+
+@pytest.mark.asyncio
+async def test_time_of_day_and_dates(scheduler, clock, recorder):
+    job = scheduler.schedule({"action": "set_power_plan", "guid": "x"}, at="02:00")
+    assert job["due_in"] == 3600
+    assert job["at"] == "2026-03-02T02:00:00"
+    # A time of day that already passed today means tomorrow
+    assert scheduler.schedule({"action": "sleep"}, at="00:30")["due_in"] == 23.5 * 3600
+    assert scheduler.schedule({"action": "sleep"}, at="2026-03-03T01:00")["due_in"] == 86400
+
+    for timing in (
+        {"at": "2026-03-01T12:00"},
+        {"at": "soon"},
+        {"delay": 5, "at": "02:00"},
+        {"delay": -1},
+        {"every": 0.1},
+        {},
+    ):
+        with pytest.raises(SchedulerError):
+            scheduler.schedule({"action": "sleep"}, **timing)
+
+
+@pytest.mark.asyncio
+async def test_recurring_job_skips_missed_periods(scheduler, clock, recorder):
+    job = scheduler.schedule({"action": "pause_programs", "name": "game*"}, every=10)
+    clock.advance(10.5)
+    await scheduler.run_due()
+    # The machine was asleep: the run due at 20s starts 25.5s late, 30s and 40s are skipped
+    clock.advance(35)
+    await scheduler.run_due()
+    assert len(recorder.requests) == 2
+
+    (listed,) = scheduler.jobs()
+    assert listed["runs"] == 2
+    assert listed["due_in"] == pytest.approx(4.5)
+    stats = scheduler.get_stats()
+    assert stats["missed"] == 1
+    assert stats["skipped"] == 2
+    assert stats["lateness"]["count"] == 2
+
+    assert scheduler.cancel(job["job"])
+    assert not scheduler.cancel(job["job"])
+    clock.advance(100)
+    assert await scheduler.run_due() == []
+
+
+@pytest.mark.asyncio
+async def test_failures_are_counted_and_kept(scheduler, clock):
+    job = scheduler.schedule({"action": "sleep", "fail": True}, every=60)
+    clock.advance(60)
+    await scheduler.run_due()
+    assert scheduler.get_stats()["failed"] == 1
+    assert scheduler.jobs()[0]["last_result"] == {"error": "failed"}
+    assert scheduler.cancel(job["job"])
+
+
+@pytest.mark.asyncio
+async def test_thousands_of_timers(scheduler, clock, recorder):
+    scheduler.max_jobs = 20000
+    started = time.perf_counter()
+    jobs = [
+        scheduler.schedule({"action": "resume_program", "pid": i}, delay=i % 600)
+        for i in range(10000)
+    ]
+    for i, job in enumerate(jobs):
+        if i % 4:
+            scheduler.cancel(job["job"])
+    # Cancelled entries are dropped from the heap once they dominate it
+    assert len(scheduler._heap) < 5000
+    clock.advance(300)
+    due = await scheduler.run_due()
+    assert time.perf_counter() - started < 2.0
+
+    expected = [i for i in range(0, 10000, 4) if i % 600 <= 300]
+    assert sorted(request["pid"] for request in recorder.requests) == expected
+    assert [job.due for job in due] == sorted(job.due for job in due)
+    assert len(scheduler) == 2500 - len(expected)
+
+
+@pytest.mark.asyncio
+async def test_loop_runs_jobs_on_time(recorder):
+    scheduler = Scheduler(recorder)
+    scheduler.start()
+    try:
+        scheduler.schedule({"action": "sleep"}, delay=60)
+        # Scheduled earlier than the job the loop is already waiting for
+        scheduler.schedule({"action": "pause_program", "pid": 1}, delay=0.05)
+        await asyncio.sleep(0.2)
+        assert recorder.actions() == ["pause_program"]
+    finally:
+        scheduler.stop()
+
+
+@pytest.fixture
+def server():
+    server = NebulaLinkServer(
+        power_controller=StubPowerController(),
+        display_controller=StubDisplayController(),
+        program_controller=StubProgramController(),
+    )
+    yield server
+    server.stop()
+
+
+async def request(server, message):
+    websocket = FakeWebSocket()
+    await server.handle_message(websocket, json.dumps(message))
+    return json.loads(websocket.sent[0])
+
+
+@pytest.mark.asyncio
+async def test_schedule_actions(server, clock):
+    server.scheduler.clock = clock
+    reply = await request(
+        server,
+        {"action": "schedule", "request": {"action": "pause_program", "pid": 1000}, "delay": 10},
+    )
+    job = reply["result"]["job"]
+    listed = (await request(server, {"action": "list_scheduled"}))["result"]["jobs"]
+    assert [item["job"] for item in listed] == [job]
+
+    clock.advance(10)
+    await server.scheduler.run_due()
+    assert 1000 in server.program_controller.paused
+    assert (await request(server, {"action": "cancel", "job": job}))["result"] == {
+        "job": job,
+        "cancelled": False,
+    }
+
+    for scheduled in ({"action": "stats"}, {"action": "pause_program"}, "sleep"):
+        reply = await request(server, {"action": "schedule", "request": scheduled, "delay": 1})
+        assert reply["error"]["error"] == "SchedulerError"
+    assert server.metrics.snapshot([])["scheduler"]["executed"] == 1
@@ -1,14 +1,129 @@
 # tests/test_server.py
 
 import pytest
+import pytest_asyncio
 import asyncio
 import websockets
 import json
+import time
+
+
+@pytest.fixture
+def stub_server():
+    from src.server.nebulalink_server import NebulaLinkServer
+    from tests.stubs import (
+        StubPowerController,
+        StubDisplayController,
+        StubProgramController,
+    )
+
+    server = NebulaLinkServer(
+        power_controller=StubPowerController(delay=0.3),
+        display_controller=StubDisplayController(),
+        program_controller=StubProgramController(),
+    )
+    yield server
+    server.stop()
+
+
+@pytest.mark.asyncio
+async def test_dispatch_controller_action(stub_server):
+    from tests.stubs import FakeWebSocket
+
+    websocket = FakeWebSocket()
+    await stub_server.handle_message(
+        websocket, json.dumps({"action": "pause_program", "pid": 1000})
+    )
+    assert json.loads(websocket.sent[0]) == {
+        "action": "pause_program",
+        "result": {"status": "success", "message": "Program with PID 1000 paused"},
+    }
+    assert 1000 in stub_server.program_controller.paused
+
+
+@pytest.mark.asyncio
+async def test_dispatch_missing_parameter(stub_server):
+    from tests.stubs import FakeWebSocket
+
+    websocket = FakeWebSocket()
+    await stub_server.handle_message(websocket, json.dumps({"action": "set_power_plan"}))
+    response = json.loads(websocket.sent[0])
+    assert response["error"]["error"] == "CommandError"
+
+
+@pytest.mark.asyncio
+async def test_dispatch_unknown_action(stub_server):
+    from tests.stubs import FakeWebSocket
+
+    websocket = FakeWebSocket()
+    await stub_server.handle_message(websocket, json.dumps({"action": "unknown"}))
+    assert json.loads(websocket.sent[0]) == {"error": "Unknown action"}
+
+
+@pytest.mark.asyncio
+async def test_slow_action_does_not_delay_ping(stub_server):
+    from tests.stubs import FakeWebSocket
+
+    slow_client, fast_client = FakeWebSocket(), FakeWebSocket()
+    slow = asyncio.create_task(
+        stub_server.handle_message(
+            slow_client, json.dumps({"action": "set_power_plan", "guid": "x"})
+        )
+    )
+    await asyncio.sleep(0)
+    await asyncio.wait_for(
+        stub_server.handle_message(fast_client, json.dumps({"action": "ping"})),
+        timeout=0.1,
+    )
+    assert json.loads(fast_client.sent[0]) == {"action": "pong"}
+    assert not slow.done()
+    await slow
+    assert json.loads(slow_client.sent[0])["action"] == "set_power_plan"
 
 
 @pytest.mark.asyncio
-async def test_server_connection():
-    uri = "ws://localhost:8765"
+async def test_first_program_usage_query_does_not_delay_ping():
+    from src.controllers.program_controller import ProgramController
+    from src.controllers.resource_sampler import ResourceSampler
+    from src.server.nebulalink_server import NebulaLinkServer
+    from tests.stubs import FakeWebSocket
+
+    class SlowSampler(ResourceSampler):
+        def sample(self):
+            time.sleep(0.3)
+            return super().sample()
+
+    server = NebulaLinkServer(program_controller=ProgramController(sampler=SlowSampler()))
+    try:
+        usage_client, ping_client = FakeWebSocket(), FakeWebSocket()
+        # No background sample yet, so this query takes one
+        usage = asyncio.create_task(
+            server.handle_message(usage_client, json.dumps({"action": "get_program_usage"}))
+        )
+        await asyncio.sleep(0)
+        await asyncio.wait_for(
+            server.handle_message(ping_client, json.dumps({"action": "ping"})),
+            timeout=0.1,
+        )
+        assert not usage.done()
+        await usage
+        assert json.loads(usage_client.sent[0])["result"]["total"] > 0
+    finally:
+        server.stop()
+
+
+@pytest_asyncio.fixture
+async def running_server(stub_server):
+    stub_server.port = 0
+    await stub_server.start()
+    yield stub_server
+    stub_server.stop()
+    await stub_server.server.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_server_connection(running_server):
+    uri = f"ws://localhost:{running_server.port}"
     async with websockets.connect(uri) as websocket:
         await websocket.send(json.dumps({"action": "ping"}))
         response = await websocket.recv()
@@ -16,12 +131,239 @@ async def test_server_connection():
 
 
 @pytest.mark.asyncio
-async def test_unknown_action():
-    uri = "ws://localhost:8765"
+async def test_unknown_action(running_server):
+    uri = f"ws://localhost:{running_server.port}"
     async with websockets.connect(uri) as websocket:
         await websocket.send(json.dumps({"action": "unknown"}))
         response = await websocket.recv()
         assert json.loads(response) == {"error": "Unknown action"}
 
 
-# Add more tests for other server functionalities
+@pytest.mark.asyncio
+async def test_broadcast_load_with_stalled_client(running_server):
+    stub_server = running_server
+    clients = 200
+    messages = 20
+    uri = f"ws://localhost:{stub_server.port}"
+
+    fast = [await websockets.connect(uri) for _ in range(clients)]
+    # Never reads, and uses a tiny receive buffer so its socket backs up quickly
+    stalled = await websockets.connect(uri, max_queue=1)
+    while len(stub_server.clients) < clients + 1:
+        await asyncio.sleep(0.01)
+
+    payload = {"action": "event", "data": "x" * 8 * 1024}
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    for i in range(messages):
+        await stub_server.broadcast(dict(payload, seq=i))
+    # Fan-out only queues the pre-serialized payload; no socket is awaited
+    assert loop.time() - start < 1.0
+
+    async def receive_all(websocket):
+        return [json.loads(await websocket.recv())["seq"] for _ in range(messages)]
+
+    received = await asyncio.wait_for(
+        asyncio.gather(*[receive_all(ws) for ws in fast]), timeout=30
+    )
+    assert all(seqs == list(range(messages)) for seqs in received)
+
+    stalled.transport.abort()
+    await asyncio.gather(*[websocket.close() for websocket in fast])
+
+
+@pytest.mark.asyncio
+async def test_subscribe_programs_streams_deltas(running_server):
+    async with websockets.connect(f"ws://localhost:{running_server.port}") as websocket:
+        await websocket.send(json.dumps({"action": "subscribe_programs"}))
+        snapshot = json.loads(await websocket.recv())
+        assert snapshot["action"] == "programs_snapshot"
+        assert json.loads(await websocket.recv()) == {
+            "action": "subscribe_programs",
+            "result": snapshot["seq"],
+        }
+
+        running_server.program_controller.spawn("new.exe")
+        delta = json.loads(await asyncio.wait_for(websocket.recv(), timeout=1))
+        assert delta["action"] == "programs_delta"
+        assert delta["seq"] == snapshot["seq"] + 1
+        assert delta["added"][0]["name"] == "new.exe"
+
+
+@pytest.mark.asyncio
+async def test_batch_envelope(stub_server):
+    from tests.stubs import FakeWebSocket
+
+    websocket = FakeWebSocket()
+    actions = [{"action": "pause_program", "pid": pid} for pid in range(40)]
+    actions += [{"action": "unknown"}, {"action": "batch", "actions": []}]
+    await stub_server.handle_message(
+        websocket, json.dumps({"action": "batch", "actions": actions, "concurrency": 8})
+    )
+    (response,) = [json.loads(message) for message in websocket.sent]
+    assert response["action"] == "batch"
+    results = response["results"]
+    assert len(results) == 42
+    assert results[0] == {
+        "action": "pause_program",
+        "result": {"status": "success", "message": "Program with PID 0 paused"},
+    }
+    assert stub_server.program_controller.paused == set(range(40))
+    assert results[40] == {"error": "Unknown action"}
+    assert "error" in results[41]
+
+
+@pytest.mark.asyncio
+async def test_pipelined_requests_reply_out_of_order(running_server):
+    async with websockets.connect(f"ws://localhost:{running_server.port}") as websocket:
+        await websocket.send(
+            json.dumps({"action": "set_power_plan", "guid": "x", "id": "slow"})
+        )
+        await websocket.send(json.dumps({"action": "ping", "id": 7}))
+        first = json.loads(await websocket.recv())
+        second = json.loads(await websocket.recv())
+        assert first == {"action": "pong", "id": 7}
+        assert second["id"] == "slow"
+        assert second["action"] == "set_power_plan"
+
+
+@pytest.mark.asyncio
+async def test_requests_without_id_keep_their_order(running_server):
+    async with websockets.connect(f"ws://localhost:{running_server.port}") as websocket:
+        await websocket.send(json.dumps({"action": "set_power_plan", "guid": "x"}))
+        await websocket.send(json.dumps({"action": "ping"}))
+        assert json.loads(await websocket.recv())["action"] == "set_power_plan"
+        assert json.loads(await websocket.recv()) == {"action": "pong"}
+
+
+@pytest.mark.asyncio
+async def test_binary_codec_negotiated_by_subprotocol(running_server):
+    msgpack = pytest.importorskip("msgpack")
+    async with websockets.connect(
+        f"ws://localhost:{running_server.port}", subprotocols=["nebulalink.msgpack"]
+    ) as websocket:
+        assert websocket.subprotocol == "nebulalink.msgpack"
+        await websocket.send(msgpack.packb({"action": "ping", "id": 1}))
+        reply = await websocket.recv()
+        assert isinstance(reply, bytes)
+        assert msgpack.unpackb(reply) == {"action": "pong", "id": 1}
+
+
+@pytest.mark.asyncio
+async def test_hello_switches_codec(running_server):
+    msgpack = pytest.importorskip("msgpack")
+    async with websockets.connect(f"ws://localhost:{running_server.port}") as websocket:
+        await websocket.send(json.dumps({"action": "hello", "codec": "msgpack"}))
+        reply = msgpack.unpackb(await websocket.recv())
+        assert reply["result"]["codec"] == "msgpack"
+        await websocket.send(msgpack.packb({"action": "ping"}))
+        assert msgpack.unpackb(await websocket.recv()) == {"action": "pong"}
+
+
+@pytest.mark.asyncio
+async def test_large_replies_are_compressed(running_server):
+    running_server.program_controller.programs = [
+        {"pid": pid, "name": f"process_{pid % 10}.exe"} for pid in range(500)
+    ]
+    async with websockets.connect(
+        f"ws://localhost:{running_server.port}", compression="deflate"
+    ) as websocket:
+        await websocket.send(json.dumps({"action": "ping"}))
+        await websocket.recv()
+        await websocket.send(json.dumps({"action": "get_running_programs"}))
+        reply = json.loads(await websocket.recv())
+        assert len(reply["result"]) == 500
+
+        (connection,) = running_server.clients.values()
+        stats = connection.compression
+        assert stats.uncompressed_messages == 1
+        assert stats.compressed_messages == 1
+        assert stats.wire_bytes < stats.raw_bytes / 4
+        assert running_server.metrics.snapshot([connection])["compression"] == stats.as_dict()
+
+
+@pytest.mark.asyncio
+async def test_pong_before_controllers_are_built():
+    from src.controllers.lazy import LazyController
+    from src.server.nebulalink_server import NebulaLinkServer
+    from tests.stubs import (
+        StubPowerController,
+        StubDisplayController,
+        StubProgramController,
+    )
+
+    def slow(factory):
+        def build():
+            time.sleep(0.5)
+            return factory()
+
+        return build
+
+    server = NebulaLinkServer(
+        port=0,
+        power_controller=LazyController(slow(StubPowerController)),
+        display_controller=LazyController(slow(StubDisplayController)),
+        program_controller=StubProgramController(),
+    )
+    started = time.perf_counter()
+    await server.start()
+    try:
+        async with websockets.connect(f"ws://localhost:{server.port}") as websocket:
+            await websocket.send(json.dumps({"action": "ping"}))
+            assert json.loads(await websocket.recv()) == {"action": "pong"}
+            assert time.perf_counter() - started < 0.5
+            assert [name for name, _ in server.startup.phases] == [
+                "controllers",
+                "program table",
+                "listen",
+            ]
+
+            # The warmup builds both controllers in the background
+            await asyncio.wait_for(server._warmup_task, 5)
+            assert server.power_controller.loaded
+            assert server.display_controller.loaded
+            await websocket.send(json.dumps({"action": "get_display_info"}))
+            reply = json.loads(await websocket.recv())
+            assert reply["result"][0]["friendly_name"] == "Stub Display"
+    finally:
+        server.stop()
+        await server.server.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_server_starts_without_platform_controllers():
+    from src.server.nebulalink_server import NebulaLinkServer
+    from tests.stubs import StubProgramController
+
+    server = NebulaLinkServer(
+        port=0, program_controller=StubProgramController(), warmup=False
+    )
+    await server.start()
+    try:
+        async with websockets.connect(f"ws://localhost:{server.port}") as websocket:
+            await websocket.send(json.dumps({"action": "ping"}))
+            assert json.loads(await websocket.recv()) == {"action": "pong"}
+            assert not server.power_controller.loaded
+    finally:
+        server.stop()
+        await server.server.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_stats_action(running_server):
+    async with websockets.connect(f"ws://localhost:{running_server.port}") as websocket:
+        for _ in range(3):
+            await websocket.send(json.dumps({"action": "ping"}))
+            await websocket.recv()
+        await websocket.send("not json")
+        await websocket.recv()
+        await websocket.send(json.dumps({"action": "stats"}))
+        stats = json.loads(await websocket.recv())["result"]
+
+    assert stats["clients"] == 1
+    assert stats["messages"]["received"] == 5
+    assert stats["messages"]["sent"] == 4
+    assert stats["decode_errors"] == 1
+    assert stats["actions"]["ping"]["count"] == 3
+    assert stats["actions"]["ping"]["p99_ms"] < 100
+    assert "loop_lag" in stats
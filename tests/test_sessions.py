@@ -0,0 +1,190 @@
+# tests/test_sessions.py
+
+import asyncio
+import json
+
+import pytest
+import pytest_asyncio
+import websockets
+
+from src.controllers.display_controller import DisplayController
+from src.server.codec import DEFAULT_CODEC
+from src.server.nebulalink_server import NebulaLinkServer
+from src.server.sessions import Session
+from src.utils import EventBus
+from tests.stubs import FakeDisplayBackend, StubPowerController, StubProgramController
+
+
+def test_missed_messages_come_from_the_ring():
+    session = Session("token", DEFAULT_CODEC, replay_size=3)
+    for i in range(1, 6):
+        session.enqueue(f"m{i}")
+    assert session.missed(5) == ([], True)
+    assert session.missed(2) == (["m3", "m4", "m5"], True)
+    # m2 was already pushed out of the ring
+    assert session.missed(1) == (["m3", "m4", "m5"], False)
+
+
+class Client:
+    """Counts the messages received in a session, as a resuming client must."""
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.received = 0
+
+    @classmethod
+    async def connect(cls, port: int, **hello) -> "Client":
+        client = cls(await websockets.connect(f"ws://localhost:{port}"))
+        await client.send({"action": "hello", **hello})
+        return client
+
+    async def send(self, message):
+        await self.websocket.send(json.dumps(message))
+
+    async def recv(self):
+        message = json.loads(await asyncio.wait_for(self.websocket.recv(), timeout=2))
+        self.received += 1
+        return message
+
+    def drop(self):
+        # Kill the TCP connection without a closing handshake, like a lost Wi-Fi link
+        self.websocket.transport.abort()
+
+
+@pytest_asyncio.fixture
+async def server():
+    bus = EventBus()
+    server = NebulaLinkServer(
+        port=0,
+        power_controller=StubPowerController(delay=0.2),
+        display_controller=DisplayController(backend=FakeDisplayBackend(count=2), events=bus),
+        program_controller=StubProgramController(),
+        events=bus,
+        warmup=False,
+    )
+    server.event_stream.window = 0.01
+    await server.start()
+    yield server
+    server.stop()
+    await server.server.wait_closed()
+
+
+async def detached(server, count: int = 1):
+    while len(server.sessions.detached()) < count:
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_reconnect_replays_missed_messages(server):
+    client = await Client.connect(server.port, session=True)
+    hello = (await client.recv())["result"]
+    token = hello["session"]["token"]
+    assert hello["session"] == {"token": token, "resumed": False}
+    await client.send({"action": "subscribe_events", "topics": ["display"]})
+    await client.recv()
+
+    client.drop()
+    await detached(server)
+    # Changes made while the client is offline are recorded for it
+    other = await Client.connect(server.port)
+    await other.recv()
+    await other.send({"action": "set_refresh_rate", "display_id": 0, "rate": 120})
+    await other.recv()
+    await asyncio.sleep(0.05)
+    await server.broadcast({"action": "notice"})
+
+    resumed = await Client.connect(server.port, session=token, ack=client.received)
+    missed = [await resumed.recv(), await resumed.recv()]
+    assert missed[0]["action"] == "events"
+    assert missed[0]["events"] == [{"type": "mode_changed", "display_id": 0, "refresh_rate": 120}]
+    assert missed[1] == {"action": "notice"}
+    hello = (await resumed.recv())["result"]
+    assert hello["session"] == {"token": token, "resumed": True, "replayed": 2, "complete": True}
+
+    # The subscription moved to the new connection
+    await other.send({"action": "set_refresh_rate", "display_id": 1, "rate": 144})
+    pushed = await resumed.recv()
+    assert pushed["events"][0] == {"type": "mode_changed", "display_id": 1, "refresh_rate": 144}
+    assert server.sessions.get_stats()["replayed"] == 2
+    await resumed.websocket.close()
+    await other.websocket.close()
+
+
+@pytest.mark.asyncio
+async def test_reply_to_request_running_at_disconnect_is_replayed(server):
+    client = await Client.connect(server.port, session=True)
+    token = (await client.recv())["result"]["session"]["token"]
+    await client.send({"action": "sleep", "id": "slow"})
+    await asyncio.sleep(0.05)
+    client.drop()
+    await detached(server)
+    await asyncio.sleep(0.3)
+
+    resumed = await Client.connect(server.port, session=token, ack=client.received)
+    reply = await resumed.recv()
+    assert reply["id"] == "slow"
+    assert reply["result"]["status"] == "success"
+    assert (await resumed.recv())["result"]["session"]["replayed"] == 1
+    await resumed.websocket.close()
+
+
+@pytest.mark.asyncio
+async def test_reconnecting_client_leaves_nothing_behind(server):
+    client = await Client.connect(server.port, session=True)
+    token = (await client.recv())["result"]["session"]["token"]
+    session = server.sessions._sessions[token]
+    for i in range(10):
+        if i % 2:
+            # Dropped with a slow request running; its reply is replayed
+            await client.send({"action": "sleep"})
+            await asyncio.sleep(0.05)
+        client.drop()
+        await detached(server)
+        await asyncio.sleep(0.3 if i % 2 else 0)
+        resumed = await Client.connect(server.port, session=token, ack=client.received)
+        resumed.received = client.received
+        while (await resumed.recv()).get("action") != "hello":
+            pass
+        client = resumed
+    await asyncio.sleep(0.3)
+    assert session.pipelines == {}
+    assert list(server.sessions._by_websocket.values()) == [session]
+    await client.websocket.close()
+
+
+@pytest.mark.asyncio
+async def test_resume_replaces_a_connection_not_yet_seen_as_dropped(server):
+    client = await Client.connect(server.port, session=True)
+    token = (await client.recv())["result"]["session"]["token"]
+    resumed = await Client.connect(server.port, session=token, ack=client.received)
+    assert (await resumed.recv())["result"]["session"]["replayed"] == 0
+    with pytest.raises(websockets.ConnectionClosedOK):
+        await client.websocket.recv()
+    # The old connection closing does not detach the session from the new one
+    await resumed.send({"action": "ping"})
+    assert await resumed.recv() == {"action": "pong"}
+    assert server.sessions.detached() == []
+    await resumed.websocket.close()
+
+
+@pytest.mark.asyncio
+async def test_expired_or_invalid_sessions_cannot_be_resumed(server):
+    server.sessions.grace_period = 0.05
+    client = await Client.connect(server.port, session=True)
+    token = (await client.recv())["result"]["session"]["token"]
+    await client.send({"action": "subscribe_events"})
+    await client.recv()
+
+    other = await Client.connect(server.port, session=token, ack=client.received + 5)
+    assert "Invalid ack" in (await other.recv())["error"]["message"]
+
+    client.drop()
+    await detached(server)
+    await asyncio.sleep(0.1)
+    assert len(server.sessions) == 0
+    assert server.event_stream.get_stats()["subscribers"]["display"] == 0
+
+    await other.send({"action": "hello", "session": token, "ack": 2})
+    error = (await other.recv())["error"]
+    assert error == {"error": "ConnectionError", "message": "Unknown or expired session"}
+    await other.websocket.close()
@@ -0,0 +1,156 @@
+# tests/test_single_flight.py
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from src.server.codec import CODECS, SharedMessage
+from src.server.dispatcher import ActionDispatcher
+from src.server.nebulalink_server import NebulaLinkServer
+from src.server.single_flight import SharedReply, SingleFlight, shared_key
+from tests.stubs import (
+    FakeWebSocket,
+    StubDisplayController,
+    StubPowerController,
+    StubProgramController,
+)
+
+
+class SlowProgramController(StubProgramController):
+    """Counts process list scans, each taking ``delay`` seconds."""
+
+    def __init__(self, delay: float = 0.1):
+        super().__init__()
+        self.delay = delay
+        self.scans = 0
+        self._lock = threading.Lock()
+
+    def get_running_programs(self, max_age: float = None):
+        with self._lock:
+            self.scans += 1
+        time.sleep(self.delay)
+        return super().get_running_programs(max_age)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    single_flight = SingleFlight()
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return [1, 2, 3]
+
+    results = await asyncio.gather(
+        *[single_flight.do("scan", "key", call) for _ in range(10)]
+    )
+    assert calls == 1
+    assert all(result is results[0] for result in results)
+    # Nothing is kept once the call finished
+    await single_flight.do("scan", "key", call)
+    assert calls == 2
+    assert single_flight.in_flight == 0
+    assert single_flight.get_stats() == {
+        "scan": {"executed": 2, "shared": 9, "hit_ratio": 0.818}
+    }
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_waiter():
+    single_flight = SingleFlight()
+
+    async def call():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("scan failed")
+
+    results = await asyncio.gather(
+        *[single_flight.do("scan", "key", call) for _ in range(3)],
+        return_exceptions=True,
+    )
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_the_call():
+    single_flight = SingleFlight()
+
+    async def call():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    leader = asyncio.create_task(single_flight.do("scan", "key", call))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(single_flight.do("scan", "key", call))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    assert await leader == "done"
+
+
+def test_shared_reply_encodes_once_per_codec():
+    shared = SharedMessage({"action": "get_display_info", "result": [{"id": 0}]})
+    first, second = SharedReply(shared), SharedReply(shared)
+    for codec in CODECS.values():
+        assert first.encode(codec) is second.encode(codec)
+        tagged = first.with_id("r1")
+        assert tagged == dict(shared.message, id="r1")
+        assert codec.decode(tagged.encode(codec)) == dict(shared.message, id="r1")
+
+
+def test_shared_key():
+    assert shared_key("a", {"max_age": 1}) == shared_key("a", {"max_age": 1})
+    assert shared_key("a", {"max_age": 1}) != shared_key("a", {"max_age": 2})
+    assert shared_key("a", {"filter": ["x"]}) is None
+
+
+def test_shared_actions_cannot_be_per_client():
+    dispatcher = ActionDispatcher()
+
+    async def handler(websocket):
+        return None
+
+    with pytest.raises(ValueError):
+        dispatcher.register("x", handler, client=True, shared=True)
+    dispatcher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_server_scans_once_per_burst():
+    programs = SlowProgramController()
+    server = NebulaLinkServer(
+        power_controller=StubPowerController(),
+        display_controller=StubDisplayController(),
+        program_controller=programs,
+    )
+    clients = [FakeWebSocket() for _ in range(10)]
+    for websocket in clients:
+        await server.register(websocket)
+    try:
+        await asyncio.gather(
+            *[
+                server.handle_message(
+                    websocket, json.dumps({"action": "get_running_programs", "id": i})
+                )
+                for i, websocket in enumerate(clients)
+            ],
+            # Different parameters are a different call
+            server.execute(None, {"action": "get_running_programs", "max_age": 0}),
+        )
+        for websocket in clients:
+            await server.clients[websocket].close()
+    finally:
+        server.stop()
+
+    assert programs.scans == 2
+    replies = [json.loads(websocket.sent[0]) for websocket in clients]
+    assert [reply["id"] for reply in replies] == list(range(10))
+    assert all(reply["result"] == programs.programs for reply in replies)
+    assert server.metrics.snapshot([])["single_flight"]["get_running_programs"] == {
+        "executed": 2,
+        "shared": 9,
+        "hit_ratio": 0.818,
+    }
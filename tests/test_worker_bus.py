@@ -0,0 +1,148 @@
+# tests/test_worker_bus.py
+
+import asyncio
+import json
+
+import pytest
+import pytest_asyncio
+from src.server.worker_bus import WorkerBus
+from src.utils import CommandError, EventBus
+from tests.stubs import FakeWebSocket, stub_server_factory
+
+
+@pytest_asyncio.fixture
+async def workers(tmp_path):
+    servers = []
+    for index in range(3):
+        # Each worker process has an event bus of its own
+        server = stub_server_factory(bus=WorkerBus(index, 3, str(tmp_path)), events=EventBus())
+        server.bus.on_broadcast = server._broadcast_local
+        server.bus.on_call = server._execute_forwarded
+        server.bus.on_processes = server.program_controller.load_processes
+        server.bus.on_event = server.event_stream.publish
+        server.event_stream.attach(asyncio.get_running_loop())
+        await server.bus.start()
+        servers.append(server)
+    yield servers
+    for server in servers:
+        await server.bus.close()
+        server.stop()
+
+
+@pytest.mark.asyncio
+async def test_broadcast_reaches_clients_of_every_worker(workers):
+    received = {}
+    for server in workers:
+        websocket = FakeWebSocket()
+        await server.register(websocket)
+        received[server.bus.index] = websocket
+
+    await workers[1].broadcast({"action": "event", "n": 1})
+    await asyncio.sleep(0.05)
+
+    for websocket in received.values():
+        assert [json.loads(message) for message in websocket.sent] == [
+            {"action": "event", "n": 1}
+        ]
+    for server, websocket in zip(workers, received.values()):
+        await server.unregister(websocket)
+
+
+@pytest.mark.asyncio
+async def test_owned_actions_run_on_owner(workers):
+    owner, other = workers[0], workers[2]
+    reply = await other.execute(
+        FakeWebSocket(), {"action": "set_power_plan", "guid": "abc", "id": 5}
+    )
+    assert reply["action"] == "set_power_plan"
+    assert reply["id"] == 5
+    assert owner.power_controller.calls == ["set_power_plan"]
+    assert other.power_controller.calls == []
+
+
+@pytest.mark.asyncio
+async def test_owner_runs_owned_actions_locally(workers):
+    owner = workers[0]
+    await owner.execute(FakeWebSocket(), {"action": "hibernate"})
+    assert owner.power_controller.calls == ["hibernate"]
+
+
+@pytest.mark.asyncio
+async def test_unowned_actions_run_locally(workers):
+    other = workers[1]
+    await other.execute(FakeWebSocket(), {"action": "pause_program", "pid": 1000})
+    assert other.program_controller.paused == {1000}
+    assert workers[0].program_controller.paused == set()
+
+
+@pytest.mark.asyncio
+async def test_process_scans_reach_every_worker(workers):
+    await workers[0].bus.share_processes([[7, "game.exe", 100.0, 1]])
+    await asyncio.sleep(0.05)
+    for server in workers[1:]:
+        assert server.program_controller.programs == [{"pid": 7, "name": "game.exe"}]
+
+
+@pytest.mark.asyncio
+async def test_events_reach_subscribers_of_every_worker(workers):
+    clients = []
+    for server in workers:
+        server.event_stream.window = 0.01
+        websocket = FakeWebSocket()
+        await server.register(websocket)
+        server.event_stream.subscribe(websocket, ["display"])
+        clients.append(websocket)
+
+    # A display change runs on the owner; a pause may run on any worker
+    workers[0].event_stream.bus.publish("display", {"type": "mode_changed", "display_id": 0}, key=0)
+    workers[2].event_stream.bus.publish("programs", {"type": "paused", "pid": 7}, key=7)
+    await asyncio.sleep(0.1)
+    for websocket in clients:
+        (push,) = [json.loads(message) for message in websocket.sent]
+        assert push["topic"] == "display"
+        assert push["events"] == [{"type": "mode_changed", "display_id": 0}]
+
+    workers[1].event_stream.subscribe(clients[1], ["programs"])
+    workers[2].event_stream.bus.publish("programs", {"type": "paused", "pid": 7}, key=7)
+    await asyncio.sleep(0.1)
+    assert json.loads(clients[1].sent[-1])["events"] == [{"type": "paused", "pid": 7}]
+    assert len(clients[2].sent) == 1
+
+
+@pytest.mark.asyncio
+async def test_only_the_owner_scans_and_serves_metrics(tmp_path):
+    servers = [
+        stub_server_factory(
+            port=0, bus=WorkerBus(index, 2, str(tmp_path)), metrics_port=0, warmup=False
+        )
+        for index in range(2)
+    ]
+    for server in servers:
+        await server.start()
+    owner, other = servers
+    try:
+        assert owner.metrics_endpoint is not None
+        assert other.metrics_endpoint is None
+        assert other.program_controller.following
+        assert not owner.program_controller.following
+        # The owner shares every scan; the other worker loads it instead of scanning
+        (share,) = owner.program_controller.scan_listeners
+        share([[7, "game.exe", 100.0, 1]])
+        await asyncio.sleep(0.05)
+        assert other.program_controller.programs == [{"pid": 7, "name": "game.exe"}]
+    finally:
+        for server in servers:
+            server.stop()
+            await server.server.wait_closed()
+            await server.bus.close()
+
+
+@pytest.mark.asyncio
+async def test_call_fails_when_owner_is_down(tmp_path):
+    bus = WorkerBus(1, 2, str(tmp_path))
+    await bus.start()
+    try:
+        with pytest.raises(CommandError):
+            await bus.call({"action": "hibernate"})
+    finally:
+        await bus.close()
@@ -0,0 +1,64 @@
+# tests/test_workers.py
+
+import asyncio
+import json
+import socket
+
+import pytest
+import websockets
+from src.server.workers import WorkerPool
+from tests.stubs import stub_server_factory
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(socket, "SO_REUSEPORT"), reason="requires SO_REUSEPORT"
+)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool(2, "localhost", free_port(), server_factory=stub_server_factory)
+    pool.start()
+    yield pool
+    pool.stop()
+
+
+async def connect(port, timeout=20):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        try:
+            return await websockets.connect(f"ws://localhost:{port}")
+        except OSError:
+            if asyncio.get_running_loop().time() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+@pytest.mark.asyncio
+async def test_workers_share_the_port(pool):
+    workers = set()
+    clients = []
+    # Wait until both workers accept connections, then spread clients over them
+    for _ in range(40):
+        websocket = await connect(pool.port)
+        clients.append(websocket)
+        await websocket.send(json.dumps({"action": "hello"}))
+        workers.add(json.loads(await websocket.recv())["result"]["worker"])
+        if workers == {0, 1}:
+            break
+        await asyncio.sleep(0.05)
+    assert workers == {0, 1}
+
+    # Owned actions are forwarded to the owner from either worker
+    for websocket in clients[-2:]:
+        await websocket.send(json.dumps({"action": "hibernate", "id": 1}))
+        reply = json.loads(await websocket.recv())
+        assert reply["result"]["status"] == "success"
+
+    for websocket in clients:
+        await websocket.close()